@@ -0,0 +1,348 @@
+"""
+ハードウェア自動チューニング
+短いベンチマーク音声で compute_type / cpu_threads / num_workers の組み合わせを計測し、
+マシン・モデルごとに最速の設定を保存する
+"""
+
+import concurrent.futures
+import hashlib
+import json
+import logging
+import threading
+import time
+from importlib import metadata
+from typing import TYPE_CHECKING, Optional
+
+from config import TUNING_PROFILE_PATH
+from job_scheduler import job_scheduler
+from lazy_imports import load_faster_whisper
+from model_pool import ModelKey, estimate_model_memory_gb
+from speech_chunks import SAMPLING_RATE
+from system_info import get_system_info
+
+# numpy・faster_whisperは起動を速くするため、計測時に読み込む（lazy_imports）
+if TYPE_CHECKING:
+    import numpy as np
+    from faster_whisper import WhisperModel
+
+logger = logging.getLogger(__name__)
+
+# ベンチマーク音声の長さ（秒）
+BENCHMARK_SECONDS = 20
+
+# 計測対象のcompute_type（CPUで対応しているもののみ使用）
+CANDIDATE_COMPUTE_TYPES = ["int8", "int8_float32", "float32"]
+
+_profiles_lock = threading.Lock()
+_calibration_lock = threading.Lock()
+# 読み込んだチューニング結果（ジョブごとに何度も参照するため、保存するまで読み直さない）
+_profiles: Optional[dict] = None
+_system_info: Optional[dict] = None
+_fingerprint: Optional[str] = None
+
+
+def get_cached_system_info() -> dict:
+    """システム情報を取得（プロセス内で1回だけ取得する）"""
+    global _system_info
+    if _system_info is None:
+        _system_info = get_system_info()
+    return _system_info
+
+
+def machine_fingerprint() -> str:
+    """
+    マシンを識別するフィンガープリント
+
+    CPU構成とCTranslate2のバージョンが変わった場合は別マシンとして再計測する。
+
+    Returns:
+        str: フィンガープリント（16文字）
+    """
+    global _fingerprint
+    if _fingerprint is None:
+        info = get_cached_system_info()
+        payload = {
+            name: info[name]
+            for name in ("machine", "processor", "system", "logical_cores", "physical_cores", "avx2", "avx512")
+        }
+        payload["ctranslate2"] = _ctranslate2_version()
+        _fingerprint = hashlib.sha256(json.dumps(payload, sort_keys=True).encode("utf-8")).hexdigest()[:16]
+    return _fingerprint
+
+
+def _ctranslate2_version() -> str:
+    """CTranslate2のバージョン（パッケージ情報から取得し、モジュール自体は読み込まない）"""
+    try:
+        return metadata.version("ctranslate2")
+    except metadata.PackageNotFoundError:
+        # PyInstallerでパッケージ情報が同梱されていない場合
+        load_faster_whisper()
+        import ctranslate2
+
+        return ctranslate2.__version__
+
+
+def load_profiles() -> dict:
+    """
+    保存済みのチューニング結果を読み込む
+
+    Returns:
+        dict: {フィンガープリント: {モデル名: プロファイル}}（キャッシュを共有するため変更しない）
+    """
+    global _profiles
+    with _profiles_lock:
+        if _profiles is None:
+            try:
+                with open(TUNING_PROFILE_PATH, "r", encoding="utf-8") as f:
+                    _profiles = json.load(f)
+            except FileNotFoundError:
+                _profiles = {}
+            except (json.JSONDecodeError, OSError) as e:
+                logger.warning(f"⚠️ チューニング結果の読み込みに失敗: {e}")
+                _profiles = {}
+        return _profiles
+
+
+def save_profile(model_name: str, profile: dict) -> None:
+    """
+    チューニング結果を保存
+
+    Args:
+        model_name: モデル名
+        profile: チューニング結果
+    """
+    global _profiles
+    fingerprint = machine_fingerprint()
+    profiles = dict(load_profiles())
+    profiles[fingerprint] = {**profiles.get(fingerprint, {}), model_name: profile}
+
+    with _profiles_lock:
+        TUNING_PROFILE_PATH.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = TUNING_PROFILE_PATH.with_suffix(".tmp")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(profiles, f, ensure_ascii=False, indent=2)
+        tmp_path.replace(TUNING_PROFILE_PATH)
+        _profiles = profiles
+
+
+def get_tuned_settings(model_name: str) -> Optional[dict]:
+    """
+    このマシン・モデルのチューニング結果を取得
+
+    Args:
+        model_name: モデル名
+
+    Returns:
+        dict: {'compute_type', 'cpu_threads', 'parallel_workers', 'parallel_cpu_threads', ...}
+              未計測の場合None
+    """
+    return load_profiles().get(machine_fingerprint(), {}).get(model_name)
+
+
+def make_benchmark_clip(seconds: int = BENCHMARK_SECONDS) -> "np.ndarray":
+    """
+    ベンチマーク用の合成音声を生成
+
+    声に近い倍音構造と音節程度の振幅変調を持つ波形。固定シードで毎回同じ波形になる。
+
+    Args:
+        seconds: 長さ（秒）
+
+    Returns:
+        np.ndarray: 16kHzモノラルの音声データ
+    """
+    import numpy as np
+
+    rng = np.random.default_rng(0)
+    t = np.arange(seconds * SAMPLING_RATE) / SAMPLING_RATE
+    pitch = 140 + 20 * np.sin(2 * np.pi * 0.5 * t)
+    phase = 2 * np.pi * np.cumsum(pitch) / SAMPLING_RATE
+    voiced = sum(np.sin(k * phase) / k for k in range(1, 6))
+    syllables = np.clip(np.sin(2 * np.pi * 4 * t) + 0.2, 0, None)
+    audio = 0.3 * voiced * syllables + 0.01 * rng.standard_normal(t.shape)
+    return audio.astype(np.float32)
+
+
+def _run_clip(model: "WhisperModel", audio: "np.ndarray") -> None:
+    """ベンチマーク音声を1本文字起こし（デコード長を固定して計測のばらつきを抑える）"""
+    segments, _ = model.transcribe(
+        audio,
+        language="ja",
+        vad_filter=False,
+        temperature=0.0,
+        condition_on_previous_text=False,
+        max_new_tokens=64,
+    )
+    for _ in segments:
+        pass
+
+
+def _measure(
+    model_name: str, compute_type: str, cpu_threads: int, num_workers: int, audio: "np.ndarray"
+) -> float:
+    """
+    1つの設定を計測
+
+    num_workers本のクリップを同時に処理し、クリップ1本あたりの処理時間を返す。
+
+    Returns:
+        float: クリップ1本あたりの処理時間（秒）
+    """
+    model = load_faster_whisper().WhisperModel(
+        model_name,
+        device="cpu",
+        compute_type=compute_type,
+        cpu_threads=cpu_threads,
+        num_workers=num_workers,
+        local_files_only=True,
+    )
+    try:
+        # 初回推論のメモリ確保などを計測から除外
+        _run_clip(model, audio[: SAMPLING_RATE * 2])
+
+        start_time = time.perf_counter()
+        with concurrent.futures.ThreadPoolExecutor(max_workers=num_workers) as executor:
+            list(executor.map(lambda _: _run_clip(model, audio), range(num_workers)))
+        elapsed = (time.perf_counter() - start_time) / num_workers
+    finally:
+        del model
+
+    logger.info(
+        f"  ⏱️ {compute_type}, cpu_threads={cpu_threads}, num_workers={num_workers}: {elapsed:.2f}秒/クリップ"
+    )
+    return elapsed
+
+
+def _measure_when_idle(
+    model_name: str, compute_type: str, cpu_threads: int, num_workers: int, audio: "np.ndarray"
+) -> float:
+    """
+    文字起こしのジョブがない間に1つの設定を計測
+
+    ジョブと同じCPUコアを奪い合うと計測結果が遅くなり、ジョブも遅れるため、
+    ジョブがなくなるまで待ってから計測し、計測中にジョブが始まった場合は終了後に計測し直す
+
+    Returns:
+        float: クリップ1本あたりの処理時間（秒）
+    """
+    while True:
+        job_scheduler.wait_until_idle()
+        started_count = job_scheduler.started_count
+        elapsed = _measure(model_name, compute_type, cpu_threads, num_workers, audio)
+        if job_scheduler.started_count == started_count and job_scheduler.is_idle():
+            return elapsed
+        logger.info("  ⏸️ 計測中に文字起こしが始まったため、終了後に計測し直します")
+
+
+def calibrate(model_name: str) -> dict:
+    """
+    compute_type / cpu_threads / num_workers を計測して最速の設定を求め、保存する
+
+    1. 物理コア数のスレッドでcompute_typeを比較
+    2. 最速のcompute_typeでcpu_threadsを比較（逐次処理用）
+    3. 同時実行数num_workersを比較（並列処理用、スレッドはワーカー間で等分）
+
+    各計測は文字起こしのジョブがない間に行う（ジョブが来たら終わるまで待つ）
+
+    Args:
+        model_name: モデル名
+
+    Returns:
+        dict: チューニング結果
+    """
+    info = get_cached_system_info()
+    physical = info["physical_cores"]
+    logical = info["logical_cores"]
+    audio = make_benchmark_clip()
+
+    logger.info(f"🔧 自動チューニング開始: {model_name}")
+    logger.info(
+        f"  物理コア: {physical}, 論理コア: {logical}, AVX2: {info['avx2']}, AVX-512: {info['avx512']}, "
+        f"空きメモリ: {info['available_gb']}GB"
+    )
+    start_time = time.time()
+
+    # メモリに収まらないcompute_typeは候補から外す
+    load_faster_whisper()
+    import ctranslate2
+
+    supported = ctranslate2.get_supported_compute_types("cpu")
+    compute_types = [ct for ct in CANDIDATE_COMPUTE_TYPES if ct in supported]
+    if info["available_gb"]:
+        compute_types = [
+            ct
+            for ct in compute_types
+            if estimate_model_memory_gb(ModelKey(model_name, ct)) < info["available_gb"] * 0.8
+        ] or ["int8"]
+
+    # 1. compute_type
+    compute_timings = {ct: _measure_when_idle(model_name, ct, physical, 1, audio) for ct in compute_types}
+    best_compute_type = min(compute_timings, key=compute_timings.get)
+
+    # 2. cpu_threads
+    thread_timings = {physical: compute_timings[best_compute_type]}
+    for threads in sorted({max(1, physical // 2), logical}):
+        if threads not in thread_timings:
+            thread_timings[threads] = _measure_when_idle(model_name, best_compute_type, threads, 1, audio)
+    best_threads = min(thread_timings, key=thread_timings.get)
+
+    # 3. num_workers（並列処理時のスループット）
+    worker_timings = {1: thread_timings[best_threads]}
+    for workers in (2, 4):
+        if workers <= physical:
+            worker_timings[workers] = _measure_when_idle(
+                model_name, best_compute_type, max(1, physical // workers), workers, audio
+            )
+    best_workers = min(worker_timings, key=worker_timings.get)
+
+    profile = {
+        "compute_type": best_compute_type,
+        "cpu_threads": best_threads,
+        "parallel_workers": best_workers,
+        "parallel_cpu_threads": best_threads if best_workers == 1 else max(1, physical // best_workers),
+        "seconds_per_clip": round(thread_timings[best_threads], 3),
+        "benchmark_seconds": BENCHMARK_SECONDS,
+        "calibrated_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "system": info,
+    }
+    save_profile(model_name, profile)
+
+    logger.info(
+        f"✅ 自動チューニング完了: {model_name} ({time.time() - start_time:.1f}秒) - "
+        f"compute_type={best_compute_type}, cpu_threads={best_threads}, 並列ワーカー={best_workers}"
+    )
+    return profile
+
+
+def calibrate_if_needed(model_name: str) -> Optional[dict]:
+    """
+    未計測の場合のみ自動チューニングを実行（起動時・モデルを初めて使用した後にバックグラウンドで呼ばれる）
+
+    モデルが未ダウンロードの場合はダウンロードを発生させずにスキップする。
+
+    Args:
+        model_name: モデル名
+
+    Returns:
+        dict: チューニング結果（スキップした場合None）
+    """
+    if not _calibration_lock.acquire(blocking=False):
+        logger.info("自動チューニングは実行中のためスキップ")
+        return None
+
+    try:
+        if get_tuned_settings(model_name) is not None:
+            logger.info(f"チューニング済みの設定を使用: {model_name}")
+            return None
+        return calibrate(model_name)
+    except Exception as e:
+        # local_files_only=True のため、未ダウンロードの場合はここに来る
+        logger.warning(f"⚠️ 自動チューニングをスキップ: {model_name} - {e}")
+        return None
+    finally:
+        _calibration_lock.release()
+
+
+def is_calibrating() -> bool:
+    """自動チューニングの実行中かどうか"""
+    return _calibration_lock.locked()
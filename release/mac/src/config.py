@@ -2,6 +2,7 @@
 設定ファイル
 """
 
+import os
 import sys
 from pathlib import Path
 
@@ -18,9 +19,59 @@ else:
 UPLOAD_DIR = BASE_DIR / "uploads"
 UPLOAD_DIR.mkdir(exist_ok=True)
 
+# キャッシュディレクトリ（アップロードディレクトリと同じ階層）
+CACHE_DIR = UPLOAD_DIR.parent / "cache"
+
+# 文字起こし結果キャッシュ（合計サイズの上限、MB単位）
+RESULT_CACHE_DIR = CACHE_DIR / "results"
+RESULT_CACHE_MAX_MB = int(os.getenv("GAQ_RESULT_CACHE_MAX_MB", "200"))
+
+# デコード済み音声（16kHzモノラルPCM）キャッシュ（モデルを変えて再実行・再試行する際にデコードを省略、合計サイズの上限、MB単位）
+PCM_CACHE_DIR = CACHE_DIR / "pcm"
+PCM_CACHE_MAX_MB = int(os.getenv("GAQ_PCM_CACHE_MAX_MB", "2048"))
+
+# 発話区間（VAD）キャッシュ（モデルを変えて再実行・再試行する際や、文字起こし前の発話解析でVADを省略、合計サイズの上限、MB単位）
+VAD_CACHE_DIR = CACHE_DIR / "vad"
+VAD_CACHE_MAX_MB = int(os.getenv("GAQ_VAD_CACHE_MAX_MB", "50"))
+
+# 文字起こしのチェックポイント（中断した長時間の文字起こしを途中から再開するため、
+# デコード済みのセグメントを逐次保存する。指定日数を過ぎたものは起動時に削除）
+CHECKPOINT_DIR = CACHE_DIR / "checkpoints"
+CHECKPOINT_MAX_AGE_DAYS = 7
+
+# 起動時のモデルプリロード（DEFAULT_MODELと前回使用したモデルをロードし、ウォームアップ推論を行う）
+PRELOAD_MODELS = os.getenv("GAQ_PRELOAD", "true").lower() == "true"
+PRELOAD_LAST_USED_MODEL = os.getenv("GAQ_PRELOAD_LAST_USED", "true").lower() == "true"
+LAST_USED_MODEL_PATH = CACHE_DIR / "last_used_model.json"
+
+# 自動チューニング（起動時に compute_type / cpu_threads / num_workers を計測し、マシン・モデルごとに保存）
+AUTO_TUNE = os.getenv("GAQ_AUTO_TUNE", "true").lower() == "true"
+TUNING_PROFILE_PATH = CACHE_DIR / "tuning_profiles.json"
+
 # 許可する音声ファイル形式
 ALLOWED_EXTENSIONS = {".mp3", ".wav", ".m4a", ".flac", ".ogg", ".mp4"}
 
+# アップロード設定
+# 最大サイズ（MB単位、0: 無制限）
+MAX_UPLOAD_MB = int(os.getenv("GAQ_MAX_UPLOAD_MB", "8192"))
+# ディスクに書き込む単位（バイト、ファイル全体をメモリに読み込まない）
+UPLOAD_CHUNK_SIZE = 1024 * 1024
+# ローカルパスでのファイル登録に必要なトークン（デスクトップアプリが起動時に生成してサーバーに渡す。
+# 未設定の場合はローカルパスでの登録を受け付けない）
+LOCAL_API_TOKEN = os.getenv("GAQ_LOCAL_API_TOKEN", "")
+# アップロード済みファイルの登録簿（file_id → パス・SHA-256・状態）と、
+# 指定日数を過ぎても文字起こしされないファイルを起動時に削除するまでの日数
+UPLOAD_REGISTRY_PATH = CACHE_DIR / "uploads.sqlite3"
+UPLOAD_MAX_AGE_DAYS = 7
+
+# 再開可能な分割アップロード（大きなファイルをチャンクに分けて送信し、接続が切れても続きから再開する）
+# 受信中のファイルの保存先（指定日数を過ぎても完了しないものは起動時に削除）
+RESUMABLE_UPLOAD_DIR = UPLOAD_DIR / "partial"
+RESUMABLE_UPLOAD_MAX_AGE_DAYS = 2
+# クライアントに推奨するチャンクサイズ（バイト）と、1回に受け付ける最大のチャンクサイズ（MB単位）
+RESUMABLE_CHUNK_SIZE = 8 * 1024 * 1024
+RESUMABLE_MAX_CHUNK_MB = int(os.getenv("GAQ_RESUMABLE_MAX_CHUNK_MB", "64"))
+
 # アプリケーションバージョン
 APP_VERSION = "1.2.3"
 
@@ -28,6 +79,57 @@ APP_VERSION = "1.2.3"
 AVAILABLE_MODELS = ["medium", "large-v3"]
 DEFAULT_MODEL = "medium"
 
+# モデルプール設定（複数モデルを常駐させるメモリ予算、GB単位）
+MODEL_POOL_MEMORY_BUDGET_GB = float(os.getenv("GAQ_MODEL_POOL_BUDGET_GB", "5.0"))
+
+# 常駐モデルの自動退避
+# 指定時間（分）使われていないモデルをメモリから外す（0: 無効）
+MODEL_IDLE_TTL_MINUTES = float(os.getenv("GAQ_MODEL_IDLE_TTL_MINUTES", "30"))
+# システムの空きメモリがこれ（GB）を下回ったら、使用中でないモデルを外す（0: 無効）
+MEMORY_PRESSURE_THRESHOLD_GB = float(os.getenv("GAQ_MEMORY_PRESSURE_GB", "1.0"))
+# 確認間隔（秒）
+MODEL_MONITOR_INTERVAL_SECONDS = 30
+
+# 文字起こし方式
+# standard: 逐次処理（従来方式）
+# parallel: 発話区間で分割し、複数ワーカーで並列処理（長時間の録音向け）
+# batched: 発話区間をまとめてバッチ推論（faster-whisperのBatchedInferencePipeline）
+# streaming: 音声を一定時間ごとに読み込みながら処理（長時間の録音でもメモリ使用量が一定）
+# refine: 軽いモデルの下書きを先に表示し、指定モデルの結果で順次置き換える（二段階処理）
+TRANSCRIBE_MODES = ["standard", "parallel", "batched", "streaming", "refine"]
+DEFAULT_TRANSCRIBE_MODE = "standard"
+
+# ストリーミング処理で1回に読み込む音声の長さ（秒）
+STREAMING_WINDOW_SECONDS = int(os.getenv("GAQ_STREAMING_WINDOW_SECONDS", "300"))
+# 標準（逐次処理）でも、音声がこの長さ（分）以上ならストリーミング処理に切り替える（0: 切り替えない）
+STREAMING_MIN_MINUTES = float(os.getenv("GAQ_STREAMING_MIN_MINUTES", "60"))
+
+# 二段階処理の下書きに使うモデル（ダウンロード済みの場合のみ使用）
+REFINE_DRAFT_MODEL = os.getenv("GAQ_REFINE_DRAFT_MODEL", "medium")
+# 二段階処理で下書きを置き換える単位（発話長、秒）
+REFINE_GROUP_SECONDS = int(os.getenv("GAQ_REFINE_GROUP_SECONDS", "60"))
+
+# バッチ推論のバッチサイズ（大きいほど高速だがメモリ使用量が増える）
+BATCH_SIZE = int(os.getenv("GAQ_BATCH_SIZE", "8"))
+
+# 並列処理のワーカー数（0: CPUコア数から自動決定）
+PARALLEL_WORKERS = int(os.getenv("GAQ_PARALLEL_WORKERS", "0"))
+# 並列処理で1ワーカーに割り当てる最小の発話長（秒）
+PARALLEL_MIN_CHUNK_SECONDS = 120
+
+# ジョブスケジューラ設定
+# 同時に実行する文字起こしジョブ数（CPUの取り合いを防ぐため既定は1）
+MAX_CONCURRENT_JOBS = int(os.getenv("GAQ_MAX_CONCURRENT_JOBS", "1"))
+# 待機できるジョブ数の上限（超えた場合は新しいジョブを受け付けない）
+JOB_QUEUE_MAX_SIZE = int(os.getenv("GAQ_JOB_QUEUE_SIZE", "8"))
+# モデルごとの同時実行数（例: "medium=2,large-v3=1"、未指定のモデルは1）
+MODEL_CONCURRENCY = {
+    name.strip(): int(limit)
+    for name, limit in (
+        item.split("=", 1) for item in os.getenv("GAQ_MODEL_CONCURRENCY", "").split(",") if "=" in item
+    )
+}
+
 # サーバー設定
 HOST = "127.0.0.1"
 PORT = 8000
@@ -0,0 +1,320 @@
+"""
+文字起こしジョブスケジューラ
+全リクエストの文字起こしを1つの優先度付きキューと常駐ワーカーで実行し、
+同時実行数をモデルごとに制限する
+"""
+
+import concurrent.futures
+import heapq
+import itertools
+import logging
+import threading
+import time
+import uuid
+from typing import Callable, Optional
+
+from cancellation import CancellationToken
+from config import JOB_QUEUE_MAX_SIZE, MAX_CONCURRENT_JOBS, MODEL_CONCURRENCY
+
+logger = logging.getLogger(__name__)
+
+# 優先度（小さいほど先に実行）
+PRIORITY_INTERACTIVE = 0  # 画面で進捗を待っているジョブ
+PRIORITY_NORMAL = 5  # API経由のジョブ
+
+# 終了済みジョブの情報を保持する件数
+FINISHED_JOBS_TO_KEEP = 100
+
+
+class QueueFullError(Exception):
+    """待機中のジョブが上限に達している（受付不可）"""
+
+
+class Job:
+    """文字起こしジョブ"""
+
+    def __init__(
+        self,
+        func: Callable,
+        kwargs: dict,
+        model_name: str,
+        priority: int,
+        sequence: int,
+        position_callback: Optional[Callable[[int], None]] = None,
+        cancel_token: Optional[CancellationToken] = None,
+    ):
+        """
+        Args:
+            func: 実行する関数
+            kwargs: 関数に渡すキーワード引数
+            model_name: 使用するモデル（同時実行数の制限単位）
+            priority: 優先度（小さいほど先に実行）
+            sequence: 受付順（同じ優先度では先着順）
+            position_callback: 待ち順位が変わったときに呼ばれる関数（0: 次に実行）
+            cancel_token: 中止トークン（funcにも同じトークンを渡しておくと実行中でも中止できる）
+        """
+        self.job_id = str(uuid.uuid4())
+        self.func = func
+        self.kwargs = kwargs
+        self.model_name = model_name
+        self.priority = priority
+        self.sequence = sequence
+        self.position_callback = position_callback
+        self.cancel_token = cancel_token or CancellationToken()
+        self.future: concurrent.futures.Future = concurrent.futures.Future()
+        self.status = "queued"
+        self.submitted_at = time.time()
+        self.started_at: Optional[float] = None
+        self.finished_at: Optional[float] = None
+
+    def __lt__(self, other: "Job") -> bool:
+        return (self.priority, self.sequence) < (other.priority, other.sequence)
+
+    def to_dict(self) -> dict:
+        """ジョブの状態（API応答用）"""
+        return {
+            "job_id": self.job_id,
+            "model": self.model_name,
+            "priority": self.priority,
+            "status": self.status,
+            "submitted_at": self.submitted_at,
+            "started_at": self.started_at,
+            "finished_at": self.finished_at,
+        }
+
+
+class JobScheduler:
+    """
+    優先度付きジョブスケジューラ
+
+    - 常駐ワーカー（max_workers個）がキューからジョブを取り出して実行する
+    - モデルごとの同時実行数を超えるジョブは、実行可能になるまでキューに残す
+    - 待機中のジョブがmax_queue_sizeに達した場合は新しいジョブを受け付けない
+    """
+
+    def __init__(self, max_workers: int, max_queue_size: int, model_concurrency: dict):
+        """
+        Args:
+            max_workers: 全体の同時実行数
+            max_queue_size: 待機できるジョブ数の上限
+            model_concurrency: モデルごとの同時実行数（未指定のモデルは1）
+        """
+        self.max_workers = max(1, max_workers)
+        self.max_queue_size = max_queue_size
+        self.model_concurrency = model_concurrency
+        self._queue: list[Job] = []
+        self._jobs: dict[str, Job] = {}
+        self._running: dict[str, int] = {}
+        self._sequence = itertools.count()
+        # 開始したジョブの数（自動チューニングの計測中にジョブが始まったかの確認用）
+        self.started_count = 0
+        self._condition = threading.Condition()
+        self._workers: list[threading.Thread] = []
+
+    def start(self) -> None:
+        """ワーカースレッドを起動（初回のsubmit時に自動で呼ばれる）"""
+        with self._condition:
+            if self._workers:
+                return
+            for index in range(self.max_workers):
+                worker = threading.Thread(
+                    target=self._worker_loop, name=f"transcription-worker-{index}", daemon=True
+                )
+                worker.start()
+                self._workers.append(worker)
+        logger.info(
+            f"🗂️ ジョブスケジューラ起動: ワーカー {self.max_workers}, キュー上限 {self.max_queue_size}"
+        )
+
+    def submit(
+        self,
+        func: Callable,
+        model_name: str,
+        priority: int = PRIORITY_NORMAL,
+        position_callback: Optional[Callable[[int], None]] = None,
+        cancel_token: Optional[CancellationToken] = None,
+        **kwargs,
+    ) -> Job:
+        """
+        ジョブを登録
+
+        Args:
+            func: 実行する関数
+            model_name: 使用するモデル
+            priority: 優先度（小さいほど先に実行）
+            position_callback: 待ち順位が変わったときに呼ばれる関数
+            cancel_token: 中止トークン
+            **kwargs: 関数に渡すキーワード引数
+
+        Returns:
+            Job: 登録したジョブ（結果はjob.futureで受け取る）
+
+        Raises:
+            QueueFullError: 待機中のジョブが上限に達している場合
+        """
+        self.start()
+
+        with self._condition:
+            if len(self._queue) >= self.max_queue_size:
+                raise QueueFullError(f"待機中のジョブが上限（{self.max_queue_size}件）に達しています")
+
+            job = Job(
+                func, kwargs, model_name, priority, next(self._sequence), position_callback, cancel_token
+            )
+            heapq.heappush(self._queue, job)
+            self._jobs[job.job_id] = job
+            logger.info(f"📥 ジョブ受付: {job.job_id} (model: {model_name}, 優先度: {priority})")
+            self._notify_positions()
+            self._condition.notify_all()
+
+        return job
+
+    def cancel(self, job_id: str) -> Optional[Job]:
+        """
+        ジョブを中止
+
+        待機中のジョブはキューから取り除き、実行中のジョブには中止トークンで中止を伝える
+        （次のセグメントの区切りで停止し、ワーカーは次のジョブに移る）
+
+        Args:
+            job_id: ジョブID
+
+        Returns:
+            Job: 対象のジョブ（存在しない場合None）
+        """
+        with self._condition:
+            job = self._jobs.get(job_id)
+            if job is None or job.finished_at is not None:
+                return job
+
+            job.cancel_token.cancel()
+            if job.status == "queued" and job.future.cancel():
+                self._queue.remove(job)
+                heapq.heapify(self._queue)
+                job.status = "cancelled"
+                job.finished_at = time.time()
+                self._notify_positions()
+                self._prune_finished()
+                logger.info(f"⏹️ 待機中のジョブを中止: {job_id}")
+            else:
+                job.status = "cancelling"
+                logger.info(f"⏹️ 実行中のジョブに中止を要求: {job_id}")
+            return job
+
+    def get(self, job_id: str) -> Optional[Job]:
+        """ジョブを取得"""
+        with self._condition:
+            return self._jobs.get(job_id)
+
+    def queue_position(self, job_id: str) -> Optional[int]:
+        """
+        待ち順位を取得
+
+        Returns:
+            int: 先に実行されるジョブの数（待機中でない場合None）
+        """
+        with self._condition:
+            for position, job in enumerate(sorted(self._queue)):
+                if job.job_id == job_id:
+                    return position
+            return None
+
+    def stats(self) -> dict:
+        """
+        スケジューラの状態を取得
+
+        Returns:
+            dict: {'max_workers', 'max_queue_size', 'queued', 'running', 'jobs'}
+        """
+        with self._condition:
+            return {
+                "max_workers": self.max_workers,
+                "max_queue_size": self.max_queue_size,
+                "queued": len(self._queue),
+                "running": dict(self._running),
+                "jobs": [job.to_dict() for job in self._jobs.values()],
+            }
+
+    def wait_until_idle(self) -> None:
+        """待機中・実行中のジョブがなくなるまで待つ（自動チューニングの計測を文字起こしと重ねないため）"""
+        with self._condition:
+            while self._queue or any(self._running.values()):
+                self._condition.wait()
+
+    def is_idle(self) -> bool:
+        """待機中・実行中のジョブがないかどうか"""
+        with self._condition:
+            return not self._queue and not any(self._running.values())
+
+    def _limit(self, model_name: str) -> int:
+        return self.model_concurrency.get(model_name, 1)
+
+    def _next_runnable(self) -> Optional[Job]:
+        """同時実行数に空きのあるモデルのジョブのうち、最も優先度の高いものを取り出す"""
+        for job in sorted(self._queue):
+            if self._running.get(job.model_name, 0) < self._limit(job.model_name):
+                self._queue.remove(job)
+                heapq.heapify(self._queue)
+                return job
+        return None
+
+    def _notify_positions(self) -> None:
+        """待機中の全ジョブに待ち順位を通知（ロック取得中に呼ぶ）"""
+        for position, job in enumerate(sorted(self._queue)):
+            if job.position_callback:
+                try:
+                    job.position_callback(position)
+                except Exception as e:
+                    logger.warning(f"待ち順位の通知エラー: {e}")
+
+    def _worker_loop(self) -> None:
+        while True:
+            with self._condition:
+                job = self._next_runnable()
+                while job is None:
+                    self._condition.wait()
+                    job = self._next_runnable()
+
+                # 待機中に取り消されたジョブは実行しない
+                if not job.future.set_running_or_notify_cancel():
+                    job.status = "cancelled"
+                    job.finished_at = time.time()
+                    self._notify_positions()
+                    self._prune_finished()
+                    continue
+
+                job.status = "running"
+                job.started_at = time.time()
+                self.started_count += 1
+                self._running[job.model_name] = self._running.get(job.model_name, 0) + 1
+                self._notify_positions()
+
+            wait_seconds = job.started_at - job.submitted_at
+            logger.info(f"▶️ ジョブ開始: {job.job_id} (待ち時間 {wait_seconds:.1f}秒)")
+
+            try:
+                result = job.func(**job.kwargs)
+            except BaseException as e:
+                job.future.set_exception(e)
+                job.status = "failed"
+            else:
+                job.future.set_result(result)
+                job.status = "cancelled" if job.cancel_token.cancelled else "done"
+
+            with self._condition:
+                job.finished_at = time.time()
+                self._running[job.model_name] -= 1
+                self._prune_finished()
+                self._condition.notify_all()
+
+            logger.info(f"⏹️ ジョブ終了: {job.job_id} ({job.status}, {job.finished_at - job.started_at:.1f}秒)")
+
+    def _prune_finished(self) -> None:
+        """終了済みジョブの情報を古いものから削除（ロック取得中に呼ぶ）"""
+        finished = [job for job in self._jobs.values() if job.finished_at is not None]
+        for job in sorted(finished, key=lambda j: j.finished_at)[:-FINISHED_JOBS_TO_KEEP]:
+            del self._jobs[job.job_id]
+
+
+# グローバルインスタンス（シングルトン）
+job_scheduler = JobScheduler(MAX_CONCURRENT_JOBS, JOB_QUEUE_MAX_SIZE, MODEL_CONCURRENCY)
@@ -0,0 +1,80 @@
+"""
+音声認識エンジンの遅延読み込み
+faster-whisper（ctranslate2, onnxruntime, PyAVなど）の読み込みには数秒かかるため、
+サーバー起動時には読み込まず、最初に必要になった時点（またはバックグラウンド）で読み込む
+"""
+
+import importlib
+import logging
+import threading
+import time
+from types import ModuleType
+from typing import Optional
+
+logger = logging.getLogger(__name__)
+
+# faster-whisperが依存する重いモジュール（読み込み時間の内訳を記録するため個別に読み込む）
+HEAVY_MODULES = [
+    "numpy",
+    "av",
+    "ctranslate2",
+    "onnxruntime",
+    "tokenizers",
+    "huggingface_hub",
+    "faster_whisper",
+]
+
+_faster_whisper: Optional[ModuleType] = None
+_import_timings: dict[str, float] = {}
+_lock = threading.Lock()
+
+
+def load_faster_whisper() -> ModuleType:
+    """
+    faster_whisperを読み込む（初回のみ時間がかかり、以降はすぐに返る）
+
+    Returns:
+        ModuleType: faster_whisperモジュール
+    """
+    global _faster_whisper
+    if _faster_whisper is not None:
+        return _faster_whisper
+
+    with _lock:
+        if _faster_whisper is not None:
+            return _faster_whisper
+
+        total_start = time.perf_counter()
+        for name in HEAVY_MODULES:
+            start = time.perf_counter()
+            try:
+                importlib.import_module(name)
+            except ImportError:
+                # 依存関係の一部（onnxruntimeなど）がない構成でも、faster_whisper本体があれば動作する
+                if name == "faster_whisper":
+                    raise
+                logger.debug(f"モジュールなし（スキップ）: {name}")
+                continue
+            _import_timings[name] = round(time.perf_counter() - start, 3)
+        total = time.perf_counter() - total_start
+
+        _faster_whisper = importlib.import_module("faster_whisper")
+
+    breakdown = ", ".join(f"{name} {seconds:.2f}秒" for name, seconds in _import_timings.items())
+    logger.info(f"📚 音声認識エンジン読み込み完了 ({total:.2f}秒): {breakdown}")
+    return _faster_whisper
+
+
+def is_loaded() -> bool:
+    """faster_whisperが読み込み済みかどうか"""
+    return _faster_whisper is not None
+
+
+def get_import_timings() -> dict[str, float]:
+    """
+    モジュールごとの読み込み時間を取得
+
+    Returns:
+        dict[str, float]: {モジュール名: 秒}（未読み込みの場合は空）
+    """
+    return dict(_import_timings)
@@ -3,10 +3,13 @@ FastAPI メインアプリケーション
 """
 
 import asyncio
+import concurrent.futures
 import json
 import logging
 import os
+import secrets
 import sys
+import threading
 import uuid
 from datetime import datetime
 from pathlib import Path
@@ -14,12 +17,52 @@ from string import Template
 from typing import Optional
 
 import uvicorn
-from config import ALLOWED_EXTENSIONS, APP_VERSION, AVAILABLE_MODELS, DEFAULT_MODEL, HOST, PORT, UPLOAD_DIR
-from fastapi import BackgroundTasks, FastAPI, File, Form, HTTPException, UploadFile
+from auto_tuning import calibrate_if_needed, get_cached_system_info, get_tuned_settings, is_calibrating
+from cancellation import CancellationToken
+from checkpoint import cleanup_stale_checkpoints
+from config import (
+    ALLOWED_EXTENSIONS,
+    APP_VERSION,
+    AUTO_TUNE,
+    AVAILABLE_MODELS,
+    DEFAULT_MODEL,
+    DEFAULT_TRANSCRIBE_MODE,
+    HOST,
+    LOCAL_API_TOKEN,
+    MEMORY_PRESSURE_THRESHOLD_GB,
+    MODEL_IDLE_TTL_MINUTES,
+    PORT,
+    PRELOAD_LAST_USED_MODEL,
+    PRELOAD_MODELS,
+    RESUMABLE_CHUNK_SIZE,
+    TRANSCRIBE_MODES,
+    UPLOAD_DIR,
+)
+from fastapi import BackgroundTasks, Body, FastAPI, File, Form, Header, HTTPException, Request, UploadFile
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import HTMLResponse, JSONResponse, Response, StreamingResponse
 from fastapi.staticfiles import StaticFiles
-from transcribe import transcription_service
+from job_scheduler import PRIORITY_INTERACTIVE, PRIORITY_NORMAL, Job, QueueFullError, job_scheduler
+from lazy_imports import get_import_timings, is_loaded, load_faster_whisper
+from model_warmup import model_warmup
+from progressive_decode import GrowingFile, ProgressiveDecoder
+from resumable_upload import (
+    ChunkChecksumError,
+    ResumableUploadError,
+    UploadConflictError,
+    UploadNotFoundError,
+    resumable_uploads,
+)
+from starlette.requests import ClientDisconnect
+from transcribe import VAD_PARAMETERS, normalize_time_ranges, transcription_service
+from upload_registry import upload_registry
+from upload_storage import (
+    UploadSizeLimitMiddleware,
+    UploadTooLargeError,
+    receive_multipart_upload,
+    save_upload_file,
+    validate_local_path,
+)
 
 # 環境変数設定
 SSE_HEARTBEAT_INTERVAL = float(os.getenv("GAQ_SSE_HEARTBEAT_INTERVAL", "10"))  # デフォルト10秒
@@ -48,6 +91,9 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# アップロードの上限サイズ（本文を一時ファイルに保存する前に確認）
+app.add_middleware(UploadSizeLimitMiddleware, paths={"/upload", "/transcribe", "/transcribe-stream"})
+
 # PyInstaller対応: 実行時の基準ディレクトリを取得
 def get_base_path():
     """
@@ -74,6 +120,19 @@ else:
 last_transcription = {"text": "", "processing_time": 0, "timestamp": None, "model": ""}
 
 
+def save_last_transcription(result: dict, model: str):
+    """最後の文字起こし結果をグローバル変数に保存"""
+    last_transcription["text"] = result.get("text", "")
+    last_transcription["processing_time"] = result.get("duration", 0)
+    last_transcription["timestamp"] = datetime.now()
+    last_transcription["model"] = model
+
+    # 次回起動時のプリロード対象として記録
+    model_warmup.remember_last_used(model)
+    # 未計測のモデルは文字起こしの合間に自動チューニング
+    schedule_calibration(model)
+
+
 def cleanup_file(file_path: Path):
     """アップロードファイルを削除"""
     try:
@@ -84,6 +143,53 @@ def cleanup_file(file_path: Path):
         logger.error(f"ファイル削除エラー: {e}")
 
 
+def discard_upload(upload: GrowingFile, decoder: Optional[ProgressiveDecoder] = None, job: Optional[Job] = None):
+    """
+    受信中・受信後に始めた処理を中止し、アップロードファイルを削除
+
+    先行デコード・文字起こしのスレッドが終わってから削除する（Windowsでは読み込み中のファイルを削除できないため）。
+    スレッドの終了を待つため、イベントループの外（スレッドプール・バックグラウンドタスク）で呼ぶ
+    """
+    upload.abort()
+    if decoder:
+        decoder.cancel()
+    if job:
+        job_scheduler.cancel(job.job_id)
+        concurrent.futures.wait([job.future])
+    cleanup_file(upload.path)
+
+
+def parse_time_ranges(
+    start: Optional[float], end: Optional[float], ranges: Optional[str]
+) -> Optional[list[list]]:
+    """
+    文字起こしする時間範囲を解析
+
+    Args:
+        start: 開始時刻（秒）
+        end: 終了時刻（秒）
+        ranges: 複数の範囲（"開始-終了,開始-終了"、秒、終了は省略可）。start/endより優先
+
+    Returns:
+        list[list]: 正規化した範囲のリスト（指定がない場合None）
+
+    Raises:
+        ValueError: 範囲の形式が正しくない場合
+    """
+    if ranges:
+        parsed = []
+        for item in ranges.split(","):
+            range_start, separator, range_end = item.strip().partition("-")
+            if not separator:
+                raise ValueError(f"時間範囲の形式が正しくありません: {item}（例: 60-180）")
+            parsed.append([float(range_start), float(range_end) if range_end.strip() else None])
+    elif start is not None or end is not None:
+        parsed = [[start or 0.0, end]]
+    else:
+        return None
+    return normalize_time_ranges(parsed)
+
+
 @app.get("/", response_class=HTMLResponse)
 async def root():
     """ルートエンドポイント（簡易UIを返す）"""
@@ -574,6 +680,14 @@ async def root():
                 </button>
             </div>
 
+            <select id="modeSelect">
+                <option value="standard">処理方式: 標準（逐次処理）【推奨設定】</option>
+                <option value="parallel">処理方式: 並列処理（長時間の録音向け・PC高負荷）</option>
+                <option value="batched">処理方式: バッチ処理（高速・メモリ使用量増）</option>
+                <option value="streaming">処理方式: 省メモリ（数時間の録音向け・少しずつ読み込み）</option>
+                <option value="refine">処理方式: 速報→高精度（先に下書きを表示し、順次置き換え）</option>
+            </select>
+
             <button id="transcribeBtn" disabled>文字起こし開始</button>
 
             <p class="credit">公立はこだて未来大学：辻研究室（tsuji-lab.net）</p>
@@ -755,6 +869,7 @@ async def root():
                 var resultText = document.getElementById('resultText');
                 var stats = document.getElementById('stats');
                 var modelSelect = document.getElementById('modelSelect');
+                var modeSelect = document.getElementById('modeSelect');
                 var saveBtn = document.getElementById('saveBtn');
                 var modelManageBtn = document.getElementById('modelManageBtn');
                 var modelModal = document.getElementById('modelModal');
@@ -1055,6 +1170,7 @@ async def root():
                 }
 
                 var model = modelSelect.value;
+                var mode = modeSelect ? modeSelect.value : 'standard';
 
                 try {
                     var response = await fetch('/check-model/' + model);
@@ -1069,9 +1185,9 @@ async def root():
                         }
 
                         if (window.uploadedFileId) {
-                            startTranscriptionWithFileId(window.uploadedFileId, window.uploadedFileName, model);
+                            startTranscriptionWithFileId(window.uploadedFileId, window.uploadedFileName, model, mode);
                         } else {
-                            startTranscription(selectedFile, model);
+                            startTranscription(selectedFile, model, mode);
                         }
                     }
 
@@ -1090,13 +1206,60 @@ async def root():
             });
             console.log('✅ transcribeBtn clickイベント登録完了');
 
+            // 逐次表示用: グループ番号のないセグメント（前回までの続きなど）と、
+            // 二段階処理のグループごとのテキスト（下書きを確定版で置き換える）
+            var liveText = '';
+            var liveGroups = [];
+
+            // 逐次表示用: 結果表示エリアを初期化
+            function resetLiveResult() {
+                liveText = '';
+                liveGroups = [];
+                resultText.textContent = '';
+                stats.innerHTML = '';
+                saveBtn.style.display = 'none';
+            }
+
+            function segmentText(segment) {
+                var text = segment.text || '';
+                if ('。！？'.indexOf(text.charAt(text.length - 1)) !== -1) {
+                    text += '\\n';
+                }
+                return text;
+            }
+
+            function renderLiveResult() {
+                resultText.textContent = liveText + liveGroups.join('');
+                resultDiv.style.display = 'block';
+            }
+
+            // デコード済みのセグメントを結果表示エリアに追記（完了時に整形済みの全文で置き換える）
+            function appendSegmentText(segment) {
+                if (!segment.text) {
+                    return;
+                }
+                if (segment.group !== undefined) {
+                    liveGroups[segment.group] = (liveGroups[segment.group] || '') + segmentText(segment);
+                } else {
+                    liveText += segmentText(segment);
+                }
+                renderLiveResult();
+            }
+
+            // 二段階処理: 確定したグループの下書きを置き換える
+            function replaceGroupText(refined) {
+                liveGroups[refined.group] = refined.segments.map(segmentText).join('');
+                renderLiveResult();
+            }
+
             // 文字起こし実行関数
-            function startTranscription(file, model) {
-                console.log('文字起こし開始:', file.name, 'モデル:', model);
+            function startTranscription(file, model, mode) {
+                console.log('文字起こし開始:', file.name, 'モデル:', model, '処理方式:', mode);
 
                 transcribeBtn.disabled = true;
                 progress.style.display = 'block';
                 resultDiv.style.display = 'none';
+                resetLiveResult();
 
                 // プログレスバーをリセット
                 var progressBarFill = document.getElementById('progressBarFill');
@@ -1106,8 +1269,10 @@ async def root():
                 progressStatus.textContent = '準備中...';
 
                 var formData = new FormData();
-                formData.append('file', file);
+                // 受信しながらデコードを始めるため、モデルと処理方式はファイルより前に送る
                 formData.append('model', model);
+                formData.append('mode', mode || 'standard');
+                formData.append('file', file);
 
                 fetch('/transcribe-stream', {
                     method: 'POST',
@@ -1160,6 +1325,16 @@ async def root():
                                             return;
                                         }
 
+                                        if (data.segment) {
+                                            // デコード済みのセグメントを逐次表示
+                                            appendSegmentText(data.segment);
+                                        }
+
+                                        if (data.refined) {
+                                            // 二段階処理: 下書きを確定版で置き換え
+                                            replaceGroupText(data.refined);
+                                        }
+
                                         if (data.progress !== undefined) {
                                             // プログレスバー更新
                                             progressBarFill.style.width = data.progress + '%';
@@ -1172,6 +1347,9 @@ async def root():
 
                                         if (data.result && data.result.success) {
                                             // 完了時の処理
+                                            if (data.cache_hit) {
+                                                showToast('⚡ 前回の文字起こし結果を再利用しました');
+                                            }
                                             resultText.textContent = data.result.text;
                                             stats.innerHTML =
                                                 '<strong>文字数:</strong> ' + data.result.char_count.toLocaleString() + '文字 | ' +
@@ -1204,12 +1382,13 @@ async def root():
             }
 
             // file_idを使って文字起こしを実行（pywebview環境用）
-            function startTranscriptionWithFileId(fileId, fileName, model) {
-                console.log('文字起こし開始（file_id使用）:', fileId, fileName, 'モデル:', model);
+            function startTranscriptionWithFileId(fileId, fileName, model, mode) {
+                console.log('文字起こし開始（file_id使用）:', fileId, fileName, 'モデル:', model, '処理方式:', mode);
 
                 transcribeBtn.disabled = true;
                 progress.style.display = 'block';
                 resultDiv.style.display = 'none';
+                resetLiveResult();
 
                 // プログレスバーをリセット
                 var progressBarFill = document.getElementById('progressBarFill');
@@ -1218,8 +1397,8 @@ async def root():
                 progressBarFill.textContent = '0%';
                 progressStatus.textContent = '準備中...';
 
-                // file_idとmodelをクエリパラメータで送信
-                var url = '/transcribe-stream-by-id?file_id=' + encodeURIComponent(fileId) + '&model=' + encodeURIComponent(model);
+                // file_id・model・modeをクエリパラメータで送信
+                var url = '/transcribe-stream-by-id?file_id=' + encodeURIComponent(fileId) + '&model=' + encodeURIComponent(model) + '&mode=' + encodeURIComponent(mode || 'standard');
 
                 fetch(url, {
                     method: 'GET'
@@ -1273,6 +1452,16 @@ async def root():
                                             return;
                                         }
 
+                                        if (data.segment) {
+                                            // デコード済みのセグメントを逐次表示
+                                            appendSegmentText(data.segment);
+                                        }
+
+                                        if (data.refined) {
+                                            // 二段階処理: 下書きを確定版で置き換え
+                                            replaceGroupText(data.refined);
+                                        }
+
                                         if (data.progress !== undefined) {
                                             // プログレスバー更新
                                             progressBarFill.style.width = data.progress + '%';
@@ -1285,6 +1474,9 @@ async def root():
 
                                         if (data.result && data.result.success) {
                                             // 完了時の処理
+                                            if (data.cache_hit) {
+                                                showToast('⚡ 前回の文字起こし結果を再利用しました');
+                                            }
                                             resultText.textContent = data.result.text;
                                             stats.innerHTML =
                                                 '<strong>文字数:</strong> ' + data.result.char_count.toLocaleString() + '文字 | ' +
@@ -1805,7 +1997,7 @@ async def upload_audio(file: UploadFile = File(...)):
         file: アップロードする音声ファイル
 
     Returns:
-        dict: {"file_id": str, "original_name": str}
+        dict: {"file_id": str, "original_name": str}（同じ内容のファイルがアップロード済みの場合は同じfile_id）
     """
     try:
         # ファイル拡張子チェック
@@ -1815,15 +2007,14 @@ async def upload_audio(file: UploadFile = File(...)):
                 status_code=400, detail=f"対応していないファイル形式です: {file_ext}"
             )
 
-        # 一時ファイルとして保存
-        file_id = str(uuid.uuid4())
-        temp_file = UPLOAD_DIR / f"{file_id}{file_ext}"
+        # 一時ファイルとして保存し、登録簿に登録してfile_idを発行
+        temp_file = UPLOAD_DIR / f"{uuid.uuid4()}{file_ext}"
+
+        size, audio_hash = await save_upload_file(file, temp_file)
 
-        with open(temp_file, "wb") as f:
-            content = await file.read()
-            f.write(content)
+        logger.info(f"ファイル保存完了: {temp_file.name} ({size} bytes)")
 
-        logger.info(f"ファイル保存完了: {temp_file.name} ({len(content)} bytes)")
+        file_id, _ = await asyncio.to_thread(upload_registry.register, temp_file, file.filename, audio_hash)
 
         return JSONResponse(content={
             "file_id": file_id,
@@ -1832,15 +2023,250 @@ async def upload_audio(file: UploadFile = File(...)):
 
     except HTTPException:
         raise
+    except UploadTooLargeError as e:
+        raise HTTPException(status_code=413, detail=str(e)) from e
     except Exception as e:
         logger.error(f"❌ アップロードエラー: {e}", exc_info=True)
         raise HTTPException(status_code=500, detail=str(e)) from e
 
 
+@app.post("/register-local-file")
+async def register_local_file(
+    request: Request,
+    path: str = Body(..., embed=True),
+    x_gaq_local_token: str = Header(""),
+):
+    """
+    ローカルのファイルをコピーせずに登録してfile_idを返す（デスクトップアプリ用）
+
+    /upload と異なりファイルを送信・複製せず、文字起こし時に元のファイルをその場で読み込む。
+    ループバックからの接続で、デスクトップアプリが起動時に生成したトークンを持つ場合のみ受け付ける
+
+    Args:
+        path: ファイルの絶対パス
+        x_gaq_local_token: トークン（X-GaQ-Local-Tokenヘッダー）
+
+    Returns:
+        dict: {"file_id": str, "original_name": str, "size": int}
+    """
+    client_host = request.client.host if request.client else ""
+    if client_host not in ("127.0.0.1", "::1", "localhost"):
+        raise HTTPException(status_code=403, detail="ローカルからの接続のみ受け付けます")
+    if not LOCAL_API_TOKEN or not secrets.compare_digest(x_gaq_local_token, LOCAL_API_TOKEN):
+        raise HTTPException(status_code=403, detail="ローカルパスでの登録は許可されていません")
+
+    try:
+        file_path = validate_local_path(path)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e)) from e
+
+    file_id, _ = await asyncio.to_thread(upload_registry.register, file_path, file_path.name, local=True)
+    size = file_path.stat().st_size
+    logger.info(f"ローカルファイル登録: {file_path.name} ({size} bytes, file_id: {file_id})")
+
+    return JSONResponse(content={"file_id": file_id, "original_name": file_path.name, "size": size})
+
+
+@app.get("/files/{file_id}")
+async def get_uploaded_file(file_id: str):
+    """
+    アップロード済み（登録済み）ファイルの情報を取得
+
+    Returns:
+        dict: {"file_id", "original_name", "size", "sha256", "local", "state", "created_at"}
+              stateは ready（文字起こし待ち）または transcribing（文字起こし中）
+    """
+    upload = await asyncio.to_thread(upload_registry.get, file_id)
+    if upload is None:
+        raise HTTPException(status_code=404, detail=f"ファイルが見つかりません: {file_id}")
+    upload.pop("path")
+    return JSONResponse(content=upload)
+
+
+def resumable_upload_http_error(e: Exception) -> HTTPException:
+    """分割アップロードの例外をHTTPエラーに変換"""
+    if isinstance(e, UploadNotFoundError):
+        return HTTPException(status_code=404, detail=str(e))
+    if isinstance(e, UploadConflictError):
+        return HTTPException(status_code=409, detail=str(e))
+    if isinstance(e, UploadTooLargeError):
+        return HTTPException(status_code=413, detail=str(e))
+    if isinstance(e, ChunkChecksumError):
+        return HTTPException(status_code=422, detail=str(e))
+    return HTTPException(status_code=400, detail=str(e))
+
+
+@app.post("/uploads")
+async def create_resumable_upload(
+    filename: str = Body(...),
+    size: int = Body(...),
+):
+    """
+    再開可能な分割アップロードを開始（大きなファイル向け）
+
+    PATCH /uploads/{upload_id} でチャンクを送信し、全体を受信したら
+    POST /uploads/{upload_id}/finalize で /upload と同じfile_idを受け取る
+
+    Args:
+        filename: 元のファイル名
+        size: ファイル全体のサイズ（バイト）
+
+    Returns:
+        dict: 受信状況に加え、推奨チャンクサイズ（chunk_size）・最大チャンクサイズ（max_chunk_size）
+    """
+    try:
+        status = await asyncio.to_thread(resumable_uploads.create, filename, size)
+    except (ResumableUploadError, UploadTooLargeError) as e:
+        raise resumable_upload_http_error(e) from e
+    status["chunk_size"] = RESUMABLE_CHUNK_SIZE
+    status["max_chunk_size"] = resumable_uploads.max_chunk_bytes
+    return JSONResponse(status_code=201, content=status)
+
+
+@app.get("/uploads/{upload_id}")
+async def get_resumable_upload(upload_id: str):
+    """
+    分割アップロードの受信状況を取得（接続が切れた後、どこから再開するかの確認用）
+
+    Returns:
+        dict: {"upload_id", "filename", "size", "offset", "received", "complete"}
+              offsetは先頭から途切れずに受信済みのバイト数、receivedは受信済みの範囲 [開始, 終了) のリスト
+    """
+    try:
+        return JSONResponse(content=resumable_uploads.status(upload_id))
+    except ResumableUploadError as e:
+        raise resumable_upload_http_error(e) from e
+
+
+@app.patch("/uploads/{upload_id}")
+async def upload_resumable_chunk(
+    request: Request,
+    upload_id: str,
+    offset: int,
+    x_chunk_sha256: str = Header(...),
+):
+    """
+    分割アップロードのチャンクを書き込む（リクエスト本文がチャンクの内容）
+
+    位置を指定して書き込むため、複数のチャンクを並列に送信できる。
+    SHA-256が一致しない場合は422を返し、その範囲は未受信のまま（同じチャンクを再送する）
+
+    Args:
+        upload_id: 分割アップロードのID
+        offset: 書き込む位置（バイト）
+        x_chunk_sha256: チャンクのSHA-256（X-Chunk-SHA256ヘッダー、16進数）
+
+    Returns:
+        dict: 書き込み後の受信状況
+    """
+    try:
+        status = await resumable_uploads.write_chunk(upload_id, offset, request.stream(), x_chunk_sha256)
+    except (ResumableUploadError, UploadTooLargeError) as e:
+        raise resumable_upload_http_error(e) from e
+    return JSONResponse(content=status)
+
+
+@app.post("/uploads/{upload_id}/finalize")
+async def finalize_resumable_upload(upload_id: str, sha256: Optional[str] = Body(None, embed=True)):
+    """
+    分割アップロードを完了してfile_idを返す
+
+    Args:
+        upload_id: 分割アップロードのID
+        sha256: ファイル全体のSHA-256（指定した場合は検証する）
+
+    Returns:
+        dict: {"file_id": str, "original_name": str, "size": int, "sha256": str}
+    """
+    try:
+        file_path, original_name, size, audio_hash = await asyncio.to_thread(
+            resumable_uploads.finalize, upload_id, sha256
+        )
+    except ResumableUploadError as e:
+        raise resumable_upload_http_error(e) from e
+
+    file_id, _ = await asyncio.to_thread(upload_registry.register, file_path, original_name, audio_hash)
+
+    return JSONResponse(content={
+        "file_id": file_id,
+        "original_name": original_name,
+        "size": size,
+        "sha256": audio_hash,
+    })
+
+
+@app.delete("/uploads/{upload_id}")
+async def cancel_resumable_upload(upload_id: str):
+    """分割アップロードを取り消し、受信中のファイルを削除"""
+    try:
+        await asyncio.to_thread(resumable_uploads.cancel, upload_id)
+    except ResumableUploadError as e:
+        raise resumable_upload_http_error(e) from e
+    return JSONResponse(content={"upload_id": upload_id, "cancelled": True})
+
+
+@app.get("/speech-analysis/{file_id}")
+async def analyze_speech(file_id: str, model: str = DEFAULT_MODEL, mode: str = DEFAULT_TRANSCRIBE_MODE):
+    """
+    アップロード済みファイルの発話区間を解析（文字起こし開始前の表示用）
+
+    発話区間はキャッシュされ、続けて同じファイルを文字起こしする場合はVADが省略される
+
+    Args:
+        file_id: アップロード済みファイルのID
+        model: 使用するモデル（処理時間の目安に使用）
+        mode: 文字起こし方式（処理時間の目安に使用）
+
+    Returns:
+        dict: {"duration", "speech_seconds", "speech_ratio", "speech_chunks", "segments", "estimated_seconds"}
+    """
+    if model not in AVAILABLE_MODELS:
+        raise HTTPException(status_code=400, detail=f"無効なモデル名です: {model}")
+    if mode not in TRANSCRIBE_MODES:
+        raise HTTPException(status_code=400, detail=f"無効な文字起こし方式です: {mode}")
+
+    upload = await asyncio.to_thread(upload_registry.get, file_id)
+    if upload is None:
+        raise HTTPException(status_code=404, detail=f"ファイルが見つかりません: {file_id}")
+
+    try:
+        analysis = await asyncio.to_thread(
+            transcription_service.analyze_speech, upload["path"], model, mode, upload["sha256"]
+        )
+    except Exception as e:
+        logger.error(f"❌ 発話解析エラー: {e}", exc_info=True)
+        raise HTTPException(status_code=500, detail=str(e)) from e
+
+    # 解析時に計算したSHA-256を登録しておき、続けて文字起こしする場合に再計算しない
+    if upload["sha256"] is None:
+        await asyncio.to_thread(upload_registry.update, file_id, sha256=analysis["audio_hash"])
+
+    logger.info(
+        f"🎙️ 発話解析: {file_id} - 発話 {analysis['speech_seconds']:.0f}秒 / {analysis['duration']:.0f}秒 "
+        f"（{analysis['speech_ratio']:.0%}）"
+    )
+    return JSONResponse(content=analysis)
+
+
 @app.get("/health")
 async def health_check():
-    """ヘルスチェック"""
-    return {"status": "ok", "service": "GaQ Transcription API", "version": APP_VERSION}
+    """
+    ヘルスチェック
+
+    サーバーは音声認識エンジンの読み込みを待たずに応答する
+    engine_loaded: faster-whisperの読み込みが完了しているか（import_timingsは内訳）
+    ready: デフォルトモデルのプリロード・ウォームアップが完了しているか
+    （falseでも文字起こしは受け付ける。初回のみ読み込み・ロード時間がかかる）
+    """
+    return {
+        "status": "ok",
+        "service": "GaQ Transcription API",
+        "version": APP_VERSION,
+        "engine_loaded": is_loaded(),
+        "import_timings": get_import_timings(),
+        "ready": model_warmup.is_ready(DEFAULT_MODEL),
+        "models": model_warmup.status(),
+    }
 
 
 @app.get("/models")
@@ -1890,11 +2316,176 @@ async def check_model(model_name: str):
     return JSONResponse(content=result)
 
 
+@app.get("/model-pool")
+async def get_model_pool():
+    """
+    モデルプールの状態（常駐モデル、ヒット/ミス数、ロード時間、退避・再ロード数）
+
+    Returns:
+        モデルプールの統計情報
+    """
+    return JSONResponse(content=transcription_service.model_pool.stats())
+
+
+@app.get("/jobs")
+async def get_jobs():
+    """
+    ジョブスケジューラの状態（待機数、実行中のジョブ数、ジョブ一覧）
+
+    Returns:
+        スケジューラの状態
+    """
+    return JSONResponse(content=job_scheduler.stats())
+
+
+@app.get("/jobs/{job_id}")
+async def get_job(job_id: str):
+    """
+    ジョブの状態
+
+    Args:
+        job_id: ジョブID
+
+    Returns:
+        ジョブの状態と待ち順位
+    """
+    job = job_scheduler.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"ジョブが見つかりません: {job_id}")
+
+    return JSONResponse(
+        content={**job.to_dict(), "queue_position": job_scheduler.queue_position(job_id)}
+    )
+
+
+@app.delete("/jobs/{job_id}")
+async def cancel_job(job_id: str):
+    """
+    ジョブを中止
+
+    待機中のジョブはキューから取り除き、実行中のジョブは次のセグメントの区切りで停止する
+
+    Args:
+        job_id: ジョブID
+
+    Returns:
+        中止後のジョブの状態
+    """
+    job = job_scheduler.cancel(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"ジョブが見つかりません: {job_id}")
+
+    return JSONResponse(content={"success": True, **job.to_dict()})
+
+
+@app.on_event("startup")
+async def cleanup_checkpoints():
+    """再開されないまま残った古いチェックポイントを削除"""
+    await asyncio.to_thread(cleanup_stale_checkpoints)
+
+
+@app.on_event("startup")
+async def cleanup_uploads():
+    """文字起こしされないまま残った古いアップロードを削除"""
+    await asyncio.to_thread(upload_registry.cleanup_stale)
+
+
+@app.on_event("startup")
+async def cleanup_resumable_uploads():
+    """完了しないまま残った古い分割アップロードを削除"""
+    await asyncio.to_thread(resumable_uploads.cleanup_stale)
+
+
+def prepare_models():
+    """
+    起動時のモデル準備（バックグラウンドで実行）
+
+    1. 音声認識エンジン（faster-whisper）を読み込む
+    2. DEFAULT_MODELと前回使用したモデルをプリロードしてウォームアップ
+    3. プリロードしたモデル（無効の場合はDEFAULT_MODEL）が未計測の場合は自動チューニングを行い、結果の設定でロードし直す
+       （その他のモデルは初めて使用した後にチューニングする）
+    """
+    try:
+        load_faster_whisper()
+    except ImportError as e:
+        logger.error(f"❌ 音声認識エンジンの読み込みに失敗: {e}")
+        return
+
+    model_names = [DEFAULT_MODEL]
+    if PRELOAD_MODELS:
+        last_used = model_warmup.last_used() if PRELOAD_LAST_USED_MODEL else None
+        if last_used:
+            model_names.append(last_used)
+        model_warmup.preload(model_names)
+    else:
+        logger.info("モデルのプリロード: 無効（GAQ_PRELOAD=false）")
+
+    if not AUTO_TUNE:
+        logger.info("自動チューニング: 無効（GAQ_AUTO_TUNE=false）")
+        return
+
+    for model_name in dict.fromkeys(model_names):
+        calibrate_model(model_name)
+
+
+def calibrate_model(model_name: str) -> None:
+    """
+    未計測の場合は自動チューニングを行い、チューニング前の設定でロード済みのモデルを入れ替える
+
+    文字起こしに使用中のモデルは入れ替えない（退避された後、次のロードでチューニング結果を使う）
+    """
+    if calibrate_if_needed(model_name) is None:
+        return
+    if model_name in transcription_service.model_pool.resident_model_names() and not (
+        transcription_service.is_model_in_use(model_name)
+    ):
+        transcription_service.model_pool.evict_model(model_name)
+        model_warmup.warm_up(model_name)
+
+
+def schedule_calibration(model_name: str) -> None:
+    """使用したモデルが未計測の場合、自動チューニングをバックグラウンドで開始（計測は文字起こしの合間に行う）"""
+    if not AUTO_TUNE or is_calibrating() or get_tuned_settings(model_name) is not None:
+        return
+    threading.Thread(target=calibrate_model, args=(model_name,), name="auto-tuning", daemon=True).start()
+
+
+@app.on_event("startup")
+async def start_model_monitor():
+    """使われていないモデル・空きメモリ不足時のモデル退避を開始"""
+    transcription_service.start_model_monitor(MODEL_IDLE_TTL_MINUTES * 60, MEMORY_PRESSURE_THRESHOLD_GB)
+
+
+@app.on_event("startup")
+async def start_model_preparation():
+    """起動時のモデル準備を開始（ロード・計測には時間がかかるため、サーバーの起動を待たせない）"""
+    asyncio.get_running_loop().run_in_executor(None, prepare_models)
+
+
+@app.get("/tuning")
+async def get_tuning():
+    """
+    自動チューニングの状態（システム情報と、モデルごとの計測結果）
+
+    Returns:
+        自動チューニングの状態
+    """
+    return JSONResponse(
+        content={
+            "enabled": AUTO_TUNE,
+            "calibrating": is_calibrating(),
+            "system": get_cached_system_info(),
+            "profiles": {name: get_tuned_settings(name) for name in AVAILABLE_MODELS},
+        }
+    )
+
+
 @app.post("/transcribe")
 async def transcribe_audio(
     background_tasks: BackgroundTasks,
     file: UploadFile = File(...),
     model: str = Form(DEFAULT_MODEL),
+    mode: str = Form(DEFAULT_TRANSCRIBE_MODE),
 ):
     """
     音声ファイルを文字起こし
@@ -1902,6 +2493,7 @@ async def transcribe_audio(
     Args:
         file: 音声ファイル
         model: 使用するモデル（medium, large-v3）
+        mode: 文字起こし方式（standard, parallel, batched, streaming, refine）
 
     Returns:
         文字起こし結果
@@ -1918,186 +2510,434 @@ async def transcribe_audio(
         if model not in AVAILABLE_MODELS:
             raise HTTPException(status_code=400, detail=f"無効なモデル名です: {model}")
 
+        # 文字起こし方式チェック
+        if mode not in TRANSCRIBE_MODES:
+            raise HTTPException(status_code=400, detail=f"無効な文字起こし方式です: {mode}")
+
         # 一時ファイルとして保存
         file_id = str(uuid.uuid4())
         temp_file = UPLOAD_DIR / f"{file_id}{file_ext}"
 
-        with open(temp_file, "wb") as f:
-            content = await file.read()
-            f.write(content)
+        size, audio_hash = await save_upload_file(file, temp_file)
 
-        logger.info(f"ファイル保存完了: {temp_file.name} ({len(content)} bytes)")
+        logger.info(f"ファイル保存完了: {temp_file.name} ({size} bytes)")
 
-        # 文字起こし実行
-        result = transcription_service.transcribe(
-            audio_path=temp_file, model_name=model, language="ja"
-        )
+        # 文字起こし実行（ジョブスケジューラ経由）
+        cancel_token = CancellationToken()
+
+        def run_transcription():
+            return transcription_service.transcribe(
+                audio_path=temp_file,
+                model_name=model,
+                language="ja",
+                mode=mode,
+                audio_hash=audio_hash,
+                cancel_token=cancel_token,
+            )
+
+        try:
+            job = job_scheduler.submit(
+                run_transcription,
+                model_name=model,
+                priority=PRIORITY_NORMAL,
+                cancel_token=cancel_token,
+            )
+        except QueueFullError as e:
+            cleanup_file(temp_file)
+            raise HTTPException(status_code=503, detail=str(e)) from e
+
+        try:
+            result = await asyncio.wrap_future(job.future)
+        except asyncio.CancelledError:
+            # クライアント切断時は文字起こしも中止
+            job_scheduler.cancel(job.job_id)
+            raise
 
         # バックグラウンドでファイル削除
         background_tasks.add_task(cleanup_file, temp_file)
+        if result.get("success"):
+            schedule_calibration(model)
 
         return JSONResponse(content=result)
 
     except HTTPException:
         raise
+    except UploadTooLargeError as e:
+        raise HTTPException(status_code=413, detail=str(e)) from e
     except Exception as e:
         logger.error(f"❌ 予期しないエラー: {e}", exc_info=True)
         raise HTTPException(status_code=500, detail=str(e)) from e
 
 
+# ジョブを受け付けできない場合のメッセージ
+QUEUE_FULL_MESSAGE = "処理待ちのジョブが多いため受け付けできません。しばらくしてから再度お試しください"
+
+
+def submit_stream_job(transcribe_fn, model: str) -> tuple[Job, asyncio.Queue]:
+    """
+    SSEで進捗を送信する文字起こしジョブをスケジューラに登録
+
+    Args:
+        transcribe_fn: 文字起こしを行う関数（イベント通知関数 notify(種類, 値) と中止トークンを受け取り、結果を返す）
+        model: 使用するモデル
+
+    Returns:
+        tuple[Job, asyncio.Queue]: (登録したジョブ, スレッドからのイベントのキュー)
+
+    Raises:
+        QueueFullError: 処理待ちのジョブが多い場合
+    """
+    # スレッドからのイベントを (種類, 値) でキューに入れる
+    # progress: 進捗(%), segment: セグメント, refined: 確定したグループ（二段階処理）, queue: 待ち順位, started: 実行開始,
+    # done: 完了・取り消し
+    event_queue = asyncio.Queue()
+    loop = asyncio.get_event_loop()
+
+    def notify(kind: str, value=None):
+        """イベントをキューに入れる（イベントループ経由で安全に追加）"""
+        try:
+            loop.call_soon_threadsafe(event_queue.put_nowait, (kind, value))
+        except Exception as e:
+            logger.warning(f"進捗通知エラー: {e}")
+
+    cancel_token = CancellationToken()
+
+    def run_transcription():
+        notify("started")
+        return transcribe_fn(notify, cancel_token)
+
+    job = job_scheduler.submit(
+        run_transcription,
+        model_name=model,
+        priority=PRIORITY_INTERACTIVE,
+        position_callback=lambda position: notify("queue", position),
+        cancel_token=cancel_token,
+    )
+
+    # 完了・取り消し時にイベント待ちをすぐに終える
+    job.future.add_done_callback(lambda _: notify("done"))
+    return job, event_queue
+
+
+def submit_transcription_job(
+    temp_file: Path, model: str, mode: str, audio_hash: str, ranges: Optional[list] = None
+) -> tuple[Job, asyncio.Queue]:
+    """
+    音声ファイルの文字起こしジョブを登録（submit_stream_job参照）
+
+    Args:
+        temp_file: 音声ファイルパス
+        model: 使用するモデル
+        mode: 文字起こし方式
+        audio_hash: 音声ファイルのSHA-256
+        ranges: 文字起こしする時間範囲（全体の場合None）
+    """
+
+    def transcribe_file(notify, cancel_token: CancellationToken) -> dict:
+        return transcription_service.transcribe(
+            audio_path=temp_file,
+            model_name=model,
+            language="ja",
+            progress_callback=lambda progress: notify("progress", int(progress * 100)),
+            mode=mode,
+            audio_hash=audio_hash,
+            segment_callback=lambda segment: notify("segment", segment),
+            cancel_token=cancel_token,
+            refine_callback=lambda group, segments: notify("refined", {"group": group, "segments": segments}),
+            ranges=ranges,
+        )
+
+    return submit_stream_job(transcribe_file, model)
+
+
+async def stream_transcription_job(
+    temp_file: Path, model: str, mode: str, audio_hash: str, ranges: Optional[list] = None
+):
+    """
+    文字起こしジョブをスケジューラに登録し、SSEイベントを生成する
+
+    Args:
+        temp_file: 音声ファイルパス
+        model: 使用するモデル
+        mode: 文字起こし方式
+        audio_hash: 音声ファイルのSHA-256
+        ranges: 文字起こしする時間範囲（全体の場合None）
+
+    Yields:
+        str: SSEイベント
+    """
+    try:
+        job, event_queue = submit_transcription_job(temp_file, model, mode, audio_hash, ranges)
+    except QueueFullError as e:
+        logger.warning(f"⚠️ ジョブ受付不可: {e}")
+        yield f"data: {json.dumps({'error': QUEUE_FULL_MESSAGE})}\n\n"
+        return
+
+    async for event in stream_job_events(job, event_queue, model):
+        yield event
+
+
+async def stream_job_events(job: Job, event_queue: asyncio.Queue, model: str):
+    """
+    登録済みの文字起こしジョブのSSEイベントを生成する
+
+    待機中は待ち順位、実行中は進捗とデコード済みセグメント、最後に結果を送信する
+
+    Args:
+        job: submit_stream_jobで登録したジョブ
+        event_queue: submit_stream_jobが返したイベントのキュー
+        model: 使用するモデル
+
+    Yields:
+        str: SSEイベント
+    """
+    yield f"data: {json.dumps({'progress': 5, 'status': '処理待ち...', 'job_id': job.job_id})}\n\n"
+
+    try:
+        last_progress = 5
+
+        while not job.future.done():
+            try:
+                # ハートビート間隔で進捗を待機
+                async with asyncio.timeout(SSE_HEARTBEAT_INTERVAL):
+                    kind, value = await event_queue.get()
+            except TimeoutError:
+                # タイムアウト時はハートビート送信（SSE接続維持のため）
+                yield ": heartbeat\n\n"
+                logger.debug("💓 ハートビート送信")
+                continue
+
+            if kind == "queue" and job.status == "queued":
+                status_msg = f"順番待ち中（{value + 1}番目）"
+                yield f"data: {json.dumps({'progress': 5, 'status': status_msg, 'job_id': job.job_id, 'queue_position': value})}\n\n"
+            elif kind == "started":
+                # 進捗: モデル読み込み開始
+                from transcribe import check_model_exists
+
+                model_info = check_model_exists(model)
+                if not model_info["exists"]:
+                    # モデルが未ダウンロード - ダウンロードに数分かかることを明示
+                    status_msg = f"音声認識モデルをダウンロード中（約{model_info['size_gb']}GB）\nしばらくお待ちください\n\nダウンロード後、自動的に文字起こしを開始します"
+                else:
+                    status_msg = "音声認識モデル起動中..."
+                yield f"data: {json.dumps({'progress': 5, 'status': status_msg, 'job_id': job.job_id})}\n\n"
+            elif kind == "segment":
+                # デコード済みのセグメントを即座に送信
+                yield f"data: {json.dumps({'segment': value})}\n\n"
+            elif kind == "refined":
+                # 二段階処理: 確定したグループで下書きを置き換える
+                yield f"data: {json.dumps({'refined': value})}\n\n"
+            elif kind == "progress" and value > last_progress:
+                last_progress = value
+                yield f"data: {json.dumps({'progress': value, 'status': '文字起こし中...'})}\n\n"
+                logger.debug(f"📊 進捗送信: {value}%")
+
+        # 完了までにキューに入ったセグメントを送信し切る
+        await asyncio.sleep(0)
+        while not event_queue.empty():
+            kind, value = event_queue.get_nowait()
+            if kind == "segment":
+                yield f"data: {json.dumps({'segment': value})}\n\n"
+            elif kind == "refined":
+                yield f"data: {json.dumps({'refined': value})}\n\n"
+
+        # 結果を取得（待機中に取り消されたジョブは実行されないため、結果がない）
+        if job.future.cancelled():
+            result = {"success": False, "cancelled": True, "error": "文字起こしを中止しました"}
+        else:
+            result = job.future.result()
+
+    except asyncio.CancelledError:
+        # クライアント切断: 待機中なら取り消し、実行中なら次のセグメントの区切りで中止
+        job_scheduler.cancel(job.job_id)
+        raise
+
+    if result.get("success"):
+        # 結果をグローバル変数に保存
+        save_last_transcription(result, model)
+
+        # 完了
+        yield f"data: {json.dumps({'progress': 100, 'status': '完了', 'result': result})}\n\n"
+    elif result.get("cancelled"):
+        # DELETE /jobs/{job_id} による中止
+        yield f"data: {json.dumps({'error': result['error'], 'cancelled': True, 'job_id': job.job_id})}\n\n"
+    else:
+        # エラー
+        yield f"data: {json.dumps({'error': result.get('error', '不明なエラー')})}\n\n"
+
+
 @app.post("/transcribe-stream")
 async def transcribe_stream(
+    request: Request,
     background_tasks: BackgroundTasks,
-    file: UploadFile = File(...),
-    model: str = Form(DEFAULT_MODEL),
+    model: Optional[str] = None,
+    mode: Optional[str] = None,
 ):
     """
     音声ファイルを文字起こし（進捗をリアルタイムで送信）
 
+    進捗に加え、デコード済みのセグメントを {"segment": {...}} イベントとして逐次送信する。
+    標準・ストリーミング処理は、受信済みの部分から窓ごとにVAD・文字起こしを始め、アップロードと推論を並行して行う
+    （結果キャッシュ・チェックポイントは受信完了後、SHA-256が確定してから確認・保存する）。
+    音声全体を使う方式（parallel, batched, refine）は、デコードとVADのみアップロードと並行して行う。
+    並行して処理するため、リクエスト本文（multipart/form-data）はFile()・Form()を使わずに受信しながら保存する
+
     Args:
-        file: 音声ファイル
-        model: 使用するモデル（medium, large-v3）
+        request: リクエスト（フォーム: file, model, mode。modelとmodeはファイルより前に送る）
+        model: 使用するモデル（medium, large-v3。フォームで指定しない場合）
+        mode: 文字起こし方式（standard, parallel, batched, streaming, refine。フォームで指定しない場合）
 
     Returns:
         Server-Sent Eventsストリーム
     """
+    upload = None
+    decoder = None
+    job = None
+    event_queue = None
 
-    async def event_stream():
-        temp_file = None
-        future = None
-        try:
-            # ファイル拡張子チェック
-            file_ext = Path(file.filename).suffix.lower()
-            if file_ext not in ALLOWED_EXTENSIONS:
-                yield f"data: {json.dumps({'error': f'対応していないファイル形式です: {file_ext}'})}\n\n"
-                return
+    def open_destination(filename: str, fields: dict[str, str]) -> Path:
+        nonlocal upload, decoder, job, event_queue, model, mode
 
-            # モデル名チェック
-            if model not in AVAILABLE_MODELS:
-                yield f"data: {json.dumps({'error': f'無効なモデル名です: {model}'})}\n\n"
-                return
+        # ファイル拡張子チェック
+        file_ext = Path(filename).suffix.lower()
+        if file_ext not in ALLOWED_EXTENSIONS:
+            raise ValueError(f"対応していないファイル形式です: {file_ext}")
 
-            # 進捗: ファイル保存開始
-            yield f"data: {json.dumps({'progress': 0, 'status': 'ファイル保存中...'})}\n\n"
-            await asyncio.sleep(0.1)  # イベント送信を確実にするための待機
-
-            # 一時ファイルとして保存
-            file_id = str(uuid.uuid4())
-            temp_file = UPLOAD_DIR / f"{file_id}{file_ext}"
-
-            with open(temp_file, "wb") as f:
-                content = await file.read()
-                f.write(content)
-
-            logger.info(f"ファイル保存完了: {temp_file.name} ({len(content)} bytes)")
-
-            # 進捗: モデル読み込み開始
-            # モデル存在チェック
-            from transcribe import check_model_exists
-
-            model_info = check_model_exists(model)
-            if not model_info["exists"]:
-                # モデルが未ダウンロード - ダウンロードに数分かかることを明示
-                status_msg = f"音声認識モデルをダウンロード中（約{model_info['size_gb']}GB）\nしばらくお待ちください\n\nダウンロード後、自動的に文字起こしを開始します"
-                yield f"data: {json.dumps({'progress': 5, 'status': status_msg})}\n\n"
-            else:
-                yield f"data: {json.dumps({'progress': 5, 'status': '音声認識モデル起動中...'})}\n\n"
-            await asyncio.sleep(0.1)
-
-            # 進捗コールバック関数（同期関数から非同期で呼び出し可能にする）
-            progress_queue = asyncio.Queue()
-            loop = asyncio.get_event_loop()
-
-            def progress_callback(progress: float):
-                """進捗を受け取ってキューに入れる"""
-                percentage = int(progress * 100)
-                # キューに進捗を追加（イベントループ経由で安全に追加）
-                try:
-                    loop.call_soon_threadsafe(progress_queue.put_nowait, percentage)
-                except Exception as e:
-                    logger.warning(f"進捗通知エラー: {e}")
-
-            # 文字起こしを別スレッドで実行
-            import concurrent.futures
-
-            with concurrent.futures.ThreadPoolExecutor() as executor:
-                # 文字起こしタスクを開始
-                future = executor.submit(
-                    transcription_service.transcribe,
-                    audio_path=temp_file,
+        # モデル名・文字起こし方式チェック（無効な場合はファイルを受信しない）
+        model = fields.get("model") or model or DEFAULT_MODEL
+        if model not in AVAILABLE_MODELS:
+            raise ValueError(f"無効なモデル名です: {model}")
+        mode = fields.get("mode") or mode or DEFAULT_TRANSCRIBE_MODE
+        if mode not in TRANSCRIBE_MODES:
+            raise ValueError(f"無効な文字起こし方式です: {mode}")
+
+        # 一時ファイルとして保存
+        temp_file = UPLOAD_DIR / f"{uuid.uuid4()}{file_ext}"
+        upload = GrowingFile(temp_file)
+
+        if mode in ("standard", "streaming"):
+            # 書き込み済みの部分から、窓ごとにVAD・文字起こしを始める
+            def transcribe_upload(notify, cancel_token: CancellationToken) -> dict:
+                return transcription_service.transcribe_upload(
+                    upload,
                     model_name=model,
                     language="ja",
-                    progress_callback=progress_callback,
+                    mode=mode,
+                    progress_callback=lambda progress: notify("progress", int(progress * 100)),
+                    segment_callback=lambda segment: notify("segment", segment),
+                    cancel_token=cancel_token,
                 )
 
-                # 進捗を送信しながら完了を待つ
-                last_progress = 5
-
-                while not future.done():
-                    try:
-                        # ハートビート間隔で進捗を待機
-                        async with asyncio.timeout(SSE_HEARTBEAT_INTERVAL):
-                            progress = await progress_queue.get()
-                            if progress > last_progress:
-                                last_progress = progress
-                                yield f"data: {json.dumps({'progress': progress, 'status': '文字起こし中...'})}\n\n"
-                                logger.debug(f"📊 進捗送信: {progress}%")
-                    except TimeoutError:
-                        # タイムアウト時はハートビート送信（SSE接続維持のため）
-                        yield ": heartbeat\n\n"
-                        logger.debug("💓 ハートビート送信")
-
-                # 結果を取得
-                result = future.result()
-
-            if result.get("success"):
-                # 結果をグローバル変数に保存
-                last_transcription["text"] = result.get("text", "")
-                last_transcription["processing_time"] = result.get("duration", 0)
-                last_transcription["timestamp"] = datetime.now()
-                last_transcription["model"] = model
-
-                # 完了
-                yield f"data: {json.dumps({'progress': 100, 'status': '完了', 'result': result})}\n\n"
-            else:
-                # エラー
-                yield f"data: {json.dumps({'error': result.get('error', '不明なエラー')})}\n\n"
+            try:
+                job, event_queue = submit_stream_job(transcribe_upload, model)
+            except QueueFullError as e:
+                logger.warning(f"⚠️ ジョブ受付不可: {e}")
+                raise ValueError(QUEUE_FULL_MESSAGE) from e
+        else:
+            # 音声全体を使う方式は、書き込み済みの部分から先行してデコード・VADのみ行う
+            decoder = ProgressiveDecoder(upload, VAD_PARAMETERS)
+            decoder.start()
+        return temp_file
+
+    def discard():
+        """受信中に始めた処理を中止し、ファイルを削除（スレッドの終了は待たない）"""
+        if upload:
+            asyncio.get_running_loop().run_in_executor(None, discard_upload, upload, decoder, job)
+
+    # StreamingResponseは応答中に受信側を切断の検知に使うため、本文は応答を返す前に受信する
+    try:
+        form = await receive_multipart_upload(
+            request, "file", open_destination, on_progress=lambda size: upload.extend(size)
+        )
+    except ClientDisconnect:
+        discard()
+        logger.info("🔌 アップロード中にクライアント切断")
+        return Response(status_code=400)
+    except (ValueError, UploadTooLargeError) as e:
+        discard()
+        message = str(e)
+
+        async def error_stream():
+            yield f"data: {json.dumps({'error': message})}\n\n"
+
+        return StreamingResponse(error_stream(), media_type="text/event-stream")
+    except BaseException:
+        discard()
+        raise
+    upload.finish(form.sha256)
+
+    temp_file = form.path
+    logger.info(f"ファイル保存完了: {temp_file.name} ({form.size} bytes)")
+
+    async def event_stream():
+        nonlocal job, event_queue
+        try:
+            # 結果キャッシュを確認（同じ音声・同じ条件なら、受信中に始めた処理を中止して即座に結果を返す）
+            audio_hash, cached_result = await asyncio.to_thread(
+                transcription_service.lookup_cached_result, temp_file, model, "ja", mode, None, form.sha256
+            )
+            if cached_result is not None:
+                save_last_transcription(cached_result, model)
+                yield f"data: {json.dumps({'progress': 100, 'status': '完了（前回の結果を再利用）', 'cache_hit': True, 'result': cached_result})}\n\n"
+                background_tasks.add_task(discard_upload, upload, decoder, job)
+                return
+
+            if job is None:
+                # 先行デコードの結果をデコード済み音声・発話区間キャッシュに保存（文字起こし時のデコードとVADを省略）
+                if decoder:
+                    await asyncio.to_thread(decoder.store, audio_hash)
+                try:
+                    job, event_queue = submit_transcription_job(temp_file, model, mode, audio_hash)
+                except QueueFullError as e:
+                    logger.warning(f"⚠️ ジョブ受付不可: {e}")
+                    yield f"data: {json.dumps({'error': QUEUE_FULL_MESSAGE})}\n\n"
+                    background_tasks.add_task(cleanup_file, temp_file)
+                    return
+
+            # 進捗を送信しながら完了を待つ（受信中に始めた文字起こしは、それまでのセグメントから送信）
+            async for event in stream_job_events(job, event_queue, model):
+                yield event
 
             # バックグラウンドでファイル削除
-            if temp_file:
-                background_tasks.add_task(cleanup_file, temp_file)
+            background_tasks.add_task(cleanup_file, temp_file)
 
         except asyncio.CancelledError:
             logger.info("🔌 クライアント切断検知")
-            if future:
-                future.cancel()
+            # 先行デコード・文字起こしを中止し、スレッドの終了後にファイル削除
+            discard()
             raise
         except Exception as e:
             logger.error(f"❌ ストリーム処理エラー: {e}", exc_info=True)
             yield f"data: {json.dumps({'error': str(e)})}\n\n"
 
             # エラー時もファイル削除
-            if temp_file:
-                background_tasks.add_task(cleanup_file, temp_file)
-        finally:
-            # クリーンアップ処理
-            pass
+            background_tasks.add_task(discard_upload, upload, decoder, job)
 
     return StreamingResponse(event_stream(), media_type="text/event-stream")
 
 
 @app.get("/transcribe-stream-by-id")
 async def transcribe_stream_by_id(
-    background_tasks: BackgroundTasks,
     file_id: str,
     model: str = DEFAULT_MODEL,
+    mode: str = DEFAULT_TRANSCRIBE_MODE,
+    start: Optional[float] = None,
+    end: Optional[float] = None,
+    ranges: Optional[str] = None,
 ):
     """
     アップロード済みファイルをfile_idで文字起こし（pywebview環境用）
 
+    進捗に加え、デコード済みのセグメントを {"segment": {...}} イベントとして逐次送信する。
+    start/end または ranges を指定した場合は、その範囲のみをデコード・文字起こしする
+
     Args:
         file_id: アップロード済みファイルのID
         model: 使用するモデル（medium, large-v3）
+        mode: 文字起こし方式（standard, parallel, batched, streaming, refine）
+        start: 開始時刻（秒）
+        end: 終了時刻（秒）
+        ranges: 複数の範囲（"開始-終了,開始-終了"、秒）。start/endより優先
 
     Returns:
         Server-Sent Eventsストリーム
@@ -2105,19 +2945,20 @@ async def transcribe_stream_by_id(
 
     async def event_stream():
         temp_file = None
-        future = None
+        # 文字起こし（結果キャッシュの再利用を含む）に使い、参照を1つ消費する場合True
+        acquired = False
+        transcribing = False
         try:
             # file_idからファイルパスを検索
-            logger.info(f"file_idから文字起こし開始: {file_id}, model: {model}")
+            logger.info(f"file_idから文字起こし開始: {file_id}, model: {model}, mode: {mode}")
 
-            # UPLOAD_DIR内のファイルを検索
-            matching_files = list(UPLOAD_DIR.glob(f"{file_id}*"))
+            upload = await asyncio.to_thread(upload_registry.get, file_id)
 
-            if not matching_files:
+            if upload is None:
                 yield f"data: {json.dumps({'error': f'ファイルが見つかりません: {file_id}'})}\n\n"
                 return
+            temp_file = upload["path"]
 
-            temp_file = matching_files[0]
             logger.info(f"ファイル検出: {temp_file}")
 
             # ファイル拡張子チェック
@@ -2131,94 +2972,55 @@ async def transcribe_stream_by_id(
                 yield f"data: {json.dumps({'error': f'無効なモデル名です: {model}'})}\n\n"
                 return
 
-            # 進捗: モデル読み込み開始
-            from transcribe import check_model_exists
-
-            model_info = check_model_exists(model)
-            if not model_info["exists"]:
-                status_msg = f"音声認識モデルをダウンロード中（約{model_info['size_gb']}GB）\nしばらくお待ちください\n\nダウンロード後、自動的に文字起こしを開始します"
-                yield f"data: {json.dumps({'progress': 5, 'status': status_msg})}\n\n"
-            else:
-                yield f"data: {json.dumps({'progress': 5, 'status': '音声認識モデル起動中...'})}\n\n"
-            await asyncio.sleep(0.1)
+            # 文字起こし方式チェック
+            if mode not in TRANSCRIBE_MODES:
+                yield f"data: {json.dumps({'error': f'無効な文字起こし方式です: {mode}'})}\n\n"
+                return
 
-            # 進捗コールバック関数
-            progress_queue = asyncio.Queue()
-            loop = asyncio.get_event_loop()
+            # 時間範囲チェック
+            try:
+                time_ranges = parse_time_ranges(start, end, ranges)
+            except ValueError as e:
+                yield f"data: {json.dumps({'error': str(e)})}\n\n"
+                return
 
-            def progress_callback(progress: float):
-                """進捗を受け取ってキューに入れる"""
-                percentage = int(progress * 100)
-                try:
-                    loop.call_soon_threadsafe(progress_queue.put_nowait, percentage)
-                except Exception as e:
-                    logger.warning(f"進捗通知エラー: {e}")
-
-            # 文字起こしを別スレッドで実行
-            import concurrent.futures
-
-            with concurrent.futures.ThreadPoolExecutor() as executor:
-                # 文字起こしタスクを開始
-                future = executor.submit(
-                    transcription_service.transcribe,
-                    audio_path=temp_file,
-                    model_name=model,
-                    language="ja",
-                    progress_callback=progress_callback,
-                )
+            # 結果キャッシュを確認（同じ音声・同じ条件なら即座に結果を返す。SHA-256は登録時に計算済みなら再利用）
+            acquired = True
+            audio_hash, cached_result = await asyncio.to_thread(
+                transcription_service.lookup_cached_result,
+                temp_file,
+                model,
+                "ja",
+                mode,
+                time_ranges,
+                upload["sha256"],
+            )
+            if cached_result is not None:
+                save_last_transcription(cached_result, model)
+                yield f"data: {json.dumps({'progress': 100, 'status': '完了（前回の結果を再利用）', 'cache_hit': True, 'result': cached_result})}\n\n"
+                return
 
-                # 進捗を送信しながら完了を待つ
-                last_progress = 5
-
-                while not future.done():
-                    try:
-                        # ハートビート間隔で進捗を待機
-                        async with asyncio.timeout(SSE_HEARTBEAT_INTERVAL):
-                            progress = await progress_queue.get()
-                            if progress > last_progress:
-                                last_progress = progress
-                                yield f"data: {json.dumps({'progress': progress, 'status': '文字起こし中...'})}\n\n"
-                                logger.debug(f"📊 進捗送信: {progress}%")
-                    except TimeoutError:
-                        # タイムアウト時はハートビート送信（SSE接続維持のため）
-                        yield ": heartbeat\n\n"
-                        logger.debug("💓 ハートビート送信")
-
-                # 結果を取得
-                result = future.result()
-
-            if result.get("success"):
-                # 結果をグローバル変数に保存
-                last_transcription["text"] = result.get("text", "")
-                last_transcription["processing_time"] = result.get("duration", 0)
-                last_transcription["timestamp"] = datetime.now()
-                last_transcription["model"] = model
-
-                # 完了
-                yield f"data: {json.dumps({'progress': 100, 'status': '完了', 'result': result})}\n\n"
-            else:
-                # エラー
-                yield f"data: {json.dumps({'error': result.get('error', '不明なエラー')})}\n\n"
+            if not upload["sha256"]:
+                await asyncio.to_thread(upload_registry.update, file_id, sha256=audio_hash)
+            # 待機中に切断されても片付ける際に数を戻せるよう、先にフラグを立てる（0未満にはならない）
+            transcribing = True
+            await asyncio.to_thread(upload_registry.begin_transcription, file_id)
 
-            # バックグラウンドでファイル削除
-            if temp_file:
-                background_tasks.add_task(cleanup_file, temp_file)
+            # 文字起こしジョブを登録し、進捗を送信しながら完了を待つ
+            async for event in stream_transcription_job(temp_file, model, mode, audio_hash, time_ranges):
+                yield event
 
         except asyncio.CancelledError:
             logger.info("🔌 クライアント切断検知 (file_id)")
-            if future:
-                future.cancel()
             raise
         except Exception as e:
             logger.error(f"❌ ストリーム処理エラー (file_id): {e}", exc_info=True)
             yield f"data: {json.dumps({'error': str(e)})}\n\n"
-
-            # エラー時もファイル削除
-            if temp_file:
-                background_tasks.add_task(cleanup_file, temp_file)
         finally:
-            # クリーンアップ処理
-            pass
+            # 完了・エラー・クライアント切断のいずれでも1回だけ片付ける
+            # （切断時はBackgroundTasksが実行されず、キャンセル中はawaitできないため、スレッドで実行して待たない）
+            if acquired:
+                asyncio.get_running_loop().run_in_executor(None, upload_registry.release, file_id, transcribing)
 
     return StreamingResponse(event_stream(), media_type="text/event-stream")
 
@@ -2239,6 +3041,8 @@ async def delete_model_endpoint(model_name: str):
     result = delete_model(model_name)
 
     if result["success"]:
+        # 常駐中のモデルもプールから退避してメモリを解放
+        transcription_service.model_pool.evict_model(model_name)
         return JSONResponse(content=result)
     return JSONResponse(content=result, status_code=400)
 
@@ -0,0 +1,171 @@
+"""
+モデルインベントリ
+ダウンロード済みモデルのサイズ・パスをキャッシュし、ディレクトリの更新時刻が変わった場合のみ再計算する
+"""
+
+import logging
+import threading
+from pathlib import Path
+from typing import Optional
+
+logger = logging.getLogger(__name__)
+
+# Hugging Face Hubのキャッシュディレクトリ
+HF_HUB_CACHE_DIR = Path.home() / ".cache" / "huggingface" / "hub"
+
+# 推定サイズ（未ダウンロード時、GB単位）
+MODEL_SIZE_ESTIMATES_GB = {
+    "tiny": 0.075,
+    "base": 0.14,
+    "small": 0.46,
+    "medium": 1.5,
+    "large-v2": 2.9,
+    "large-v3": 2.9,
+}
+
+
+def model_cache_dir(model_name: str, cache_dir: Path = HF_HUB_CACHE_DIR) -> Path:
+    """
+    モデルのキャッシュディレクトリ
+
+    Args:
+        model_name: モデル名（medium, large-v3など）
+        cache_dir: Hugging Face Hubのキャッシュディレクトリ
+
+    Returns:
+        Path: models--Systran--faster-whisper-{model_name}
+    """
+    return cache_dir / f"models--Systran--faster-whisper-{model_name}"
+
+
+class ModelInventory:
+    """
+    ダウンロード済みモデルの情報（存在・サイズ・パス）のキャッシュ
+
+    モデルディレクトリ直下・blobs・snapshots・各スナップショットの更新時刻を
+    シグネチャとして保持し、変わっていなければ全ファイルを走査せずにキャッシュを返す。
+    ファイルの追加・削除・名前変更でディレクトリの更新時刻は変わるため、
+    ダウンロード完了や削除は自動的に検知される（アプリ内の操作では明示的にも無効化する）。
+    """
+
+    def __init__(self, cache_dir: Path = HF_HUB_CACHE_DIR):
+        """
+        Args:
+            cache_dir: Hugging Face Hubのキャッシュディレクトリ
+        """
+        self.cache_dir = cache_dir
+        self._entries: dict[str, tuple[tuple, dict]] = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, model_name: str) -> dict:
+        """
+        モデルの情報を取得
+
+        Args:
+            model_name: モデル名（medium, large-v3など）
+
+        Returns:
+            dict: {
+                'exists': bool,      # モデルが存在するか
+                'size_gb': float,    # サイズ（GB単位、未ダウンロード時は推定値）
+                'path': str          # モデルパス（存在する場合のみ）
+            }
+        """
+        model_dir = model_cache_dir(model_name, self.cache_dir)
+        signature = self._signature(model_dir)
+
+        with self._lock:
+            cached = self._entries.get(model_name)
+            if cached is not None and cached[0] == signature:
+                self.hits += 1
+                return dict(cached[1])
+            self.misses += 1
+
+        info = self._scan(model_name, model_dir, exists=signature is not None)
+
+        with self._lock:
+            self._entries[model_name] = (signature, info)
+        return dict(info)
+
+    def invalidate(self, model_name: Optional[str] = None) -> None:
+        """
+        キャッシュを無効化（ダウンロード・削除の後に呼ぶ）
+
+        Args:
+            model_name: モデル名（Noneの場合は全モデル）
+        """
+        with self._lock:
+            if model_name is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(model_name, None)
+
+    def stats(self) -> dict:
+        """
+        キャッシュの統計情報
+
+        Returns:
+            dict: {'entries', 'hits', 'misses'}
+        """
+        with self._lock:
+            return {"entries": len(self._entries), "hits": self.hits, "misses": self.misses}
+
+    @staticmethod
+    def _signature(model_dir: Path) -> Optional[tuple]:
+        """
+        ディレクトリ構成のシグネチャ（更新時刻の組）
+
+        Returns:
+            tuple: シグネチャ（モデルディレクトリが存在しない場合None）
+        """
+        try:
+            signature = [model_dir.stat().st_mtime_ns]
+        except OSError:
+            return None
+
+        for name in ("blobs", "snapshots", "refs"):
+            try:
+                signature.append((model_dir / name).stat().st_mtime_ns)
+            except OSError:
+                signature.append(None)
+
+        # シンボリックリンクを使えない環境では、実ファイルがスナップショット内に直接置かれる
+        try:
+            for snapshot in (model_dir / "snapshots").iterdir():
+                signature.append((snapshot.name, snapshot.stat().st_mtime_ns))
+        except OSError:
+            pass
+
+        return tuple(signature)
+
+    @staticmethod
+    def _scan(model_name: str, model_dir: Path, exists: bool) -> dict:
+        """モデルディレクトリを走査してサイズを計算"""
+        if not exists:
+            return {
+                "exists": False,
+                "size_gb": round(MODEL_SIZE_ESTIMATES_GB.get(model_name, 1.5), 2),
+                "path": None,
+            }
+
+        total_size = 0
+        for path in model_dir.rglob("*"):
+            try:
+                if path.is_file():
+                    total_size += path.stat().st_size
+            except OSError:
+                # 走査中にダウンロード・削除でファイルが消えた場合
+                continue
+
+        logger.debug(f"モデルディレクトリを走査: {model_name} ({total_size / (1024**3):.2f}GB)")
+        return {
+            "exists": True,
+            "size_gb": round(total_size / (1024**3), 2),
+            "path": str(model_dir),
+        }
+
+
+# グローバルインスタンス（シングルトン）
+model_inventory = ModelInventory()
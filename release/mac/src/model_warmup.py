@@ -0,0 +1,159 @@
+"""
+モデルのプリロードとウォームアップ
+サーバー起動時にモデルをロードし、短い無音で初回推論を済ませておく
+（初回リクエストでのモデル構築・メモリ確保の待ち時間をなくす）
+"""
+
+import json
+import logging
+import threading
+import time
+from pathlib import Path
+from typing import Optional
+
+from config import AVAILABLE_MODELS, LAST_USED_MODEL_PATH
+from speech_chunks import SAMPLING_RATE, detect_speech_chunks
+from transcribe import VAD_PARAMETERS, TranscriptionService, check_model_exists, transcription_service
+
+logger = logging.getLogger(__name__)
+
+# ウォームアップに使う無音の長さ（秒）
+WARMUP_SECONDS = 1
+
+
+class ModelWarmup:
+    """
+    モデルのプリロード・ウォームアップと、その状態の管理
+
+    状態: pending（未開始）→ loading（ロード・ウォームアップ中）→ ready / failed
+    """
+
+    def __init__(self, service: TranscriptionService, last_used_path: Path):
+        """
+        Args:
+            service: 文字起こしサービス
+            last_used_path: 前回使用したモデルの保存先
+        """
+        self._service = service
+        self._last_used_path = last_used_path
+        self._states: dict[str, dict] = {}
+        self._lock = threading.Lock()
+
+    def warm_up(self, model_name: str) -> bool:
+        """
+        モデルをロードし、無音でウォームアップ推論を行う
+
+        未ダウンロードのモデルはダウンロードを発生させずにスキップする。
+
+        Args:
+            model_name: モデル名
+
+        Returns:
+            bool: 成功した場合True
+        """
+        if not check_model_exists(model_name)["exists"]:
+            logger.info(f"プリロードをスキップ（未ダウンロード）: {model_name}")
+            return False
+
+        self._set_state(model_name, state="loading")
+        logger.info(f"🔥 モデルのプリロード開始: {model_name}")
+
+        try:
+            start_time = time.time()
+            model = self._service.load_model(model_name)
+            load_seconds = time.time() - start_time
+
+            # 初回推論のメモリ確保・VADモデルの読み込みを済ませる
+            import numpy as np
+
+            start_time = time.time()
+            silence = np.zeros(SAMPLING_RATE * WARMUP_SECONDS, dtype=np.float32)
+            segments, _ = model.transcribe(
+                silence, language="ja", vad_filter=False, without_timestamps=True, max_new_tokens=4
+            )
+            for _ in segments:
+                pass
+            detect_speech_chunks(silence, VAD_PARAMETERS)
+            warmup_seconds = time.time() - start_time
+        except Exception as e:
+            logger.warning(f"⚠️ プリロード失敗: {model_name} - {e}")
+            self._set_state(model_name, state="failed", error=str(e))
+            return False
+
+        self._set_state(
+            model_name,
+            state="ready",
+            load_seconds=round(load_seconds, 2),
+            warmup_seconds=round(warmup_seconds, 2),
+        )
+        logger.info(
+            f"✅ プリロード完了: {model_name} (ロード {load_seconds:.1f}秒, ウォームアップ {warmup_seconds:.1f}秒)"
+        )
+        return True
+
+    def preload(self, model_names: list[str]) -> None:
+        """
+        複数のモデルを順番にプリロード（重複は除く）
+
+        Args:
+            model_names: モデル名のリスト
+        """
+        for model_name in dict.fromkeys(model_names):
+            self.warm_up(model_name)
+
+    def is_ready(self, model_name: str) -> bool:
+        """モデルがウォームアップ済みで、現在も常駐しているかどうか"""
+        with self._lock:
+            warmed = self._states.get(model_name, {}).get("state") == "ready"
+        return warmed and model_name in self._service.model_pool.resident_model_names()
+
+    def status(self) -> dict:
+        """
+        プリロードの状態を取得
+
+        Returns:
+            dict: {モデル名: {'state', 'resident', 'load_seconds', 'warmup_seconds', ...}}
+        """
+        resident = self._service.model_pool.resident_model_names()
+        with self._lock:
+            return {
+                name: {**state, "resident": name in resident} for name, state in self._states.items()
+            }
+
+    def remember_last_used(self, model_name: str) -> None:
+        """
+        使用したモデルを保存（次回起動時のプリロード対象）
+
+        Args:
+            model_name: モデル名
+        """
+        if model_name == self.last_used():
+            return
+        try:
+            self._last_used_path.parent.mkdir(parents=True, exist_ok=True)
+            with open(self._last_used_path, "w", encoding="utf-8") as f:
+                json.dump({"model": model_name}, f)
+        except OSError as e:
+            logger.warning(f"⚠️ 使用モデルの保存に失敗: {e}")
+
+    def last_used(self) -> Optional[str]:
+        """
+        前回使用したモデルを取得
+
+        Returns:
+            str: モデル名（記録がない場合None）
+        """
+        try:
+            with open(self._last_used_path, "r", encoding="utf-8") as f:
+                model_name = json.load(f).get("model")
+        except (OSError, json.JSONDecodeError):
+            return None
+        return model_name if model_name in AVAILABLE_MODELS else None
+
+    def _set_state(self, model_name: str, **state) -> None:
+        with self._lock:
+            self._states[model_name] = {**state, "updated_at": time.time()}
+
+
+# グローバルインスタンス（シングルトン）
+model_warmup = ModelWarmup(transcription_service, LAST_USED_MODEL_PATH)
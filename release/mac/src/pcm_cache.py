@@ -0,0 +1,188 @@
+"""
+デコード済み音声キャッシュ
+音声ファイルの内容（SHA-256）ごとに、デコード済みの16kHzモノラルPCM（float32）を.npyで保存し、
+2回目以降はメモリマップで読み込む（モデルを変えての再実行や再試行でデコードを省略する）
+"""
+
+import logging
+import os
+import threading
+import time
+from pathlib import Path
+from typing import TYPE_CHECKING, Optional
+
+from config import PCM_CACHE_DIR, PCM_CACHE_MAX_MB
+from lazy_imports import load_faster_whisper
+from speech_chunks import SAMPLING_RATE
+
+# numpyは起動を速くするため、使用時に読み込む（lazy_imports）
+if TYPE_CHECKING:
+    import numpy as np
+
+logger = logging.getLogger(__name__)
+
+
+class PcmCache:
+    """
+    ディスク上のデコード済み音声キャッシュ
+
+    1音声を1つの.npyファイルとして保存し、読み込み時は読み取り専用のメモリマップを返す
+    （ページはOSのファイルキャッシュと共有され、必要な部分だけが読み込まれる）。
+    合計サイズが上限を超えた場合は、最終アクセス（mtime）が古いものから削除する（LRU）
+    """
+
+    def __init__(self, cache_dir: Path, max_bytes: int):
+        """
+        Args:
+            cache_dir: キャッシュディレクトリ
+            max_bytes: キャッシュの最大合計サイズ（バイト）
+        """
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+
+    def get(self, audio_hash: str) -> Optional["np.ndarray"]:
+        """
+        キャッシュからデコード済み音声を取得
+
+        Args:
+            audio_hash: 音声ファイルのSHA-256
+
+        Returns:
+            np.ndarray: 読み取り専用のメモリマップ（存在しない場合None）
+        """
+        import numpy as np
+
+        path = self._path(audio_hash)
+        try:
+            audio = np.load(path, mmap_mode="r")
+            # LRU用に最終アクセス時刻を更新
+            os.utime(path, None)
+            return audio
+        except FileNotFoundError:
+            return None
+        except (ValueError, OSError) as e:
+            logger.warning(f"⚠️ デコード済み音声の読み込み失敗（破損として削除）: {path.name} - {e}")
+            self._remove(path)
+            return None
+
+    def put(self, audio_hash: str, audio: "np.ndarray") -> None:
+        """
+        デコード済み音声を保存（上限より大きい音声は保存しない）
+
+        Args:
+            audio_hash: 音声ファイルのSHA-256
+            audio: 16kHzモノラルの音声データ
+        """
+        import numpy as np
+
+        if audio.nbytes > self.max_bytes:
+            return
+
+        path = self._path(audio_hash)
+        tmp_path = path.with_name(f"{path.name}.{threading.get_ident()}.tmp")
+        try:
+            with open(tmp_path, "wb") as f:
+                np.save(f, audio, allow_pickle=False)
+            os.replace(tmp_path, path)
+        except OSError as e:
+            logger.warning(f"⚠️ デコード済み音声の保存失敗: {e}")
+            self._remove(tmp_path)
+            return
+
+        self._evict()
+
+    def load_audio(self, audio_path: Path, audio_hash: Optional[str]) -> "np.ndarray":
+        """
+        音声を読み込む（キャッシュにあればデコードせずにメモリマップで返す）
+
+        Args:
+            audio_path: 音声ファイルパス
+            audio_hash: 音声ファイルのSHA-256（Noneの場合はキャッシュを使わない）
+
+        Returns:
+            np.ndarray: 16kHzモノラルの音声データ
+        """
+        if audio_hash is not None:
+            audio = self.get(audio_hash)
+            if audio is not None:
+                logger.info(f"♻️ デコード済み音声を再利用: {audio_path.name} ({len(audio) / SAMPLING_RATE:.0f}秒)")
+                return audio
+
+        start_time = time.time()
+        audio = load_faster_whisper().decode_audio(str(audio_path), sampling_rate=SAMPLING_RATE)
+        logger.info(f"音声デコード完了: {audio_path.name} ({time.time() - start_time:.1f}秒)")
+
+        if audio_hash is not None:
+            self.put(audio_hash, audio)
+        return audio
+
+    def clear(self) -> None:
+        """キャッシュを全て削除"""
+        with self._lock:
+            for path in self.cache_dir.glob("*.npy"):
+                self._remove(path)
+
+    def stats(self) -> dict:
+        """
+        キャッシュの状態を取得
+
+        Returns:
+            dict: {'entries': int, 'size_mb': float, 'max_mb': float}
+        """
+        files = list(self.cache_dir.glob("*.npy"))
+        total = sum(self._size(path) for path in files)
+        return {
+            "entries": len(files),
+            "size_mb": round(total / (1024**2), 2),
+            "max_mb": round(self.max_bytes / (1024**2), 2),
+        }
+
+    def _path(self, audio_hash: str) -> Path:
+        return self.cache_dir / f"{audio_hash}.npy"
+
+    def _evict(self) -> None:
+        """合計サイズが上限以下になるまで、古いエントリから削除"""
+        with self._lock:
+            entries = []
+            for path in self.cache_dir.glob("*.npy"):
+                try:
+                    stat = path.stat()
+                except OSError:
+                    continue
+                entries.append((stat.st_mtime, stat.st_size, path))
+
+            total = sum(size for _, size, _ in entries)
+            if total <= self.max_bytes:
+                return
+
+            entries.sort()
+            removed = 0
+            for _, size, path in entries:
+                if total <= self.max_bytes:
+                    break
+                # Windowsではメモリマップで使用中のファイルは削除できない（次回の削除時に再試行）
+                if self._remove(path):
+                    total -= size
+                    removed += 1
+            logger.info(f"🗑️ デコード済み音声を{removed}件削除（LRU、上限 {self.max_bytes / (1024**2):.0f}MB）")
+
+    @staticmethod
+    def _size(path: Path) -> int:
+        try:
+            return path.stat().st_size
+        except OSError:
+            return 0
+
+    @staticmethod
+    def _remove(path: Path) -> bool:
+        try:
+            path.unlink()
+            return True
+        except OSError:
+            return False
+
+
+# グローバルインスタンス（シングルトン）
+pcm_cache = PcmCache(PCM_CACHE_DIR, PCM_CACHE_MAX_MB * 1024 * 1024)
@@ -0,0 +1,273 @@
+"""
+アップロード中の音声の先行デコード
+書き込み中のファイルを、書き込まれた分から順にPyAVでデコード・VADし、アップロードと並行して行う。
+ファイルは先頭から順に読むだけ（シーク不可）として渡すため、WAV・MP3・FLAC・OGG・fragmented MP4などは
+届いた分から読み進められる。末尾の情報が必要な形式（moovが末尾にあるMP4など）は先行デコードに失敗するが、
+文字起こし時に通常通りデコードするため結果は変わらない
+"""
+
+import io
+import logging
+import threading
+import time
+from pathlib import Path
+from typing import TYPE_CHECKING, Optional
+
+from audio_stream import iter_audio_windows
+from pcm_cache import pcm_cache
+from speech_chunks import SAMPLING_RATE, iter_speech_windows
+from vad_cache import make_vad_cache_key, vad_cache
+
+# numpyは起動を速くするため、使用時に読み込む（lazy_imports）
+if TYPE_CHECKING:
+    import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# 先行デコード・文字起こしで1回に処理する音声の長さ（秒）
+DECODE_WINDOW_SECONDS = 60
+
+
+class UploadAborted(OSError):
+    """アップロードが中断された（先行デコードも中止する）"""
+
+
+class GrowingFile:
+    """
+    書き込み中のファイル
+
+    書き込み側（アップロード）はextend()で書き込み済みのサイズを通知し、最後にfinish()を呼ぶ。
+    読み込み側はopen()で得たファイルオブジェクトから読み込み、まだ届いていない位置は届くまで待つ
+    """
+
+    def __init__(self, path: Path):
+        """
+        Args:
+            path: 書き込み中のファイルパス
+        """
+        self.path = path
+        # ファイル全体のSHA-256（finish()で通知されるまではNone）
+        self.sha256: Optional[str] = None
+        self._size = 0
+        self._complete = False
+        self._aborted = False
+        self._condition = threading.Condition()
+
+    def extend(self, size: int) -> None:
+        """書き込み済みのサイズを通知（ディスクにフラッシュした後に呼ぶ）"""
+        with self._condition:
+            self._size = size
+            self._condition.notify_all()
+
+    def finish(self, sha256: Optional[str] = None) -> None:
+        """
+        書き込み完了を通知
+
+        Args:
+            sha256: ファイル全体のSHA-256（読み込み側が結果キャッシュなどのキーに使う）
+        """
+        with self._condition:
+            self.sha256 = sha256
+            self._complete = True
+            self._condition.notify_all()
+
+    def abort(self) -> None:
+        """書き込みの中断を通知（待機中の読み込みはUploadAbortedになる）"""
+        with self._condition:
+            self._aborted = True
+            self._condition.notify_all()
+
+    @property
+    def complete(self) -> bool:
+        """書き込みが完了したかどうか"""
+        return self._complete
+
+    @property
+    def aborted(self) -> bool:
+        """書き込みが中断されたかどうか"""
+        return self._aborted
+
+    def available(self, end: int) -> bool:
+        """指定位置まで書き込み済み（または書き込み完了）かどうか"""
+        with self._condition:
+            return self._complete or self._size >= end
+
+    def wait_for(self, end: int) -> int:
+        """
+        指定位置まで書き込まれるか、書き込みが完了するまで待つ
+
+        Args:
+            end: 読み込みたい末尾の位置（バイト）
+
+        Returns:
+            int: 書き込み済みのサイズ
+
+        Raises:
+            UploadAborted: 書き込みが中断された場合
+        """
+        with self._condition:
+            while not self._aborted and not self._complete and self._size < end:
+                self._condition.wait()
+            if self._aborted:
+                raise UploadAborted("アップロードが中断されました")
+            return self._size
+
+    def open(self) -> "_GrowingFileReader":
+        """読み込み用のファイルオブジェクトを開く"""
+        return _GrowingFileReader(self)
+
+
+class _GrowingFileReader(io.RawIOBase):
+    """
+    書き込み中のファイルを先頭から順に読み込む（届いていない位置は届くまで待つ）
+
+    シーク不可として扱う（シーク可能にするとPyAVがファイルサイズを確認するため、アップロードの完了を待ってしまう）。
+
+    待機中はファイルを閉じておく（Windowsでは開いたままだと、アップロード失敗時の削除ができないため）
+    """
+
+    def __init__(self, growing: GrowingFile):
+        super().__init__()
+        self._growing = growing
+        self._file = None
+        self._position = 0
+
+    def readable(self) -> bool:
+        return True
+
+    def seekable(self) -> bool:
+        return False
+
+    def readinto(self, buffer) -> int:
+        end = self._position + len(buffer)
+        if not self._growing.available(end):
+            self._close_file()
+        available = self._growing.wait_for(end)
+        size = min(len(buffer), available - self._position)
+        if size <= 0:
+            return 0
+        if self._file is None:
+            self._file = open(self._growing.path, "rb")
+        self._file.seek(self._position)
+        read = self._file.readinto(memoryview(buffer)[:size])
+        self._position += read
+        return read
+
+    def tell(self) -> int:
+        return self._position
+
+    def close(self) -> None:
+        self._close_file()
+        super().close()
+
+    def _close_file(self) -> None:
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+
+class ProgressiveDecoder:
+    """
+    書き込み中のファイルをバックグラウンドスレッドでデコードし、窓ごとに発話区間を検出
+
+    デコード結果と発話区間はstore()でデコード済み音声キャッシュ・発話区間キャッシュに保存し、
+    文字起こし時のデコードとVADを省略する。失敗した場合は何も保存せず、文字起こし時に通常通り処理する
+    """
+
+    def __init__(self, growing: GrowingFile, vad_parameters: dict):
+        """
+        Args:
+            growing: 書き込み中のファイル
+            vad_parameters: VADパラメータ（文字起こし時と同じもの）
+        """
+        self.growing = growing
+        self.vad_parameters = vad_parameters
+        self._audio: Optional["np.ndarray"] = None
+        self._speech_chunks: Optional[list[dict]] = None
+        # デコード済み・VAD済みの長さ（サンプル数、進捗の確認用）
+        self.decoded_samples = 0
+        self.analyzed_samples = 0
+        self._thread = threading.Thread(target=self._run, name="progressive-decode", daemon=True)
+
+    def start(self) -> None:
+        """デコードを開始"""
+        self._thread.start()
+
+    def cancel(self) -> None:
+        """デコードを中止し、スレッドの終了を待つ（結果キャッシュにヒットした場合など）"""
+        self.growing.abort()
+        if self._thread.is_alive():
+            self._thread.join()
+
+    def wait(self, timeout: Optional[float] = None) -> bool:
+        """
+        デコードの終了を待つ
+
+        Args:
+            timeout: 最大の待ち時間（秒、Noneの場合は無制限）
+
+        Returns:
+            bool: 終了した場合True
+        """
+        self._thread.join(timeout)
+        return not self._thread.is_alive()
+
+    def store(self, audio_hash: str) -> bool:
+        """
+        デコードの完了を待ち、デコード済み音声キャッシュ・発話区間キャッシュに保存
+
+        Args:
+            audio_hash: 音声ファイルのSHA-256
+
+        Returns:
+            bool: 保存した場合True
+        """
+        self.wait()
+        if self._audio is None:
+            return False
+        pcm_cache.put(audio_hash, self._audio)
+        vad_cache.put(
+            make_vad_cache_key(audio_hash, self.vad_parameters),
+            {"samples": len(self._audio), "chunks": self._speech_chunks},
+        )
+        self._audio = None
+        self._speech_chunks = None
+        return True
+
+    def _run(self) -> None:
+        import numpy as np
+
+        start_time = time.time()
+        windows = []
+        speech_chunks = []
+
+        def decode(reader):
+            for window in iter_audio_windows(reader, DECODE_WINDOW_SECONDS):
+                windows.append(window)
+                self.decoded_samples += len(window)
+                yield window
+
+        try:
+            with self.growing.open() as reader:
+                for audio, chunks, offset in iter_speech_windows(
+                    decode(reader), self.vad_parameters, DECODE_WINDOW_SECONDS * SAMPLING_RATE
+                ):
+                    speech_chunks.extend(
+                        {"start": chunk["start"] + offset, "end": chunk["end"] + offset} for chunk in chunks
+                    )
+                    self.analyzed_samples = offset + len(audio)
+        except Exception as e:
+            # 中断した場合はPyAVの例外として届くこともある
+            if isinstance(e, UploadAborted) or self.growing.aborted:
+                return
+            logger.warning(f"⚠️ 先行デコードに失敗（文字起こし時にデコードします）: {e}")
+            return
+
+        if not windows:
+            return
+        self._audio = np.concatenate(windows)
+        self._speech_chunks = speech_chunks
+        logger.info(
+            f"🎧 アップロードと並行してデコード・VAD完了: {len(self._audio) / SAMPLING_RATE:.0f}秒 "
+            f"{len(speech_chunks)}区間 ({time.time() - start_time:.1f}秒)"
+        )
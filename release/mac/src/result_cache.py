@@ -0,0 +1,187 @@
+"""
+文字起こし結果キャッシュ
+音声ファイルの内容（SHA-256）と文字起こし条件をキーに、結果をディスクに保存する
+"""
+
+import hashlib
+import json
+import logging
+import os
+import threading
+from pathlib import Path
+from typing import Optional
+
+from config import APP_VERSION, RESULT_CACHE_DIR, RESULT_CACHE_MAX_MB
+
+logger = logging.getLogger(__name__)
+
+
+def make_cache_key(
+    audio_hash: str,
+    model_name: str,
+    language: str,
+    mode: str,
+    vad_parameters: dict,
+    ranges: Optional[list] = None,
+) -> str:
+    """
+    キャッシュキーを生成
+
+    音声の内容に加え、結果に影響する条件（モデル、言語、方式、VADパラメータ、
+    アプリバージョン、時間範囲）を含める。いずれかが変われば別のキーになる。
+
+    Args:
+        audio_hash: 音声ファイルのSHA-256
+        model_name: モデル名
+        language: 言語コード
+        mode: 文字起こし方式
+        vad_parameters: VADパラメータ
+        ranges: 文字起こしする時間範囲（全体の場合None）
+
+    Returns:
+        str: キャッシュキー（16進文字列）
+    """
+    payload = {
+        "audio": audio_hash,
+        "model": model_name,
+        "language": language,
+        "mode": mode,
+        "vad": vad_parameters,
+        "version": APP_VERSION,
+    }
+    # 全体を文字起こしする場合のキーは従来と同じにする（既存のキャッシュを使えるように）
+    if ranges:
+        payload["ranges"] = ranges
+    return hashlib.sha256(json.dumps(payload, sort_keys=True).encode("utf-8")).hexdigest()
+
+
+class ResultCache:
+    """
+    ディスク上の文字起こし結果キャッシュ
+
+    1結果を1つのJSONファイルとして保存し、合計サイズが上限を超えた場合は
+    最終アクセス（mtime）が古いものから削除する（LRU）
+    """
+
+    def __init__(self, cache_dir: Path, max_bytes: int):
+        """
+        Args:
+            cache_dir: キャッシュディレクトリ
+            max_bytes: キャッシュの最大合計サイズ（バイト）
+        """
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+
+    def get(self, key: str) -> Optional[dict]:
+        """
+        キャッシュから結果を取得
+
+        Args:
+            key: キャッシュキー
+
+        Returns:
+            dict: 保存済みの結果（存在しない場合None）
+        """
+        path = self._path(key)
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                result = json.load(f)
+            # LRU用に最終アクセス時刻を更新
+            os.utime(path, None)
+            return result
+        except FileNotFoundError:
+            return None
+        except (json.JSONDecodeError, OSError) as e:
+            logger.warning(f"⚠️ キャッシュ読み込み失敗（破損として削除）: {path.name} - {e}")
+            self._remove(path)
+            return None
+
+    def put(self, key: str, result: dict) -> None:
+        """
+        結果をキャッシュに保存
+
+        Args:
+            key: キャッシュキー
+            result: 文字起こし結果
+        """
+        path = self._path(key)
+        tmp_path = path.with_name(f"{path.name}.{threading.get_ident()}.tmp")
+        try:
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(result, f, ensure_ascii=False)
+            os.replace(tmp_path, path)
+        except OSError as e:
+            logger.warning(f"⚠️ キャッシュ保存失敗: {e}")
+            self._remove(tmp_path)
+            return
+
+        self._evict()
+
+    def clear(self) -> None:
+        """キャッシュを全て削除"""
+        with self._lock:
+            for path in self.cache_dir.glob("*.json"):
+                self._remove(path)
+
+    def stats(self) -> dict:
+        """
+        キャッシュの状態を取得
+
+        Returns:
+            dict: {'entries': int, 'size_mb': float, 'max_mb': float}
+        """
+        files = list(self.cache_dir.glob("*.json"))
+        total = sum(self._size(path) for path in files)
+        return {
+            "entries": len(files),
+            "size_mb": round(total / (1024**2), 2),
+            "max_mb": round(self.max_bytes / (1024**2), 2),
+        }
+
+    def _path(self, key: str) -> Path:
+        return self.cache_dir / f"{key}.json"
+
+    def _evict(self) -> None:
+        """合計サイズが上限以下になるまで、古いエントリから削除"""
+        with self._lock:
+            entries = []
+            for path in self.cache_dir.glob("*.json"):
+                try:
+                    stat = path.stat()
+                except OSError:
+                    continue
+                entries.append((stat.st_mtime, stat.st_size, path))
+
+            total = sum(size for _, size, _ in entries)
+            if total <= self.max_bytes:
+                return
+
+            entries.sort()
+            removed = 0
+            for _, size, path in entries:
+                if total <= self.max_bytes:
+                    break
+                self._remove(path)
+                total -= size
+                removed += 1
+            logger.info(f"🗑️ 結果キャッシュを{removed}件削除（LRU、上限 {self.max_bytes / (1024**2):.0f}MB）")
+
+    @staticmethod
+    def _size(path: Path) -> int:
+        try:
+            return path.stat().st_size
+        except OSError:
+            return 0
+
+    @staticmethod
+    def _remove(path: Path) -> None:
+        try:
+            path.unlink()
+        except OSError:
+            pass
+
+
+# グローバルインスタンス（シングルトン）
+result_cache = ResultCache(RESULT_CACHE_DIR, RESULT_CACHE_MAX_MB * 1024 * 1024)
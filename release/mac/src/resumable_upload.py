@@ -0,0 +1,419 @@
+"""
+再開可能な分割アップロード
+大きなファイルをチャンクに分けて送信し、接続が切れても受信済みの部分から再開できるようにする。
+チャンクは任意の位置に書き込めるため、複数のチャンクを並列に送信できる。
+受信中のファイルと受信状況（JSON）はRESUMABLE_UPLOAD_DIRに保存するため、サーバーを再起動しても再開できる
+"""
+
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+import uuid
+from pathlib import Path
+from typing import AsyncIterator, Optional
+
+import aiofiles
+
+from config import (
+    ALLOWED_EXTENSIONS,
+    RESUMABLE_MAX_CHUNK_MB,
+    RESUMABLE_UPLOAD_DIR,
+    RESUMABLE_UPLOAD_MAX_AGE_DAYS,
+    UPLOAD_CHUNK_SIZE,
+    UPLOAD_DIR,
+)
+from upload_storage import MAX_UPLOAD_BYTES, UploadTooLargeError
+
+logger = logging.getLogger(__name__)
+
+
+class ResumableUploadError(Exception):
+    """分割アップロードのリクエストが正しくない"""
+
+
+class UploadNotFoundError(ResumableUploadError):
+    """分割アップロードが見つからない（完了・取り消し済み、または期限切れ）"""
+
+
+class UploadConflictError(ResumableUploadError):
+    """分割アップロードの状態と合わない（受信が完了していない、チャンクの受信中、完了処理中など）"""
+
+
+class ChunkChecksumError(ResumableUploadError):
+    """チャンク（またはファイル全体）のSHA-256が一致しない"""
+
+
+def _add_range(ranges: list[list[int]], start: int, end: int) -> list[list[int]]:
+    """受信済みの範囲 [start, end) を追加し、重なる・隣接する範囲をまとめる"""
+    merged = []
+    for range_start, range_end in sorted(ranges + [[start, end]]):
+        if merged and range_start <= merged[-1][1]:
+            merged[-1][1] = max(merged[-1][1], range_end)
+        else:
+            merged.append([range_start, range_end])
+    return merged
+
+
+def _remove_range(ranges: list[list[int]], start: int, end: int) -> list[list[int]]:
+    """範囲 [start, end) を受信済みから外す（書き込みに失敗した部分を再送させる）"""
+    remaining = []
+    for range_start, range_end in ranges:
+        if range_end <= start or range_start >= end:
+            remaining.append([range_start, range_end])
+            continue
+        if range_start < start:
+            remaining.append([range_start, start])
+        if range_end > end:
+            remaining.append([end, range_end])
+    return remaining
+
+
+class ResumableUploadManager:
+    """
+    分割アップロードの管理
+
+    1. create(): ファイル名とサイズを指定して開始（upload_idを発行）
+    2. write_chunk(): チャンクを位置を指定して書き込み（SHA-256を検証し、一致した範囲のみ受信済みにする）
+    3. status(): 受信済みの範囲を確認（再開時はここから続きを送る）
+    4. finalize(): 全体を受信したら、通常のアップロードと同じくUPLOAD_DIRに移す
+    """
+
+    def __init__(
+        self,
+        upload_dir: Path = RESUMABLE_UPLOAD_DIR,
+        max_chunk_bytes: int = RESUMABLE_MAX_CHUNK_MB * 1024 * 1024,
+    ):
+        """
+        Args:
+            upload_dir: 受信中のファイルの保存先
+            max_chunk_bytes: 1回に受け付ける最大のチャンクサイズ（バイト）
+        """
+        self.upload_dir = upload_dir
+        self.max_chunk_bytes = max_chunk_bytes
+        self._uploads: dict[str, dict] = {}
+        self._lock = threading.Lock()
+
+    def create(self, filename: str, size: int) -> dict:
+        """
+        分割アップロードを開始
+
+        Args:
+            filename: 元のファイル名（拡張子で形式を判定）
+            size: ファイル全体のサイズ（バイト）
+
+        Returns:
+            dict: 受信状況（status()と同じ形式）
+
+        Raises:
+            ResumableUploadError: 対応していない形式、サイズが正しくない場合
+            UploadTooLargeError: 最大サイズを超えた場合
+        """
+        file_ext = Path(filename).suffix.lower()
+        if file_ext not in ALLOWED_EXTENSIONS:
+            raise ResumableUploadError(f"対応していないファイル形式です: {file_ext}")
+        if size <= 0:
+            raise ResumableUploadError("ファイルサイズが正しくありません")
+        if MAX_UPLOAD_BYTES and size > MAX_UPLOAD_BYTES:
+            raise UploadTooLargeError(
+                f"ファイルサイズが上限（{MAX_UPLOAD_BYTES / (1024**2):.0f}MB）を超えています"
+            )
+
+        upload_id = str(uuid.uuid4())
+        state = {"filename": filename, "size": size, "received": [], "finalizing": False, "writers": 0}
+
+        self.upload_dir.mkdir(parents=True, exist_ok=True)
+        # 全体のサイズを確保しておき、チャンクを任意の位置に書き込めるようにする
+        with open(self._part_path(upload_id), "wb") as f:
+            f.truncate(size)
+        self._save_state(upload_id, state)
+        with self._lock:
+            self._uploads[upload_id] = state
+
+        logger.info(f"分割アップロード開始: {filename} ({size} bytes, upload_id: {upload_id})")
+        return self._describe(upload_id, state)
+
+    def status(self, upload_id: str) -> dict:
+        """
+        受信状況を取得
+
+        Returns:
+            dict: {"upload_id", "filename", "size", "offset", "received", "complete"}
+                  offsetは先頭から途切れずに受信済みのバイト数（順番に送る場合の次の位置）
+
+        Raises:
+            UploadNotFoundError: 分割アップロードが見つからない場合
+        """
+        state = self._get_state(upload_id)
+        with self._lock:
+            return self._describe(upload_id, state)
+
+    async def write_chunk(
+        self, upload_id: str, offset: int, chunks: AsyncIterator[bytes], checksum: str
+    ) -> dict:
+        """
+        チャンクを書き込む
+
+        受信しながらディスクに書き込み、最後にSHA-256を検証する。
+        一致しない場合や途中で接続が切れた場合は、書き込んだ範囲を未受信に戻す
+
+        Args:
+            upload_id: 分割アップロードのID
+            offset: 書き込む位置（バイト）
+            chunks: チャンクの内容（受信した順のバイト列）
+            checksum: チャンクのSHA-256（16進数）
+
+        Returns:
+            dict: 書き込み後の受信状況
+
+        Raises:
+            UploadNotFoundError: 分割アップロードが見つからない場合
+            UploadConflictError: 完了処理中の場合
+            ResumableUploadError: 位置が正しくない、ファイルサイズを超える場合
+            UploadTooLargeError: 最大のチャンクサイズを超えた場合
+            ChunkChecksumError: SHA-256が一致しない場合
+        """
+        state = self._get_state(upload_id)
+        size = state["size"]
+        if offset < 0 or offset >= size:
+            raise ResumableUploadError(f"書き込む位置が正しくありません: {offset}")
+        # 書き込み中のチャンクがある間は完了処理を受け付けない（完了後のファイルに書き込まないように）
+        with self._lock:
+            if state["finalizing"]:
+                raise UploadConflictError("アップロードの完了処理中です")
+            state["writers"] += 1
+
+        try:
+            return await self._write_chunk(upload_id, state, offset, chunks, checksum)
+        finally:
+            with self._lock:
+                state["writers"] -= 1
+
+    async def _write_chunk(
+        self, upload_id: str, state: dict, offset: int, chunks: AsyncIterator[bytes], checksum: str
+    ) -> dict:
+        size = state["size"]
+        sha256 = hashlib.sha256()
+        written = 0
+        try:
+            async with aiofiles.open(self._part_path(upload_id), "r+b") as f:
+                await f.seek(offset)
+                async for data in chunks:
+                    if not data:
+                        continue
+                    if written + len(data) > self.max_chunk_bytes:
+                        raise UploadTooLargeError(
+                            f"チャンクサイズが上限（{self.max_chunk_bytes / (1024**2):.0f}MB）を超えています"
+                        )
+                    if offset + written + len(data) > size:
+                        raise ResumableUploadError("チャンクがファイルサイズを超えています")
+                    sha256.update(data)
+                    await f.write(data)
+                    written += len(data)
+            if sha256.hexdigest() != checksum.strip().lower():
+                raise ChunkChecksumError(
+                    f"チャンクのSHA-256が一致しません（位置: {offset}、{written} bytes）"
+                )
+        except BaseException:
+            # 書きかけの範囲は内容が保証できないため、受信済みでも再送させる
+            if written:
+                self._update_received(upload_id, state, _remove_range, offset, offset + written)
+            raise
+
+        if written:
+            self._update_received(upload_id, state, _add_range, offset, offset + written)
+        with self._lock:
+            return self._describe(upload_id, state)
+
+    def finalize(self, upload_id: str, expected_sha256: Optional[str] = None) -> tuple[Path, str, int, str]:
+        """
+        受信を完了し、UPLOAD_DIRに移す（file_idはupload_registryに登録して発行する）
+
+        ファイル全体を読み直してSHA-256を計算する（ファイルサイズに比例して時間がかかるため、スレッドで呼ぶ）
+
+        Args:
+            upload_id: 分割アップロードのID
+            expected_sha256: ファイル全体のSHA-256（指定した場合は検証する）
+
+        Returns:
+            tuple[Path, str, int, str]: (ファイルパス, 元のファイル名, ファイルサイズ, SHA-256)
+
+        Raises:
+            UploadNotFoundError: 分割アップロードが見つからない場合
+            UploadConflictError: 受信が完了していない、チャンクの受信中、完了処理中の場合
+            ChunkChecksumError: ファイル全体のSHA-256が一致しない場合
+        """
+        state = self._get_state(upload_id)
+        with self._lock:
+            if state["finalizing"]:
+                raise UploadConflictError("アップロードの完了処理中です")
+            if state["writers"]:
+                raise UploadConflictError("チャンクの受信中です（受信が終わってから完了してください）")
+            if state["received"] != [[0, state["size"]]]:
+                received = sum(end - start for start, end in state["received"])
+                raise UploadConflictError(f"受信が完了していません（{received}/{state['size']} bytes）")
+            state["finalizing"] = True
+
+        try:
+            sha256 = hashlib.sha256()
+            with open(self._part_path(upload_id), "rb") as f:
+                while chunk := f.read(UPLOAD_CHUNK_SIZE):
+                    sha256.update(chunk)
+            audio_hash = sha256.hexdigest()
+            if expected_sha256 and audio_hash != expected_sha256.strip().lower():
+                raise ChunkChecksumError("ファイル全体のSHA-256が一致しません")
+
+            file_path = UPLOAD_DIR / f"{upload_id}{Path(state['filename']).suffix.lower()}"
+            os.replace(self._part_path(upload_id), file_path)
+        except BaseException:
+            with self._lock:
+                state["finalizing"] = False
+            raise
+
+        self._forget(upload_id)
+        logger.info(f"分割アップロード完了: {state['filename']} ({state['size']} bytes)")
+        return file_path, state["filename"], state["size"], audio_hash
+
+    def cancel(self, upload_id: str) -> None:
+        """
+        分割アップロードを取り消し、受信中のファイルを削除
+
+        Raises:
+            UploadNotFoundError: 分割アップロードが見つからない場合
+        """
+        self._get_state(upload_id)
+        self._forget(upload_id)
+        self._part_path(upload_id).unlink(missing_ok=True)
+        logger.info(f"分割アップロード取り消し: {upload_id}")
+
+    def cleanup_stale(self, max_age_days: int = RESUMABLE_UPLOAD_MAX_AGE_DAYS) -> int:
+        """
+        古い分割アップロードを削除（指定日数のあいだ書き込みがないもの）
+
+        受信状況（JSON）が残っていない受信中のファイル（保存に失敗した、削除の途中で終了したなど）も削除する
+
+        Returns:
+            int: 削除した件数
+        """
+        if not self.upload_dir.exists():
+            return 0
+
+        threshold = time.time() - max_age_days * 24 * 60 * 60
+        removed = 0
+        for state_path in self.upload_dir.glob("*.json"):
+            part_path = state_path.with_suffix(".part")
+            try:
+                mtimes = [path.stat().st_mtime for path in (state_path, part_path) if path.exists()]
+                if not mtimes or max(mtimes) >= threshold:
+                    continue
+                part_path.unlink(missing_ok=True)
+                state_path.unlink()
+                removed += 1
+            except OSError:
+                continue
+            with self._lock:
+                self._uploads.pop(state_path.stem, None)
+
+        for part_path in self.upload_dir.glob("*.part"):
+            with self._lock:
+                if part_path.stem in self._uploads:
+                    continue
+            try:
+                if part_path.with_suffix(".json").exists() or part_path.stat().st_mtime >= threshold:
+                    continue
+                part_path.unlink()
+                removed += 1
+            except OSError:
+                continue
+
+        if removed:
+            logger.info(f"🗑️ 古い分割アップロードを{removed}件削除")
+        return removed
+
+    def _part_path(self, upload_id: str) -> Path:
+        return self.upload_dir / f"{upload_id}.part"
+
+    def _state_path(self, upload_id: str) -> Path:
+        return self.upload_dir / f"{upload_id}.json"
+
+    def _get_state(self, upload_id: str) -> dict:
+        # パスに使うため、create()が発行した形式のUUID以外は受け付けない
+        try:
+            valid = str(uuid.UUID(upload_id)) == upload_id
+        except ValueError:
+            valid = False
+        if not valid:
+            raise UploadNotFoundError(f"アップロードが見つかりません: {upload_id}")
+
+        with self._lock:
+            state = self._uploads.get(upload_id)
+            if state is not None:
+                return state
+
+            # サーバー再起動後は保存した受信状況から再開
+            try:
+                with open(self._state_path(upload_id), "r", encoding="utf-8") as f:
+                    saved = json.load(f)
+            except (OSError, json.JSONDecodeError) as e:
+                raise UploadNotFoundError(f"アップロードが見つかりません: {upload_id}") from e
+            if not self._part_path(upload_id).exists():
+                raise UploadNotFoundError(f"アップロードが見つかりません: {upload_id}")
+
+            state = {
+                "filename": saved["filename"],
+                "size": saved["size"],
+                "received": saved["received"],
+                "finalizing": False,
+                "writers": 0,
+            }
+            self._uploads[upload_id] = state
+            return state
+
+    def _update_received(self, upload_id: str, state: dict, update, start: int, end: int) -> None:
+        with self._lock:
+            state["received"] = update(state["received"], start, end)
+            snapshot = dict(state)
+            # 書き込み中に取り消された場合は保存しない
+            if upload_id not in self._uploads:
+                return
+        self._save_state(upload_id, snapshot)
+
+    def _save_state(self, upload_id: str, state: dict) -> None:
+        path = self._state_path(upload_id)
+        tmp_path = path.with_name(f"{path.name}.{threading.get_ident()}.tmp")
+        try:
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(
+                    {"filename": state["filename"], "size": state["size"], "received": state["received"]},
+                    f,
+                    ensure_ascii=False,
+                )
+            os.replace(tmp_path, path)
+        except OSError as e:
+            # 保存できなくても、サーバーを再起動しない限り再開できる
+            logger.warning(f"⚠️ 分割アップロードの受信状況の保存失敗: {e}")
+            tmp_path.unlink(missing_ok=True)
+
+    def _forget(self, upload_id: str) -> None:
+        with self._lock:
+            self._uploads.pop(upload_id, None)
+        self._state_path(upload_id).unlink(missing_ok=True)
+
+    @staticmethod
+    def _describe(upload_id: str, state: dict) -> dict:
+        received = state["received"]
+        offset = received[0][1] if received and received[0][0] == 0 else 0
+        return {
+            "upload_id": upload_id,
+            "filename": state["filename"],
+            "size": state["size"],
+            "offset": offset,
+            "received": [list(item) for item in received],
+            "complete": received == [[0, state["size"]]],
+        }
+
+
+# グローバルインスタンス（シングルトン）
+resumable_uploads = ResumableUploadManager()
@@ -0,0 +1,215 @@
+"""
+システム情報取得モジュール
+物理コア数、CPU拡張命令（AVX2/AVX-512）、メモリ容量を外部ライブラリなしで取得する
+"""
+
+import logging
+import os
+import platform
+import subprocess
+import sys
+from pathlib import Path
+from typing import Optional
+
+logger = logging.getLogger(__name__)
+
+IS_WINDOWS = os.name == "nt"
+IS_MAC = sys.platform == "darwin"
+
+
+def _sysctl(name: str) -> Optional[str]:
+    """macOSのsysctl値を取得"""
+    try:
+        completed = subprocess.run(
+            ["sysctl", "-n", name], capture_output=True, text=True, timeout=5, check=True
+        )
+        return completed.stdout.strip()
+    except (OSError, subprocess.SubprocessError):
+        return None
+
+
+def _read_proc_cpuinfo() -> str:
+    """Linuxの/proc/cpuinfoを読み込む"""
+    try:
+        return Path("/proc/cpuinfo").read_text(encoding="utf-8", errors="ignore")
+    except OSError:
+        return ""
+
+
+def _windows_physical_cores() -> Optional[int]:
+    """GetLogicalProcessorInformationExで物理コア数を取得（Windows）"""
+    import ctypes
+    from ctypes import wintypes
+
+    relation_processor_core = 0
+    kernel32 = ctypes.windll.kernel32
+    length = wintypes.DWORD(0)
+    kernel32.GetLogicalProcessorInformationEx(relation_processor_core, None, ctypes.byref(length))
+    if length.value == 0:
+        return None
+
+    buffer = ctypes.create_string_buffer(length.value)
+    if not kernel32.GetLogicalProcessorInformationEx(
+        relation_processor_core, buffer, ctypes.byref(length)
+    ):
+        return None
+
+    # SYSTEM_LOGICAL_PROCESSOR_INFORMATION_EX: Relationship(DWORD), Size(DWORD), ...
+    count = 0
+    offset = 0
+    while offset < length.value:
+        size = int.from_bytes(buffer.raw[offset + 4:offset + 8], "little")
+        if size == 0:
+            break
+        count += 1
+        offset += size
+    return count or None
+
+
+def get_physical_cores() -> int:
+    """
+    物理コア数を取得（取得できない場合は論理コア数）
+
+    Returns:
+        int: 物理コア数
+    """
+    logical = os.cpu_count() or 1
+    cores = None
+
+    try:
+        if IS_WINDOWS:
+            cores = _windows_physical_cores()
+        elif IS_MAC:
+            value = _sysctl("hw.physicalcpu")
+            cores = int(value) if value else None
+        else:
+            pairs = set()
+            physical_id = None
+            for line in _read_proc_cpuinfo().splitlines():
+                if line.startswith("physical id"):
+                    physical_id = line.split(":", 1)[1].strip()
+                elif line.startswith("core id"):
+                    pairs.add((physical_id, line.split(":", 1)[1].strip()))
+            cores = len(pairs) or None
+    except Exception as e:
+        logger.debug(f"物理コア数の取得に失敗: {e}")
+
+    return max(1, min(cores or logical, logical))
+
+
+def get_cpu_features() -> dict:
+    """
+    CPUの拡張命令の対応状況を取得
+
+    Returns:
+        dict: {'avx2': bool, 'avx512': bool}
+    """
+    features = {"avx2": False, "avx512": False}
+
+    try:
+        if IS_WINDOWS:
+            import ctypes
+
+            # PF_AVX2_INSTRUCTIONS_AVAILABLE = 40, PF_AVX512F_INSTRUCTIONS_AVAILABLE = 41
+            is_present = ctypes.windll.kernel32.IsProcessorFeaturePresent
+            features["avx2"] = bool(is_present(40))
+            features["avx512"] = bool(is_present(41))
+        elif IS_MAC:
+            flags = " ".join(
+                value or "" for value in (_sysctl("machdep.cpu.features"), _sysctl("machdep.cpu.leaf7_features"))
+            ).upper()
+            features["avx2"] = "AVX2" in flags
+            features["avx512"] = "AVX512F" in flags
+        else:
+            for line in _read_proc_cpuinfo().splitlines():
+                if line.startswith("flags"):
+                    flags = line.split(":", 1)[1].split()
+                    features["avx2"] = "avx2" in flags
+                    features["avx512"] = "avx512f" in flags
+                    break
+    except Exception as e:
+        logger.debug(f"CPU拡張命令の取得に失敗: {e}")
+
+    return features
+
+
+def get_memory_info() -> dict:
+    """
+    物理メモリの総量と空き容量を取得
+
+    Returns:
+        dict: {'total_gb': float|None, 'available_gb': float|None}
+    """
+    total = None
+    available = None
+
+    try:
+        if IS_WINDOWS:
+            import ctypes
+
+            class MEMORYSTATUSEX(ctypes.Structure):
+                _fields_ = [
+                    ("dwLength", ctypes.c_ulong),
+                    ("dwMemoryLoad", ctypes.c_ulong),
+                    ("ullTotalPhys", ctypes.c_ulonglong),
+                    ("ullAvailPhys", ctypes.c_ulonglong),
+                    ("ullTotalPageFile", ctypes.c_ulonglong),
+                    ("ullAvailPageFile", ctypes.c_ulonglong),
+                    ("ullTotalVirtual", ctypes.c_ulonglong),
+                    ("ullAvailVirtual", ctypes.c_ulonglong),
+                    ("ullAvailExtendedVirtual", ctypes.c_ulonglong),
+                ]
+
+            status = MEMORYSTATUSEX()
+            status.dwLength = ctypes.sizeof(MEMORYSTATUSEX)
+            if ctypes.windll.kernel32.GlobalMemoryStatusEx(ctypes.byref(status)):
+                total = status.ullTotalPhys
+                available = status.ullAvailPhys
+        elif IS_MAC:
+            value = _sysctl("hw.memsize")
+            total = int(value) if value else None
+            completed = subprocess.run(["vm_stat"], capture_output=True, text=True, timeout=5)
+            page_size = 4096
+            pages = {}
+            for line in completed.stdout.splitlines():
+                if "page size of" in line:
+                    page_size = int(line.split("page size of")[1].split()[0])
+                elif ":" in line:
+                    name, count = line.split(":", 1)
+                    pages[name.strip()] = int(count.strip().rstrip(".") or 0)
+            # 空き + 非アクティブ + 解放可能なページを利用可能とみなす
+            available = page_size * sum(
+                pages.get(name, 0) for name in ("Pages free", "Pages inactive", "Pages speculative", "Pages purgeable")
+            )
+        else:
+            meminfo = {}
+            for line in Path("/proc/meminfo").read_text().splitlines():
+                name, value = line.split(":", 1)
+                meminfo[name] = int(value.split()[0]) * 1024
+            total = meminfo.get("MemTotal")
+            available = meminfo.get("MemAvailable", meminfo.get("MemFree"))
+    except Exception as e:
+        logger.debug(f"メモリ情報の取得に失敗: {e}")
+
+    return {
+        "total_gb": round(total / (1024**3), 2) if total else None,
+        "available_gb": round(available / (1024**3), 2) if available else None,
+    }
+
+
+def get_system_info() -> dict:
+    """
+    自動チューニングに使うシステム情報をまとめて取得
+
+    Returns:
+        dict: CPU・メモリ情報
+    """
+    return {
+        "machine": platform.machine(),
+        "processor": platform.processor(),
+        "system": platform.system(),
+        "logical_cores": os.cpu_count() or 1,
+        "physical_cores": get_physical_cores(),
+        **get_cpu_features(),
+        **get_memory_info(),
+    }
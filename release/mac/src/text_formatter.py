@@ -0,0 +1,211 @@
+"""
+文字起こし結果の改行整形
+事前コンパイルしたパターンをセグメントごとに適用し、改行位置に目印の制御文字を入れておく。
+セグメントを受け取るたびに追加できるため、全文を結合してから何度も置換し直す必要がない
+"""
+
+import re
+from typing import Optional
+
+# 直後にこれらの文字が続く場合は改行しない（閉じ括弧の前で行を分けない）
+NO_BREAK_BEFORE = "」』）)\n"
+
+# 句点による改行がこの数未満の場合は、接続助詞・読点でも改行する
+SPARSE_LINEBREAK_THRESHOLD = 10
+
+# 句点が少ない場合に改行する接続助詞など
+# （「だって」「けども」「もんね」は「って」「けど」「もん」の位置で改行されるため含めない）
+PARTICLES = ("って", "から", "けど", "もん")
+
+# 読点の後がこの文字数以上続く場合のみ、読点で改行する
+MIN_CLAUSE_LENGTH = 20
+
+# セグメント間の無音がこの秒数以上の場合は改行する
+PAUSE_BREAK_SECONDS = 2.0
+
+# 改行位置の目印（句点は改行そのもの、それ以外はtext()で改行に置き換えるか削除する）
+_HARD = "\n"  # 句点・感嘆符・疑問符（常に改行）
+_SOFT = "\x02"  # 接続助詞（句点が少ない場合のみ改行）
+_CLAUSE = "\x03"  # 読点（句点が少ない場合のみ改行）
+_PAUSE = "\x04"  # 無音（常に改行、句点の数には数えない）
+
+# 読点の後の文字数を区切る文字
+_CLAUSE_TERMINATORS = "、" + _HARD + _SOFT + _PAUSE
+
+# 改行を入れる位置（幅0のマッチに目印を挿入する）
+_SENTENCE_BREAK = re.compile(r"(?<=[。！？])(?=[^」』）)\n])")
+_PARTICLE_BREAK = re.compile("(?<=" + "|".join(PARTICLES) + r")(?=[^」』）)\n])")
+_CLAUSE_BREAK = re.compile("(?<=、)(?=[^" + _CLAUSE_TERMINATORS + "]{" + str(MIN_CLAUSE_LENGTH) + "})")
+_NEWLINES = re.compile(r"\n+")
+
+
+class TranscriptFormatter:
+    """
+    文字起こし結果の改行整形
+
+    - 句点・感嘆符・疑問符の後で改行（閉じ括弧の前は除く）
+    - 句点による改行が少ない場合は、接続助詞の後と、後ろが長い読点の後でも改行
+    - セグメント間に長い無音がある場合も改行
+    - 連続する改行は1つにまとめ、先頭と末尾の空白を削除
+
+    使い方:
+        formatter = TranscriptFormatter()
+        formatter.add_segment(segment)  # ストリーミング中は1セグメントずつ
+        formatter.add_segments(segments)  # まとめて追加する場合は結合して1回で処理
+        text = formatter.text()
+    """
+
+    def __init__(self, sparse_fallback: bool = True, pause_seconds: Optional[float] = PAUSE_BREAK_SECONDS):
+        """
+        Args:
+            sparse_fallback: 句点が少ない場合に接続助詞・読点でも改行するか
+            pause_seconds: 改行とみなす無音の長さ（秒、Noneの場合は無音で改行しない）
+        """
+        self.sparse_fallback = sparse_fallback
+        self.pause_seconds = pause_seconds
+        self.sentence_breaks = 0
+        self._parts: list[str] = []
+        self._pending = ""  # 末尾の改行候補（次のテキストの先頭文字で判定）
+        self._last_char = ""
+        self._last_end: Optional[float] = None
+        self._clause_slot: Optional[int] = None  # 判定待ちの読点の目印を入れる位置
+        self._clause_length = 0
+
+    @property
+    def is_sparse(self) -> bool:
+        """句点による改行が少ないか（接続助詞・読点でも改行する）"""
+        return self.sparse_fallback and self.sentence_breaks < SPARSE_LINEBREAK_THRESHOLD
+
+    def add_segment(self, segment: dict) -> None:
+        """
+        セグメントを追加
+
+        Args:
+            segment: {'start': float, 'end': float, 'text': str}
+        """
+        self.add_segments([segment])
+
+    def add_segments(self, segments: list[dict]) -> None:
+        """
+        複数のセグメントをまとめて追加（結合して1回で処理する）
+
+        Args:
+            segments: セグメントのリスト（時刻順）
+        """
+        pieces = []
+        first_pause = False
+        for segment in segments:
+            text = segment["text"]
+            pause = (
+                self.pause_seconds is not None
+                and self._last_end is not None
+                and segment["start"] - self._last_end >= self.pause_seconds
+            )
+            self._last_end = segment["end"]
+            if not text:
+                continue
+            if not pieces:
+                first_pause = pause
+            elif pause and text[0] not in NO_BREAK_BEFORE:
+                pieces.append(_PAUSE)
+            pieces.append(text)
+        self._add("".join(pieces), first_pause)
+
+    def add_text(self, text: str) -> None:
+        """
+        テキストを追加（前に追加したテキストの続きとして扱う）
+
+        Args:
+            text: 追加するテキスト
+        """
+        self._add(text, False)
+
+    def text(self) -> str:
+        """
+        整形済みのテキストを取得（途中経過としていつでも呼べる）
+
+        Returns:
+            str: 改行を含むテキスト
+        """
+        text = "".join(self._parts).replace(_PAUSE, "\n")
+        if self.is_sparse:
+            text = text.replace(_SOFT, "\n").replace(_CLAUSE, "\n")
+        else:
+            text = text.replace(_SOFT, "").replace(_CLAUSE, "")
+        return _NEWLINES.sub("\n", text).strip()
+
+    def _add(self, text: str, pause: bool) -> None:
+        if not text:
+            return
+
+        breakable = text[0] not in NO_BREAK_BEFORE
+        prefix = ""
+        if self._pending and breakable:
+            prefix = self._pending
+            if self._pending == _HARD:
+                self.sentence_breaks += 1
+        if pause and breakable:
+            prefix += _PAUSE
+        self._pending = ""
+
+        body, count = _SENTENCE_BREAK.subn(_HARD, text)
+        self.sentence_breaks += count + text.count("\n")
+
+        # 句点が十分にあれば接続助詞・読点の処理は不要（句点の数は減らないため、以降も不要）
+        sparse = self.is_sparse
+        if sparse:
+            body = _PARTICLE_BREAK.sub(_SOFT, body)
+            # 前のテキストとの境界をまたぐ接続助詞（「っ」+「て」など、間に無音がある場合は除く）
+            if not pause and self._last_char + text[0] in PARTICLES:
+                if len(text) == 1:
+                    self._pending = _SOFT
+                elif text[1] not in NO_BREAK_BEFORE:
+                    body = body[0] + _SOFT + body[1:]
+            body = _CLAUSE_BREAK.sub(_CLAUSE, body)
+
+        # 末尾の改行候補は次のテキストの先頭文字で判定する
+        last_char = text[-1]
+        if last_char in "。！？":
+            self._pending = _HARD
+        elif sparse and text[-2:] in PARTICLES:
+            self._pending = _SOFT
+        self._last_char = last_char
+
+        body = prefix + body
+        if sparse:
+            self._append_with_clause(body)
+        else:
+            self._clause_slot = None
+            self._parts.append(body)
+
+    def _append_with_clause(self, body: str) -> None:
+        """
+        テキストを追加し、境界をまたぐ読点の後の文字数を数える
+
+        テキスト末尾の読点は後ろの文字数が決まらないため、目印を入れる位置を空けておき、
+        後続のテキストで文字数が足りた時点で目印を入れる
+        """
+        if self._clause_slot is not None:
+            first = min(
+                (index for index in map(body.find, _CLAUSE_TERMINATORS) if index >= 0),
+                default=len(body),
+            )
+            length = self._clause_length + first
+            if length >= MIN_CLAUSE_LENGTH:
+                self._parts[self._clause_slot] = _CLAUSE
+                self._clause_slot = None
+            elif first < len(body):
+                self._clause_slot = None
+            else:
+                self._clause_length = length
+                self._parts.append(body)
+                return
+
+        last = max(map(body.rfind, _CLAUSE_TERMINATORS))
+        if last >= 0 and body[last] == "、" and len(body) - last - 1 < MIN_CLAUSE_LENGTH:
+            self._parts.append(body[:last + 1])
+            self._parts.append("")
+            self._clause_slot = len(self._parts) - 1
+            self._clause_length = len(body) - last - 1
+            body = body[last + 1:]
+        self._parts.append(body)
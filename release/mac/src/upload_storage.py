@@ -0,0 +1,311 @@
+"""
+アップロードファイルの保存
+受信したファイルを一定サイズごとにディスクへ書き込み、同時にSHA-256を計算する。
+ファイル全体をメモリに読み込まないため、動画などの大きなファイルでもメモリ使用量は一定。
+デスクトップアプリからはファイルをコピーせず、ローカルパスを登録してその場で読み込む（登録はupload_registry）
+"""
+
+import hashlib
+import logging
+from pathlib import Path
+from typing import Callable, Optional
+
+import aiofiles
+from fastapi import Request, UploadFile
+from fastapi.responses import JSONResponse
+from multipart.multipart import MultipartParser, parse_options_header
+
+from config import ALLOWED_EXTENSIONS, MAX_UPLOAD_MB, UPLOAD_CHUNK_SIZE
+
+logger = logging.getLogger(__name__)
+
+# アップロードできる最大サイズ（バイト、0: 無制限）
+MAX_UPLOAD_BYTES = MAX_UPLOAD_MB * 1024 * 1024
+# マルチパート形式のリクエストで、ファイル以外に許容するバイト数（境界・ヘッダー・フォーム項目）
+FORM_OVERHEAD_BYTES = 1024 * 1024
+
+
+class UploadTooLargeError(Exception):
+    """アップロードファイルが上限サイズを超えている"""
+
+
+async def save_upload_file(
+    file: UploadFile,
+    destination: Path,
+    max_bytes: int = MAX_UPLOAD_BYTES,
+    chunk_size: int = UPLOAD_CHUNK_SIZE,
+) -> tuple[int, str]:
+    """
+    アップロードファイルをチャンク単位でディスクに保存
+
+    書き込みはaiofilesでスレッドに逃がすため、保存中もイベントループを止めない。
+    上限を超えた場合や保存に失敗した場合は、書きかけのファイルを削除する。
+
+    Args:
+        file: アップロードファイル
+        destination: 保存先
+        max_bytes: 最大サイズ（バイト、0: 無制限）
+        chunk_size: 1回に読み書きするバイト数
+
+    Returns:
+        tuple[int, str]: (ファイルサイズ, SHA-256)
+
+    Raises:
+        UploadTooLargeError: 最大サイズを超えた場合
+    """
+    sha256 = hashlib.sha256()
+    size = 0
+
+    try:
+        async with aiofiles.open(destination, "wb") as f:
+            while chunk := await file.read(chunk_size):
+                size += len(chunk)
+                if max_bytes and size > max_bytes:
+                    raise UploadTooLargeError(
+                        f"ファイルサイズが上限（{max_bytes / (1024**2):.0f}MB）を超えています"
+                    )
+                sha256.update(chunk)
+                await f.write(chunk)
+    except BaseException:
+        destination.unlink(missing_ok=True)
+        raise
+
+    return size, sha256.hexdigest()
+
+
+class UploadSizeLimitMiddleware:
+    """
+    アップロードのリクエスト本文のサイズを受信時点で制限するASGIミドルウェア
+
+    FastAPIはエンドポイントの処理より前にマルチパートの本文を一時ファイルに保存するため、
+    save_upload_file()での確認だけでは、上限を超えるファイルも一度ディスクに書き込まれる。
+    Content-Lengthが上限を超える場合は本文を受信せずに413を返し、
+    Content-Lengthがない場合（chunked）も受信したバイト数が上限を超えた時点で打ち切る
+    """
+
+    def __init__(self, app, paths: set[str], max_bytes: int = MAX_UPLOAD_BYTES):
+        """
+        Args:
+            app: ASGIアプリケーション
+            paths: 制限するパス
+            max_bytes: 最大サイズ（バイト、0: 無制限）
+        """
+        self.app = app
+        self.paths = paths
+        self.max_bytes = max_bytes
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not self.max_bytes or scope["path"] not in self.paths:
+            await self.app(scope, receive, send)
+            return
+
+        limit = self.max_bytes + FORM_OVERHEAD_BYTES
+        content_length = dict(scope["headers"]).get(b"content-length", b"")
+        if content_length.isdigit() and int(content_length) > limit:
+            await self._reject(scope, receive, send)
+            return
+
+        received = 0
+        response_started = False
+        rejected = False
+
+        async def limited_receive():
+            nonlocal received, rejected
+            message = await receive()
+            if message["type"] == "http.request" and not rejected:
+                received += len(message.get("body", b""))
+                if received > limit and not response_started:
+                    # 以降のアプリケーションからの送信は捨て、切断として扱わせる
+                    rejected = True
+                    await self._reject(scope, receive, send)
+                    return {"type": "http.disconnect"}
+            return message
+
+        async def guarded_send(message):
+            nonlocal response_started
+            if rejected:
+                return
+            if message["type"] == "http.response.start":
+                response_started = True
+            await send(message)
+
+        await self.app(scope, limited_receive, guarded_send)
+
+    async def _reject(self, scope, receive, send) -> None:
+        logger.warning(f"⚠️ アップロードが上限サイズを超えたため受信を中止: {scope['path']}")
+        response = JSONResponse(
+            status_code=413,
+            content={"detail": f"ファイルサイズが上限（{self.max_bytes / (1024**2):.0f}MB）を超えています"},
+        )
+        await response(scope, receive, send)
+
+
+class MultipartUpload:
+    """receive_multipart_upload()で受信したフォーム"""
+
+    def __init__(self):
+        self.fields: dict[str, str] = {}
+        self.filename: Optional[str] = None
+        self.path: Optional[Path] = None
+        self.size = 0
+        self.sha256: Optional[str] = None
+
+
+async def receive_multipart_upload(
+    request: Request,
+    file_field: str,
+    open_destination: Callable[[str, dict[str, str]], Path],
+    on_progress: Optional[Callable[[int], None]] = None,
+    max_bytes: int = MAX_UPLOAD_BYTES,
+    chunk_size: int = UPLOAD_CHUNK_SIZE,
+) -> MultipartUpload:
+    """
+    マルチパート形式のリクエスト本文を受信しながら、ファイルをディスクに保存
+
+    FastAPIのFile()・Form()は本文をすべて受信してからエンドポイントを呼ぶため、受信中のファイルを扱えない。
+    ここではrequest.stream()を少しずつ解析し、ファイルの部分を受信した順に書き込む
+    （書き込むたびにon_progressで通知するため、受信中のファイルを別のハンドルから読み進められる）
+
+    Args:
+        request: リクエスト
+        file_field: ファイルのフォーム項目名
+        open_destination: ファイル名とそれまでに受信したフォーム項目を受け取り、保存先を返す関数
+                          （ファイルの受信開始時に呼ぶ。ValueErrorで受信を中止する）
+        on_progress: 書き込み済みのバイト数を受け取る関数（ディスクにフラッシュした後に呼ぶ）
+        max_bytes: 最大サイズ（バイト、0: 無制限）
+        chunk_size: 1回に書き込むバイト数
+
+    Returns:
+        MultipartUpload: 受信したフォーム（保存先・サイズ・SHA-256）
+
+    Raises:
+        ValueError: マルチパート形式でない、ファイルがない・複数ある、保存先を決められない場合
+        UploadTooLargeError: 最大サイズを超えた場合
+    """
+    content_type, params = parse_options_header(request.headers.get("content-type", ""))
+    boundary = params.get(b"boundary")
+    if content_type != b"multipart/form-data" or not boundary:
+        raise ValueError("multipart/form-data形式で送信してください")
+
+    # パーサーのコールバックは同期的に呼ばれるため、イベントをためておき、チャンクごとに非同期に処理する
+    events: list[tuple[str, bytes]] = []
+
+    def collect(kind: str):
+        return lambda data=b"", start=0, end=0: events.append((kind, data[start:end]))
+
+    parser = MultipartParser(
+        boundary,
+        {
+            "on_header_field": collect("header_field"),
+            "on_header_value": collect("header_value"),
+            "on_header_end": collect("header_end"),
+            "on_headers_finished": collect("headers_finished"),
+            "on_part_data": collect("data"),
+            "on_part_end": collect("part_end"),
+        },
+    )
+
+    upload = MultipartUpload()
+    sha256 = hashlib.sha256()
+    headers: dict[bytes, bytes] = {}
+    header_field = b""
+    header_value = b""
+    field_name = None
+    field_value = bytearray()
+    pending = bytearray()
+    file = None
+
+    async def write_pending():
+        await file.write(bytes(pending))
+        pending.clear()
+        if on_progress:
+            await file.flush()
+            on_progress(upload.size)
+
+    try:
+        async for chunk in request.stream():
+            parser.write(chunk)
+            for kind, data in events:
+                if kind == "header_field":
+                    header_field += data
+                elif kind == "header_value":
+                    header_value += data
+                elif kind == "header_end":
+                    headers[header_field.lower()] = header_value
+                    header_field = header_value = b""
+                elif kind == "headers_finished":
+                    _, options = parse_options_header(headers.get(b"content-disposition", b""))
+                    field_name = options.get(b"name", b"").decode("utf-8")
+                    filename = options.get(b"filename")
+                    headers = {}
+                    if field_name == file_field and filename is not None:
+                        if upload.path is not None:
+                            raise ValueError("ファイルは1つだけ送信してください")
+                        upload.filename = filename.decode("utf-8")
+                        upload.path = open_destination(upload.filename, dict(upload.fields))
+                        file = await aiofiles.open(upload.path, "wb")
+                elif kind == "data":
+                    if file is None:
+                        field_value += data
+                        continue
+                    upload.size += len(data)
+                    if max_bytes and upload.size > max_bytes:
+                        raise UploadTooLargeError(
+                            f"ファイルサイズが上限（{max_bytes / (1024**2):.0f}MB）を超えています"
+                        )
+                    sha256.update(data)
+                    pending += data
+                    if len(pending) >= chunk_size:
+                        await write_pending()
+                elif kind == "part_end":
+                    if file is not None:
+                        await write_pending()
+                        await file.close()
+                        file = None
+                    else:
+                        upload.fields[field_name] = field_value.decode("utf-8")
+                    field_value = bytearray()
+            events.clear()
+        parser.finalize()
+    except BaseException:
+        if file is not None:
+            await file.close()
+        if upload.path is not None:
+            try:
+                upload.path.unlink(missing_ok=True)
+            except OSError:
+                # 読み込み中のスレッドが開いている場合（Windows）は、呼び出し側がスレッドの終了後に削除する
+                pass
+        raise
+
+    if upload.path is None:
+        raise ValueError("ファイルが送信されていません")
+    upload.sha256 = sha256.hexdigest()
+    return upload
+
+
+def validate_local_path(path: str) -> Path:
+    """
+    ローカルパスで登録するファイルを検証
+
+    Args:
+        path: ファイルの絶対パス
+
+    Returns:
+        Path: シンボリックリンクを解決した実際のパス
+
+    Raises:
+        ValueError: 絶対パスでない、存在しない、通常のファイルでない、対応していない形式の場合
+    """
+    file_path = Path(path)
+    if not file_path.is_absolute():
+        raise ValueError("絶対パスを指定してください")
+    try:
+        file_path = file_path.resolve(strict=True)
+    except (OSError, RuntimeError) as e:
+        raise ValueError(f"ファイルが見つかりません: {path}") from e
+    if not file_path.is_file():
+        raise ValueError(f"通常のファイルではありません: {path}")
+    if file_path.suffix.lower() not in ALLOWED_EXTENSIONS:
+        raise ValueError(f"対応していないファイル形式です: {file_path.suffix.lower()}")
+    return file_path
@@ -0,0 +1,175 @@
+"""
+音声のストリーミングデコード
+PyAVで音声を一定時間ごとの窓に分けて、または指定した範囲のみをデコードし、音声全体をメモリに展開せずに処理できるようにする
+"""
+
+import gc
+import logging
+from pathlib import Path
+from typing import TYPE_CHECKING, BinaryIO, Iterator, Optional, Union
+
+from lazy_imports import load_faster_whisper
+from speech_chunks import SAMPLING_RATE
+
+# numpy・PyAVは起動を速くするため、使用時に読み込む（lazy_imports）
+if TYPE_CHECKING:
+    import numpy as np
+
+logger = logging.getLogger(__name__)
+
+
+def probe_duration(audio_path: Path) -> Optional[float]:
+    """
+    音声の長さをデコードせずに取得（コンテナのメタデータから）
+
+    Args:
+        audio_path: 音声ファイルパス
+
+    Returns:
+        float: 長さ（秒、取得できない場合None）
+    """
+    load_faster_whisper()
+    import av
+
+    try:
+        with av.open(str(audio_path), mode="r", metadata_errors="ignore") as container:
+            if container.duration:
+                return container.duration / av.time_base
+            stream = container.streams.audio[0]
+            if stream.duration and stream.time_base:
+                return float(stream.duration * stream.time_base)
+    except (av.error.FFmpegError, IndexError) as e:
+        logger.debug(f"音声の長さを取得できません: {audio_path.name} - {e}")
+    return None
+
+
+def iter_audio_windows(
+    audio_path: Union[Path, BinaryIO], window_seconds: float, sampling_rate: int = SAMPLING_RATE
+) -> Iterator["np.ndarray"]:
+    """
+    音声を一定時間ごとにデコード
+
+    faster_whisper.decode_audioと同じ変換（モノラル・16kHz・float32）を、
+    窓ごとに行う。保持するのは1窓分＋PyAVのフレーム数個分のみ。
+
+    Args:
+        audio_path: 音声ファイルパス（または読み込み可能なファイルオブジェクト）
+        window_seconds: 1窓の長さ（秒）
+        sampling_rate: サンプリングレート
+
+    Yields:
+        np.ndarray: 窓ごとの音声データ（最後の窓のみ短い場合がある）
+    """
+    load_faster_whisper()
+    import av
+    import numpy as np
+
+    source = audio_path if hasattr(audio_path, "read") else str(audio_path)
+    window_samples = int(window_seconds * sampling_rate)
+    resampler = av.audio.resampler.AudioResampler(format="s16", layout="mono", rate=sampling_rate)
+    pending: list[np.ndarray] = []
+    pending_samples = 0
+
+    def take(samples: int) -> np.ndarray:
+        nonlocal pending, pending_samples
+        buffer = np.concatenate(pending)
+        window, rest = buffer[:samples], buffer[samples:]
+        pending = [rest.copy()] if rest.size else []
+        pending_samples = rest.size
+        return window.astype(np.float32) / 32768.0
+
+    try:
+        with av.open(source, mode="r", metadata_errors="ignore") as container:
+            frames = container.decode(audio=0)
+            while True:
+                try:
+                    frame = next(frames)
+                except StopIteration:
+                    frame = None
+                except av.error.InvalidDataError:
+                    # 壊れたフレームは読み飛ばす（decode_audioと同じ）
+                    continue
+
+                for resampled in resampler.resample(frame):
+                    samples = resampled.to_ndarray().reshape(-1)
+                    pending.append(samples)
+                    pending_samples += samples.size
+
+                while pending_samples >= window_samples:
+                    yield take(window_samples)
+
+                if frame is None:
+                    break
+
+        if pending_samples:
+            yield take(pending_samples)
+    finally:
+        # PyAVのリサンプラーはメモリを解放しきらないことがあるため明示的に破棄（decode_audioと同じ）
+        del resampler
+        gc.collect()
+
+
+def decode_audio_range(
+    audio_path: Path, start: float, end: Optional[float], sampling_rate: int = SAMPLING_RATE
+) -> "np.ndarray":
+    """
+    指定した時間範囲のみをデコード
+
+    範囲の手前のキーフレームにシークしてからデコードし、範囲外のサンプルは捨てる。
+    変換はfaster_whisper.decode_audioと同じ（モノラル・16kHz・float32）。
+
+    Args:
+        audio_path: 音声ファイルパス
+        start: 開始時刻（秒）
+        end: 終了時刻（秒、Noneの場合は末尾まで）
+        sampling_rate: サンプリングレート
+
+    Returns:
+        np.ndarray: 範囲内の音声データ（範囲が音声の長さを超える場合は短くなる）
+    """
+    load_faster_whisper()
+    import av
+    import numpy as np
+
+    start_sample = int(start * sampling_rate)
+    end_sample = None if end is None else int(end * sampling_rate)
+    resampler = av.audio.resampler.AudioResampler(format="s16", layout="mono", rate=sampling_rate)
+    pieces: list[np.ndarray] = []
+    position: Optional[int] = None  # 次にリサンプラーから出てくるサンプルの、音声先頭からの位置
+
+    try:
+        with av.open(str(audio_path), mode="r", metadata_errors="ignore") as container:
+            if start > 0:
+                # ストリームを指定しない場合、シーク位置はav.time_base単位
+                container.seek(int(start * av.time_base), any_frame=False)
+            frames = container.decode(audio=0)
+            while end_sample is None or position is None or position < end_sample:
+                try:
+                    frame = next(frames)
+                except StopIteration:
+                    frame = None
+                except av.error.InvalidDataError:
+                    # 壊れたフレームは読み飛ばす（decode_audioと同じ）
+                    continue
+
+                if position is None:
+                    position = int(round((frame.time or 0.0) * sampling_rate)) if frame is not None else 0
+
+                for resampled in resampler.resample(frame):
+                    samples = resampled.to_ndarray().reshape(-1)
+                    first = max(start_sample - position, 0)
+                    last = samples.size if end_sample is None else min(end_sample - position, samples.size)
+                    if first < last:
+                        pieces.append(samples[first:last])
+                    position += samples.size
+
+                if frame is None:
+                    break
+    finally:
+        # PyAVのリサンプラーはメモリを解放しきらないことがあるため明示的に破棄（decode_audioと同じ）
+        del resampler
+        gc.collect()
+
+    if not pieces:
+        return np.zeros(0, dtype=np.float32)
+    return np.concatenate(pieces).astype(np.float32) / 32768.0
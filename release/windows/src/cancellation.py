@@ -0,0 +1,41 @@
+"""
+文字起こしの中止（キャンセル）
+実行中の文字起こしに中止を伝えるトークン。処理側がセグメントの区切りごとに確認する
+"""
+
+import threading
+
+
+class TranscriptionCancelled(Exception):
+    """文字起こしが中止された"""
+
+
+class CancellationToken:
+    """
+    中止トークン
+
+    中止を要求する側がcancel()を呼び、処理側がraise_if_cancelled()で確認する
+    （スレッドセーフ）
+    """
+
+    def __init__(self):
+        self._event = threading.Event()
+
+    def cancel(self) -> None:
+        """中止を要求"""
+        self._event.set()
+
+    @property
+    def cancelled(self) -> bool:
+        """中止が要求されているかどうか"""
+        return self._event.is_set()
+
+    def raise_if_cancelled(self) -> None:
+        """
+        中止が要求されていれば例外を送出
+
+        Raises:
+            TranscriptionCancelled: 中止が要求されている場合
+        """
+        if self._event.is_set():
+            raise TranscriptionCancelled("文字起こしが中止されました")
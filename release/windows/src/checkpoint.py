@@ -0,0 +1,170 @@
+"""
+文字起こしチェックポイント
+デコード済みのセグメントを1行ずつディスクに追記し、中断した文字起こしを途中から再開できるようにする
+"""
+
+import json
+import logging
+import threading
+import time
+from pathlib import Path
+
+from config import CHECKPOINT_DIR, CHECKPOINT_MAX_AGE_DAYS
+
+logger = logging.getLogger(__name__)
+
+# 使用中のチェックポイント（同じ音声・条件のジョブが同時に書き込まないようにする）
+_active_paths: set[Path] = set()
+_active_lock = threading.Lock()
+
+
+class TranscriptionCheckpoint:
+    """
+    1回の文字起こしのチェックポイント（JSON Lines形式）
+
+    キーは結果キャッシュと同じ（音声の内容と文字起こし条件）ため、
+    同じファイルを同じ条件で再度文字起こしすると自動的に続きから再開する
+    """
+
+    def __init__(self, key: str, checkpoint_dir: Path = CHECKPOINT_DIR):
+        """
+        Args:
+            key: チェックポイントのキー（結果キャッシュのキー）
+            checkpoint_dir: 保存先ディレクトリ
+        """
+        self.path = checkpoint_dir / f"{key}.jsonl"
+        self._file = None
+        self._enabled = False
+
+    def load(self) -> list[dict]:
+        """
+        保存済みのセグメントを読み込み、以降の追記を開始する
+
+        書き込み途中で中断した最終行は捨てる。
+        同じチェックポイントを別のジョブが使用中の場合は、このジョブでは保存しない。
+
+        Returns:
+            list[dict]: 保存済みのセグメント（時刻順）
+        """
+        with _active_lock:
+            if self.path in _active_paths:
+                logger.info(f"チェックポイントは別のジョブが使用中のため保存しません: {self.path.name}")
+                return []
+            _active_paths.add(self.path)
+            self._enabled = True
+
+        segments = []
+        truncated = False
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                for line in f:
+                    try:
+                        segments.append(json.loads(line))
+                    except json.JSONDecodeError:
+                        truncated = True
+                        break
+        except FileNotFoundError:
+            return []
+        except OSError as e:
+            logger.warning(f"⚠️ チェックポイント読み込み失敗: {e}")
+            return []
+
+        # 壊れた最終行を除いた内容で書き直す
+        if truncated:
+            self._rewrite(segments)
+        return segments
+
+    def append(self, segment: dict) -> None:
+        """
+        セグメントを1件追記（プロセスが終了しても失われないよう毎回flushする）
+
+        Args:
+            segment: {"start", "end", "text"}
+        """
+        if not self._enabled:
+            return
+        try:
+            if self._file is None:
+                self.path.parent.mkdir(parents=True, exist_ok=True)
+                self._file = open(self.path, "a", encoding="utf-8")
+            self._file.write(json.dumps(segment, ensure_ascii=False) + "\n")
+            self._file.flush()
+        except OSError as e:
+            logger.warning(f"⚠️ チェックポイント保存失敗（以降は保存しません）: {e}")
+            self.close()
+            self._enabled = False
+
+    def replace(self, segments: list[dict]) -> None:
+        """
+        保存済みの内容を指定したセグメントで置き換える（load()の後、保存済みの内容から再開しない場合）
+
+        Args:
+            segments: 保存するセグメント（時刻順）
+        """
+        if not self._enabled:
+            return
+        try:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+        except OSError as e:
+            logger.warning(f"⚠️ チェックポイント保存失敗（以降は保存しません）: {e}")
+            self._enabled = False
+            return
+        self._rewrite(segments)
+
+    def close(self) -> None:
+        """ファイルを閉じる（チェックポイントは残す）"""
+        if self._file is not None:
+            try:
+                self._file.close()
+            except OSError:
+                pass
+            self._file = None
+        with _active_lock:
+            _active_paths.discard(self.path)
+
+    def remove(self) -> None:
+        """文字起こし完了後にチェックポイントを削除"""
+        enabled = self._enabled
+        self.close()
+        if enabled:
+            try:
+                self.path.unlink()
+            except OSError:
+                pass
+
+    def _rewrite(self, segments: list[dict]) -> None:
+        tmp_path = self.path.with_suffix(".tmp")
+        try:
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                for segment in segments:
+                    f.write(json.dumps(segment, ensure_ascii=False) + "\n")
+            tmp_path.replace(self.path)
+        except OSError as e:
+            logger.warning(f"⚠️ チェックポイント書き直し失敗: {e}")
+
+
+def cleanup_stale_checkpoints(
+    checkpoint_dir: Path = CHECKPOINT_DIR, max_age_days: int = CHECKPOINT_MAX_AGE_DAYS
+) -> int:
+    """
+    古いチェックポイントを削除（再開されないまま残ったもの）
+
+    Returns:
+        int: 削除した件数
+    """
+    if not checkpoint_dir.exists():
+        return 0
+
+    threshold = time.time() - max_age_days * 24 * 60 * 60
+    removed = 0
+    for path in checkpoint_dir.glob("*.jsonl"):
+        try:
+            if path.stat().st_mtime < threshold:
+                path.unlink()
+                removed += 1
+        except OSError:
+            continue
+
+    if removed:
+        logger.info(f"🗑️ 古いチェックポイントを{removed}件削除")
+    return removed
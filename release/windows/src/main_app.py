@@ -8,6 +8,7 @@ import json
 import logging
 import multiprocessing
 import os
+import secrets
 import subprocess
 import sys
 import threading
@@ -836,7 +837,10 @@ class Bridge:
 
     def upload_audio_file(self, file_path):
         """
-        選択された音声ファイルをFastAPIサーバーにアップロード（pywebview用）
+        選択された音声ファイルをFastAPIサーバーに登録（pywebview用）
+
+        ファイルはコピーせずにローカルパスで登録し、サーバーが元のファイルをその場で読み込む。
+        登録できない場合のみ /upload に送信する
 
         Args:
             file_path: アップロードするファイルのパス
@@ -857,16 +861,26 @@ class Bridge:
 
             file_name = os.path.basename(file_path)
             file_size = os.path.getsize(file_path)
-            logger.info(f"📤 アップロード開始: {file_name} ({file_size} bytes)")
-
-            # FastAPIの /upload エンドポイントにPOST
-            with open(file_path, 'rb') as f:
-                files = {'file': (file_name, f)}
-                response = requests.post(
-                    "http://127.0.0.1:8000/upload",
-                    files=files,
-                    timeout=30
-                )
+            logger.info(f"📤 ファイル登録開始: {file_name} ({file_size} bytes)")
+
+            # FastAPIの /register-local-file エンドポイントにパスのみをPOST（ファイルは送信しない）
+            response = requests.post(
+                "http://127.0.0.1:8000/register-local-file",
+                json={"path": os.path.abspath(file_path)},
+                headers={"X-GaQ-Local-Token": os.environ.get("GAQ_LOCAL_API_TOKEN", "")},
+                timeout=30
+            )
+
+            if response.status_code != 200:
+                # 登録できない場合は /upload に送信（大きなファイルでも打ち切らないよう、応答待ちの時間制限なし）
+                logger.warning(f"⚠️ ローカルファイル登録失敗: HTTP {response.status_code} - アップロードに切り替えます")
+                with open(file_path, 'rb') as f:
+                    files = {'file': (file_name, f)}
+                    response = requests.post(
+                        "http://127.0.0.1:8000/upload",
+                        files=files,
+                        timeout=(10, None)
+                    )
 
             # レスポンスを確認
             if response.status_code == 200:
@@ -1353,6 +1367,8 @@ def main():
 
     # ★第2段階: FastAPIサーバーを別プロセスで起動（Thread→Process化）
     global server_process
+    # ローカルパスでのファイル登録用トークン（環境変数でサーバープロセスに渡す）
+    os.environ.setdefault("GAQ_LOCAL_API_TOKEN", secrets.token_hex(32))
     server_process = multiprocessing.Process(
         target=run_fastapi_server, args=("127.0.0.1", 8000), daemon=True
     )
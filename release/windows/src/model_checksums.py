@@ -0,0 +1,216 @@
+"""
+モデルファイルのチェックサム管理
+初回はモデルファイルのSHA-256を計算し、基準値（Hugging Face Hubの値、取得できない場合は初回の値）と合わせて
+マニフェストに保存する。以降はサイズ・更新時刻が同じであれば再計算せずに検証済みとみなし、
+変わっていれば再計算して基準値と比較する
+"""
+
+import hashlib
+import json
+import logging
+import mmap
+import re
+import threading
+import time
+from pathlib import Path
+from typing import Optional
+
+from config import MODEL_CHECKSUM_MANIFEST_PATH
+
+logger = logging.getLogger(__name__)
+
+# ハッシュ計算で1回に処理するバイト数
+HASH_CHUNK_SIZE = 8 * 1024 * 1024
+
+# Hugging Face Hubからメタデータを取得する際のタイムアウト（秒、オフラインの場合は初回の値を基準にする）
+METADATA_TIMEOUT_SECONDS = 5
+
+# Hugging Face HubのLFSファイルはblob名・ETagがSHA-256になっている
+_SHA256_PATTERN = re.compile(r"^[0-9a-f]{64}$")
+
+_manifest_lock = threading.Lock()
+
+
+def sha256_file(path: Path, chunk_size: int = HASH_CHUNK_SIZE) -> str:
+    """
+    ファイルのSHA-256を計算（メモリマップでチャンク単位に読み込み、コピーを作らない）
+
+    Args:
+        path: ファイルパス
+        chunk_size: 1回に処理するバイト数
+
+    Returns:
+        str: SHA-256（16進文字列）
+    """
+    sha256 = hashlib.sha256()
+    with open(path, "rb") as f:
+        size = f.seek(0, 2)
+        if size == 0:
+            return sha256.hexdigest()
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+            view = memoryview(mapped)
+            try:
+                for offset in range(0, size, chunk_size):
+                    sha256.update(view[offset:offset + chunk_size])
+            finally:
+                view.release()
+    return sha256.hexdigest()
+
+
+def expected_sha256(path: Path) -> Optional[str]:
+    """
+    Hugging Face Hubのキャッシュから期待されるSHA-256を取得
+
+    スナップショット内のファイルがblobへのシンボリックリンクで、blob名がSHA-256の場合のみ取得できる
+    （LFSで管理されているmodel.binなど。シンボリックリンクを使えない環境ではNone）
+
+    Returns:
+        str: 期待されるSHA-256（不明な場合None）
+    """
+    try:
+        if not path.is_symlink():
+            return None
+        name = path.resolve().name
+    except OSError:
+        return None
+    return name if _SHA256_PATTERN.match(name) else None
+
+
+def fetch_reference_sha256(model_name: str, revision: str, file_name: str) -> Optional[str]:
+    """
+    Hugging Face HubのメタデータからSHA-256を取得（シンボリックリンクを使えない環境向け）
+
+    LFSで管理されているファイル（model.binなど）はETagがSHA-256になっている。
+    オフライン・タイムアウトの場合や、LFSでないファイルはNone
+
+    Args:
+        model_name: モデル名
+        revision: スナップショット（コミットハッシュ）
+        file_name: ファイル名
+
+    Returns:
+        str: SHA-256（不明な場合None）
+    """
+    try:
+        from huggingface_hub import get_hf_file_metadata, hf_hub_url
+
+        url = hf_hub_url(f"Systran/faster-whisper-{model_name}", file_name, revision=revision)
+        metadata = get_hf_file_metadata(url, timeout=METADATA_TIMEOUT_SECONDS)
+    except Exception as e:
+        logger.debug(f"チェックサムの基準値を取得できません: {file_name} ({e})")
+        return None
+    etag = (metadata.etag or "").strip('"').lower()
+    return etag if _SHA256_PATTERN.match(etag) else None
+
+
+def load_manifest() -> dict:
+    """
+    チェックサムのマニフェストを読み込む
+
+    Returns:
+        dict: {モデル名: {'snapshot': str, 'files': {ファイル名: {'size', 'mtime_ns', 'sha256', 'reference'}}}}
+    """
+    with _manifest_lock:
+        try:
+            with open(MODEL_CHECKSUM_MANIFEST_PATH, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return {}
+        except (json.JSONDecodeError, OSError) as e:
+            logger.warning(f"⚠️ チェックサムマニフェストの読み込みに失敗: {e}")
+            return {}
+
+
+def _save_manifest(manifest: dict) -> None:
+    with _manifest_lock:
+        MODEL_CHECKSUM_MANIFEST_PATH.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = MODEL_CHECKSUM_MANIFEST_PATH.with_suffix(".tmp")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(manifest, f, ensure_ascii=False, indent=2)
+        tmp_path.replace(MODEL_CHECKSUM_MANIFEST_PATH)
+
+
+def verify_checksums(model_name: str, snapshot_dir: Path, file_names: list[str]) -> list[str]:
+    """
+    モデルファイルのチェックサムを検証
+
+    - マニフェストとサイズ・更新時刻が一致するファイルは検証済みとみなす（stat のみ）
+    - 一致しない・未記録のファイルはSHA-256を計算し、基準値と比較する
+      （基準値はblob名、記録済みの基準値、Hugging Face HubのETagの順。いずれもない場合は初回の値を基準にする）
+    - 基準値と一致しないファイルは破損とみなし、記録は更新しない（基準値を上書きしない）
+
+    Args:
+        model_name: モデル名
+        snapshot_dir: スナップショットディレクトリ
+        file_names: 検証するファイル名（存在するもののみ渡す）
+
+    Returns:
+        list[str]: チェックサムが一致しなかったファイル名
+    """
+    manifest = load_manifest()
+    entry = manifest.get(model_name)
+    if entry is None or entry.get("snapshot") != snapshot_dir.name:
+        entry = {"snapshot": snapshot_dir.name, "files": {}}
+
+    corrupted = []
+    changed = False
+
+    for file_name in file_names:
+        path = snapshot_dir / file_name
+        try:
+            stat = path.stat()
+        except OSError:
+            continue
+
+        recorded = entry["files"].get(file_name)
+        if recorded and recorded["size"] == stat.st_size and recorded["mtime_ns"] == stat.st_mtime_ns:
+            continue
+
+        start_time = time.time()
+        digest = sha256_file(path)
+        logger.info(
+            f"🔐 チェックサム計算: {file_name} ({stat.st_size / (1024**2):.0f}MB, {time.time() - start_time:.1f}秒)"
+        )
+
+        # 以前のマニフェストには基準値がないため、検証済みのSHA-256を基準にする
+        reference = (
+            expected_sha256(path)
+            or (recorded and recorded.get("reference", recorded.get("sha256")))
+            or fetch_reference_sha256(model_name, snapshot_dir.name, file_name)
+        )
+        if reference and digest != reference:
+            corrupted.append(file_name)
+            logger.warning(f"チェックサム不一致: {file_name} (期待値 {reference[:12]}…, 実際 {digest[:12]}…)")
+            continue
+
+        entry["files"][file_name] = {
+            "size": stat.st_size,
+            "mtime_ns": stat.st_mtime_ns,
+            "sha256": digest,
+            "reference": reference or digest,
+        }
+        changed = True
+
+    if changed:
+        manifest[model_name] = entry
+        try:
+            _save_manifest(manifest)
+        except OSError as e:
+            logger.warning(f"⚠️ チェックサムマニフェストの保存に失敗: {e}")
+
+    return corrupted
+
+
+def forget_model(model_name: str) -> None:
+    """
+    モデルのチェックサムをマニフェストから削除（モデルの削除・修復時に呼ぶ）
+
+    Args:
+        model_name: モデル名
+    """
+    manifest = load_manifest()
+    if manifest.pop(model_name, None) is not None:
+        try:
+            _save_manifest(manifest)
+        except OSError as e:
+            logger.warning(f"⚠️ チェックサムマニフェストの保存に失敗: {e}")
@@ -0,0 +1,354 @@
+"""
+モデルプール
+複数のWhisperModelをメモリ予算内で常駐させ、LRU方式で退避する
+（一定時間使われていないモデル・空きメモリが少ない場合の退避にも対応）
+"""
+
+import logging
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, NamedTuple, Optional
+
+logger = logging.getLogger(__name__)
+
+# int8（CPU）でロードした際の常駐メモリ推定値（GB）
+MODEL_MEMORY_ESTIMATES_GB = {
+    "tiny": 0.1,
+    "base": 0.2,
+    "small": 0.6,
+    "medium": 1.6,
+    "large-v2": 3.1,
+    "large-v3": 3.1,
+}
+
+# compute_typeごとのメモリ係数（int8基準）
+COMPUTE_TYPE_MEMORY_FACTORS = {
+    "int8": 1.0,
+    "int8_float32": 1.0,
+    "int8_float16": 1.0,
+    "float16": 2.0,
+    "float32": 4.0,
+}
+
+
+class ModelKey(NamedTuple):
+    """モデルプールのキー"""
+
+    model_name: str
+    compute_type: str = "int8"
+    device: str = "cpu"
+    # スレッド数・ワーカー数はキーに含めない（方式ごとに同じ重みを別々にロードしないため）
+
+
+def estimate_model_memory_gb(key: ModelKey) -> float:
+    """
+    モデルの常駐メモリを推定
+
+    Args:
+        key: モデルキー
+
+    Returns:
+        float: 推定メモリ（GB単位）
+    """
+    base = MODEL_MEMORY_ESTIMATES_GB.get(key.model_name, 1.6)
+    factor = COMPUTE_TYPE_MEMORY_FACTORS.get(key.compute_type, 1.0)
+    return base * factor
+
+
+class ModelPool:
+    """
+    ロード済みモデルのプール
+
+    (model_name, compute_type, device) をキーとしてモデルを保持し、
+    メモリ予算を超える場合は最も長く使われていないモデルから退避する
+    """
+
+    def __init__(
+        self,
+        loader: Callable[[ModelKey], Any],
+        memory_budget_gb: float,
+        in_use: Optional[Callable[[str], bool]] = None,
+        on_evict: Optional[Callable[[ModelKey, Any], None]] = None,
+    ):
+        """
+        Args:
+            loader: キャッシュミス時にモデルを生成する関数
+            memory_budget_gb: 常駐を許可するメモリ予算（GB単位）
+            in_use: モデル名を受け取り、使用中ならTrueを返す関数（使用中のモデルは退避しない）
+            on_evict: モデルを退避したときに呼ばれる関数（モデルへの参照を手放すため）
+                      （in_use・on_evictはプールのロックを解放した状態で呼ぶため、呼び出し側のロックを取得してよい）
+        """
+        self._loader = loader
+        self.memory_budget_gb = memory_budget_gb
+        self._in_use = in_use or (lambda model_name: False)
+        self._on_evict = on_evict
+        self._models: "OrderedDict[ModelKey, dict]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._load_locks: dict[ModelKey, threading.Lock] = {}
+        self._evicted_keys: set[ModelKey] = set()
+
+        # 統計情報
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.idle_evictions = 0
+        self.pressure_evictions = 0
+        self.reloads = 0
+        self.load_times: dict[ModelKey, list[float]] = {}
+
+    def get(self, key: ModelKey) -> Any:
+        """
+        モデルを取得（未ロードの場合はロードしてプールに追加）
+
+        Args:
+            key: モデルキー
+
+        Returns:
+            ロード済みモデル
+        """
+        with self._lock:
+            entry = self._touch(key)
+            if entry is not None:
+                self.hits += 1
+                logger.info(f"モデル '{key.model_name}' は既にロード済み（プールヒット）")
+                return entry["model"]
+            load_lock = self._load_locks.setdefault(key, threading.Lock())
+
+        # 同一モデルの同時ロードを防ぐ（他のモデルのヒットはブロックしない）
+        with load_lock:
+            in_use = self._in_use_snapshot()
+            with self._lock:
+                entry = self._touch(key)
+                if entry is not None:
+                    self.hits += 1
+                    return entry["model"]
+                self.misses += 1
+                if key in self._evicted_keys:
+                    # 退避後に再び必要になった（アイドル時間・メモリ閾値の調整の目安）
+                    self.reloads += 1
+                    logger.info(f"🔄 退避済みモデルを再ロード: {key.model_name} ({key.compute_type}/{key.device})")
+                evicted = self._evict_for(estimate_model_memory_gb(key), in_use)
+            self._notify_evicted(evicted)
+
+            start_time = time.time()
+            model = self._loader(key)
+            elapsed = time.time() - start_time
+
+            in_use = self._in_use_snapshot()
+            with self._lock:
+                # ロード中に他モデルが追加された場合に備えて再度予算を確認
+                evicted = self._evict_for(estimate_model_memory_gb(key), in_use)
+                self._models[key] = {
+                    "model": model,
+                    "memory_gb": estimate_model_memory_gb(key),
+                    "loaded_at": time.time(),
+                    "last_used": time.time(),
+                }
+                self.load_times.setdefault(key, []).append(elapsed)
+                logger.info(
+                    f"📦 モデルプールに追加: {key.model_name} ({key.compute_type}/{key.device}) "
+                    f"- 常駐 {len(self._models)}個, 推定 {self._used_memory_gb():.1f}/{self.memory_budget_gb:.1f}GB"
+                )
+            self._notify_evicted(evicted)
+            return model
+
+    def evict(self, key: ModelKey) -> bool:
+        """
+        指定したモデルをプールから退避
+
+        Args:
+            key: モデルキー
+
+        Returns:
+            bool: 退避した場合True
+        """
+        with self._lock:
+            if key not in self._models:
+                return False
+            evicted = [self._remove(key, "指定")]
+        self._notify_evicted(evicted)
+        return True
+
+    def evict_model(self, model_name: str) -> int:
+        """
+        指定したモデル名のモデルを全て退避
+
+        Args:
+            model_name: モデル名
+
+        Returns:
+            int: 退避したモデル数
+        """
+        with self._lock:
+            keys = [key for key in self._models if key.model_name == model_name]
+        return sum(1 for key in keys if self.evict(key))
+
+    def evict_idle(self, ttl_seconds: float) -> int:
+        """
+        ttl_seconds以上使われていないモデルを退避（使用中のモデルは除く）
+
+        Args:
+            ttl_seconds: アイドル時間の上限（秒）
+
+        Returns:
+            int: 退避したモデル数
+        """
+        now = time.time()
+        in_use = self._in_use_snapshot()
+        evicted = []
+        with self._lock:
+            idle_keys = [
+                key
+                for key, entry in self._models.items()
+                if now - entry["last_used"] >= ttl_seconds and key.model_name not in in_use
+            ]
+            for key in idle_keys:
+                idle_minutes = (now - self._models[key]["last_used"]) / 60
+                evicted.append(self._remove(key, f"アイドル {idle_minutes:.0f}分"))
+                self.idle_evictions += 1
+        self._notify_evicted(evicted)
+        return len(idle_keys)
+
+    def evict_for_memory_pressure(self) -> Optional[ModelKey]:
+        """
+        空きメモリ不足時に、最も長く使われていないモデルを1つ退避（使用中のモデルは除く）
+
+        Returns:
+            ModelKey: 退避したモデルのキー（退避できるモデルがない場合None）
+        """
+        in_use = self._in_use_snapshot()
+        with self._lock:
+            key = next((key for key in self._models if key.model_name not in in_use), None)
+            if key is None:
+                return None
+            evicted = [self._remove(key, "空きメモリ不足")]
+            self.pressure_evictions += 1
+        self._notify_evicted(evicted)
+        return key
+
+    def touch_model(self, model_name: str) -> None:
+        """
+        指定したモデル名のモデルを最新使用に更新（長時間の処理が終わった時点からアイドル時間を数える）
+
+        Args:
+            model_name: モデル名
+        """
+        with self._lock:
+            for key in [key for key in self._models if key.model_name == model_name]:
+                self._touch(key)
+
+    def resident_model_names(self) -> set[str]:
+        """常駐しているモデル名の集合"""
+        with self._lock:
+            return {key.model_name for key in self._models}
+
+    def clear(self) -> None:
+        """プール内の全モデルを退避"""
+        with self._lock:
+            evicted = [self._remove(key, "全削除") for key in list(self._models)]
+        self._notify_evicted(evicted)
+
+    def __contains__(self, key: ModelKey) -> bool:
+        with self._lock:
+            return key in self._models
+
+    def stats(self) -> dict:
+        """
+        プールの統計情報を取得
+
+        Returns:
+            dict: ヒット/ミス数、ロード時間、常駐モデル一覧など
+        """
+        in_use = self._in_use_snapshot()
+        with self._lock:
+            total_requests = self.hits + self.misses
+            all_load_times = [t for times in self.load_times.values() for t in times]
+            return {
+                "memory_budget_gb": self.memory_budget_gb,
+                "memory_used_gb": round(self._used_memory_gb(), 2),
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / total_requests, 3) if total_requests else 0.0,
+                "evictions": self.evictions,
+                "idle_evictions": self.idle_evictions,
+                "pressure_evictions": self.pressure_evictions,
+                "reloads": self.reloads,
+                "total_load_time": round(sum(all_load_times), 2),
+                "average_load_time": (
+                    round(sum(all_load_times) / len(all_load_times), 2) if all_load_times else 0.0
+                ),
+                "resident": [
+                    {
+                        "model_name": key.model_name,
+                        "compute_type": key.compute_type,
+                        "device": key.device,
+                        "memory_gb": entry["memory_gb"],
+                        "idle_seconds": round(time.time() - entry["last_used"], 1),
+                        "in_use": key.model_name in in_use,
+                        "load_times": [round(t, 2) for t in self.load_times.get(key, [])],
+                    }
+                    for key, entry in self._models.items()
+                ],
+            }
+
+    def _touch(self, key: ModelKey):
+        """ロック取得済みの状態でエントリを最新使用に更新して返す"""
+        entry = self._models.get(key)
+        if entry is not None:
+            self._models.move_to_end(key)
+            entry["last_used"] = time.time()
+        return entry
+
+    def _used_memory_gb(self) -> float:
+        """ロック取得済みの状態で常駐モデルの推定メモリ合計を返す"""
+        return sum(entry["memory_gb"] for entry in self._models.values())
+
+    def _in_use_snapshot(self) -> set[str]:
+        """
+        使用中のモデル名の集合（プールのロックを取得していない状態で呼ぶ）
+
+        in_useは呼び出し側のロックを取得するため、プールのロック中に呼ぶとロック順序が逆になりデッドロックする
+        """
+        with self._lock:
+            model_names = {key.model_name for key in self._models}
+        return {model_name for model_name in model_names if self._in_use(model_name)}
+
+    def _evict_for(self, required_gb: float, in_use: set[str]) -> list[tuple[ModelKey, Any]]:
+        """
+        ロック取得済みの状態で、required_gbが収まるまでLRU順に退避
+
+        使用中のモデル（in_use）は退避しない（実行中のジョブのモデルを外すと次のジョブで再ロードになるため）。
+        退避できるモデルがなくなった場合は、予算を超えてロードする
+
+        Returns:
+            list: 退避した (キー, モデル)（ロックを解放してから_notify_evicted()に渡す）
+        """
+        evicted = []
+        while self._used_memory_gb() + required_gb > self.memory_budget_gb:
+            key = next((key for key in self._models if key.model_name not in in_use), None)
+            if key is None:
+                logger.warning(
+                    f"⚠️ 使用中のモデルのみのため、メモリ予算を超えてロードします: "
+                    f"推定 {self._used_memory_gb() + required_gb:.1f}/{self.memory_budget_gb:.1f}GB"
+                )
+                break
+            evicted.append(self._remove(key, "メモリ予算超過、LRU"))
+        return evicted
+
+    def _notify_evicted(self, evicted: list[tuple[ModelKey, Any]]) -> None:
+        """プールのロックを解放した状態で、退避したモデルをon_evictに通知"""
+        if self._on_evict:
+            for key, model in evicted:
+                self._on_evict(key, model)
+
+    def _remove(self, key: ModelKey, reason: str) -> tuple[ModelKey, Any]:
+        """ロック取得済みの状態でモデルを退避（on_evictへの通知は呼び出し側がロック解放後に行う）"""
+        entry = self._models.pop(key)
+        self.evictions += 1
+        self._evicted_keys.add(key)
+        logger.info(
+            f"🗑️ モデルを退避（{reason}）: {key.model_name} ({key.compute_type}/{key.device}) "
+            f"- 常駐 {len(self._models)}個, 推定 {self._used_memory_gb():.1f}/{self.memory_budget_gb:.1f}GB"
+        )
+        return key, entry["model"]
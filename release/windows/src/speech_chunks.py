@@ -0,0 +1,244 @@
+"""
+発話区間ユーティリティ
+Silero VADの発話区間をもとに音声を分割・結合し、タイムスタンプを元の時間軸に戻す
+"""
+
+import bisect
+import logging
+from typing import TYPE_CHECKING, Callable, Iterable, Iterator, Optional
+
+from lazy_imports import load_faster_whisper
+
+# numpy・faster_whisperは起動を速くするため、使用時に読み込む（lazy_imports）
+if TYPE_CHECKING:
+    import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# faster-whisperの入力サンプリングレート
+SAMPLING_RATE = 16000
+
+
+def detect_speech_chunks(audio: "np.ndarray", vad_parameters: dict) -> list[dict]:
+    """
+    Silero VADで発話区間を検出
+
+    Args:
+        audio: 16kHzモノラルの音声データ
+        vad_parameters: VADパラメータ（min_silence_duration_msなど）
+
+    Returns:
+        list[dict]: 発話区間のリスト（start/endはサンプル単位）
+    """
+    load_faster_whisper()
+    from faster_whisper.vad import VadOptions, get_speech_timestamps
+
+    return get_speech_timestamps(audio, VadOptions(**vad_parameters))
+
+
+def merge_speech_chunks(speech_chunks: list[dict], vad_parameters: dict) -> list[dict]:
+    """
+    発話区間を最大max_speech_duration_s秒のクリップにまとめる
+
+    BatchedInferencePipelineがvad_filter=Trueの場合に内部で行う結合と同じ処理で、
+    結果はclip_timestampsとしてそのまま渡せる。
+
+    Args:
+        speech_chunks: 発話区間のリスト（max_speech_duration_sを含むvad_parametersで検出したもの）
+        vad_parameters: VADパラメータ
+
+    Returns:
+        list[dict]: クリップのリスト（start/endは秒単位）
+    """
+    load_faster_whisper()
+    from faster_whisper.vad import VadOptions, merge_segments
+
+    clips = merge_segments(speech_chunks, VadOptions(**vad_parameters), SAMPLING_RATE)
+    return [{"start": clip["start"] / SAMPLING_RATE, "end": clip["end"] / SAMPLING_RATE} for clip in clips]
+
+
+def split_speech_chunks(speech_chunks: list[dict], target_samples: int) -> list[list[dict]]:
+    """
+    発話区間を無音の境界でグループに分割
+
+    1グループの発話長がtarget_samplesを超えた時点で次のグループに移る。
+    発話区間の途中では分割しないため、単語が途切れることはない。
+
+    Args:
+        speech_chunks: 発話区間のリスト
+        target_samples: 1グループあたりの目標発話長（サンプル単位）
+
+    Returns:
+        list[list[dict]]: グループごとの発話区間リスト
+    """
+    groups = []
+    current = []
+    current_samples = 0
+
+    for chunk in speech_chunks:
+        length = chunk["end"] - chunk["start"]
+        if current and current_samples + length > target_samples:
+            groups.append(current)
+            current = []
+            current_samples = 0
+        current.append(chunk)
+        current_samples += length
+
+    if current:
+        groups.append(current)
+
+    return groups
+
+
+def trim_speech_chunks(speech_chunks: list[dict], start_sample: int) -> list[dict]:
+    """
+    指定位置以降の発話区間のみを残す（途中から再開する場合に使用）
+
+    start_sampleをまたぐ区間は、start_sampleから始まるように切り詰める。
+
+    Args:
+        speech_chunks: 発話区間のリスト
+        start_sample: 開始位置（サンプル単位）
+
+    Returns:
+        list[dict]: start_sample以降の発話区間
+    """
+    trimmed = []
+    for chunk in speech_chunks:
+        if chunk["end"] <= start_sample:
+            continue
+        trimmed.append({"start": max(chunk["start"], start_sample), "end": chunk["end"]})
+    return trimmed
+
+
+def iter_speech_windows(
+    windows: Iterable["np.ndarray"], vad_parameters: dict, window_samples: int, skip_samples: int = 0
+) -> Iterator[tuple["np.ndarray", list[dict], int]]:
+    """
+    一定時間ごとの音声から、窓ごとに発話区間を検出
+
+    窓の末尾で発話が続いている場合は、その発話の先頭から次の窓に持ち越すため、発話の途中では区切らない
+    （1窓より長い発話は持ち越さない）。
+
+    Args:
+        windows: 窓ごとの音声データ（audio_stream.iter_audio_windowsなど）
+        vad_parameters: VADパラメータ
+        window_samples: 1窓の長さ（サンプル単位）
+        skip_samples: この位置より前の発話区間は除く（チェックポイントからの再開時。窓全体が前ならVADも行わない）
+
+    Yields:
+        tuple: (音声, 発話区間（音声内のサンプル位置）, 音声の先頭の元の音声におけるサンプル位置)
+    """
+    import numpy as np
+
+    carry = np.zeros(0, dtype=np.float32)
+    offset = 0  # 処理中の音声の先頭の、元の音声におけるサンプル位置
+
+    def split(audio: "np.ndarray", final: bool):
+        """発話区間を検出し、(発話区間, 次の窓に持ち越す位置) を返す"""
+        speech_chunks = detect_speech_chunks(audio, vad_parameters)
+        cut = len(audio)
+        if (
+            not final
+            and speech_chunks
+            and speech_chunks[-1]["end"] >= len(audio) - SAMPLING_RATE
+            and len(audio) - speech_chunks[-1]["start"] < window_samples
+        ):
+            cut = speech_chunks.pop()["start"]
+        return trim_speech_chunks(speech_chunks, skip_samples - offset), cut
+
+    for window in windows:
+        audio = np.concatenate([carry, window]) if carry.size else window
+        del window
+        if offset + len(audio) <= skip_samples:
+            offset += len(audio)
+            carry = audio[:0]
+            continue
+
+        speech_chunks, cut = split(audio, final=False)
+        yield audio, speech_chunks, offset
+        carry = audio[cut:].copy()
+        offset += cut
+        del audio
+
+    if carry.size:
+        speech_chunks, _ = split(carry, final=True)
+        yield carry, speech_chunks, offset
+
+
+class SpeechTimeline:
+    """発話区間を結合した音声の時刻を、元の音声の時刻に変換する"""
+
+    def __init__(self, speech_chunks: list[dict], sampling_rate: int = SAMPLING_RATE):
+        self.speech_chunks = speech_chunks
+        self.sampling_rate = sampling_rate
+        # 結合後の音声における各区間の開始サンプル
+        self.offsets = []
+        total = 0
+        for chunk in speech_chunks:
+            self.offsets.append(total)
+            total += chunk["end"] - chunk["start"]
+        self.total_samples = total
+
+    def to_original(self, seconds: float, is_end: bool = False) -> float:
+        """
+        結合後の時刻（秒）を元の音声の時刻（秒）に変換
+
+        Args:
+            seconds: 結合後の音声における時刻
+            is_end: セグメントの終了時刻の場合True（区間境界では前の区間に属させる）
+
+        Returns:
+            float: 元の音声における時刻
+        """
+        sample = int(round(seconds * self.sampling_rate))
+        index = bisect.bisect_right(self.offsets, sample) - 1
+        if is_end and index > 0 and sample == self.offsets[index]:
+            index -= 1
+        index = max(0, min(index, len(self.speech_chunks) - 1))
+
+        chunk = self.speech_chunks[index]
+        original = min(chunk["start"] + (sample - self.offsets[index]), chunk["end"])
+        return original / self.sampling_rate
+
+
+def transcribe_speech_chunks(
+    model,
+    audio: "np.ndarray",
+    speech_chunks: list[dict],
+    progress_callback: Optional[Callable[[float], None]] = None,
+    **transcribe_options,
+) -> Iterator[dict]:
+    """
+    発話区間のみを結合して文字起こしし、元の時間軸のセグメントを返す
+
+    faster-whisperのvad_filterと同じ処理を、事前に求めた発話区間で行う。
+
+    Args:
+        model: WhisperModel
+        audio: 16kHzモノラルの音声データ（全体）
+        speech_chunks: 文字起こし対象の発話区間
+        progress_callback: 処理済みの発話長（秒）を受け取るコールバック
+        **transcribe_options: model.transcribeに渡す追加オプション（languageなど）
+
+    Yields:
+        dict: {"start": float, "end": float, "text": str}
+    """
+    if not speech_chunks:
+        return
+
+    import numpy as np
+
+    timeline = SpeechTimeline(speech_chunks)
+    speech_audio = np.concatenate([audio[chunk["start"]:chunk["end"]] for chunk in speech_chunks])
+
+    segments, _ = model.transcribe(speech_audio, vad_filter=False, **transcribe_options)
+
+    for segment in segments:
+        yield {
+            "start": round(timeline.to_original(segment.start), 3),
+            "end": round(timeline.to_original(segment.end, is_end=True), 3),
+            "text": segment.text.strip(),
+        }
+        if progress_callback:
+            progress_callback(segment.end)
@@ -3,16 +3,17 @@
 faster-whisperを使用した音声認識
 """
 
+import concurrent.futures
 import hashlib
 import json
 import logging
 import os
-import re
 import shutil
 import sys
+import threading
 import time
 from pathlib import Path
-from typing import Any, Optional
+from typing import TYPE_CHECKING, Any, Optional
 
 # ===== Windows対応: シンボリックリンク無効化 =====
 # 配布版で管理者権限を要求しないための設定
@@ -49,8 +50,44 @@ def setup_ffmpeg_path():
 setup_ffmpeg_path()
 # ============================
 
-from faster_whisper import WhisperModel
-from huggingface_hub import snapshot_download
+from audio_stream import decode_audio_range, iter_audio_windows, probe_duration
+from auto_tuning import get_cached_system_info, get_tuned_settings
+from cancellation import CancellationToken, TranscriptionCancelled
+from checkpoint import TranscriptionCheckpoint
+from config import (
+    BATCH_SIZE,
+    MODEL_MONITOR_INTERVAL_SECONDS,
+    MODEL_POOL_MEMORY_BUDGET_GB,
+    PARALLEL_MIN_CHUNK_SECONDS,
+    PARALLEL_WORKERS,
+    REFINE_DRAFT_MODEL,
+    REFINE_GROUP_SECONDS,
+    STREAMING_MIN_MINUTES,
+    STREAMING_WINDOW_SECONDS,
+)
+from lazy_imports import load_faster_whisper
+from model_checksums import forget_model, verify_checksums
+from model_inventory import model_inventory
+from model_pool import ModelKey, ModelPool
+from pcm_cache import pcm_cache
+from progressive_decode import DECODE_WINDOW_SECONDS, GrowingFile, UploadAborted
+from result_cache import make_cache_key, result_cache
+from speech_chunks import (
+    SAMPLING_RATE,
+    detect_speech_chunks,
+    iter_speech_windows,
+    merge_speech_chunks,
+    split_speech_chunks,
+    transcribe_speech_chunks,
+    trim_speech_chunks,
+)
+from system_info import get_memory_info
+from text_formatter import TranscriptFormatter
+from vad_cache import get_speech_chunks
+
+# faster_whisperは起動を速くするため、最初にモデルを使う時点で読み込む（lazy_imports）
+if TYPE_CHECKING:
+    from faster_whisper import WhisperModel
 
 logger = logging.getLogger(__name__)
 
@@ -60,11 +97,19 @@ MODEL_REQUIRED_FILES = {
     "large-v3": ["model.bin", "config.json", "vocabulary.json", "tokenizer.json"],
 }
 
+# VADパラメータ（全モード共通）
+VAD_PARAMETERS = {"min_silence_duration_ms": 500}
+
+# バッチモードで1回に処理するクリップの最大長（秒、Whisperの入力長）
+BATCH_CHUNK_SECONDS = 30
+
 
 def check_model_exists(model_name: str) -> dict:
     """
     モデルがダウンロード済みか確認
 
+    モデルディレクトリの更新時刻が変わっていなければ、前回の走査結果を返す（model_inventory）
+
     Args:
         model_name: モデル名（medium, large-v3など）
 
@@ -75,40 +120,15 @@ def check_model_exists(model_name: str) -> dict:
             'path': str          # モデルパス（存在する場合のみ）
         }
     """
-    cache_dir = Path.home() / ".cache" / "huggingface" / "hub"
-    model_dir = cache_dir / f"models--Systran--faster-whisper-{model_name}"
-
-    exists = model_dir.exists()
-    size_gb = 0
-
-    if exists:
-        # ディレクトリサイズを計算
-        total_size = sum(f.stat().st_size for f in model_dir.rglob("*") if f.is_file())
-        size_gb = total_size / (1024**3)  # GB単位
-    else:
-        # 推定サイズ（未ダウンロード時）
-        size_estimates = {
-            "tiny": 0.075,
-            "base": 0.14,
-            "small": 0.46,
-            "medium": 1.5,
-            "large-v2": 2.9,
-            "large-v3": 2.9,
-        }
-        size_gb = size_estimates.get(model_name, 1.5)
-
-    return {
-        "exists": exists,
-        "size_gb": round(size_gb, 2),
-        "path": str(model_dir) if exists else None,
-    }
+    return model_inventory.get(model_name)
 
 
 def verify_model_integrity(model_name: str) -> dict:
     """
     モデルの整合性を検証
 
-    必須ファイルの存在確認と、config.jsonの読み取りテストを行う
+    必須ファイルの存在確認、SHA-256の検証（初回のみ計算し、以降はサイズ・更新時刻が変わった場合のみ）、
+    config.jsonの読み取りテストを行う
 
     Args:
         model_name: モデル名（medium, large-v3など）
@@ -165,6 +185,15 @@ def verify_model_integrity(model_name: str) -> dict:
                 result["corrupted_files"].append(file_name)
                 logger.warning(f"ファイルが破損（サイズ0）: {file_name}")
 
+    # チェックサムの検証（切り詰められたmodel.binなどを検出）
+    checked_files = [
+        name for name in required_files
+        if name not in result["missing_files"] and name not in result["corrupted_files"]
+    ]
+    for file_name in verify_checksums(model_name, latest_snapshot, checked_files):
+        result["corrupted_files"].append(file_name)
+        logger.warning(f"ファイルが破損（チェックサム不一致）: {file_name}")
+
     # config.jsonの読み取りテスト
     config_path = latest_snapshot / "config.json"
     if config_path.exists():
@@ -207,6 +236,8 @@ def repair_corrupted_model(model_name: str) -> bool:
     try:
         logger.info(f"🔧 破損モデルを削除中: {model_name}")
         shutil.rmtree(model_dir)
+        model_inventory.invalidate(model_name)
+        forget_model(model_name)
         logger.info(f"✅ 破損モデル削除完了: {model_name}")
         return True
     except Exception as e:
@@ -235,6 +266,8 @@ def delete_model(model_name: str) -> dict:
 
     try:
         shutil.rmtree(model_dir)
+        model_inventory.invalidate(model_name)
+        forget_model(model_name)
         # 表示名を整形（large-v3 → Large-v3）
         display_name = "Large-v3" if model_name.lower() == "large-v3" else model_name
         logger.info(f"✅ モデル削除完了: {model_name}")
@@ -244,6 +277,77 @@ def delete_model(model_name: str) -> dict:
         return {"success": False, "message": f"削除失敗: {str(e)}"}
 
 
+def compute_audio_hash(audio_path: Path, chunk_size: int = 1024 * 1024) -> str:
+    """
+    音声ファイルのSHA-256を計算（チャンク単位で読み込み、メモリ使用量を一定に保つ）
+
+    Args:
+        audio_path: 音声ファイルパス
+        chunk_size: 1回に読み込むバイト数
+
+    Returns:
+        str: SHA-256（16進文字列）
+    """
+    sha256 = hashlib.sha256()
+    with open(audio_path, "rb") as f:
+        while chunk := f.read(chunk_size):
+            sha256.update(chunk)
+    return sha256.hexdigest()
+
+
+def normalize_time_ranges(ranges: list) -> list[list]:
+    """
+    文字起こしする時間範囲を検証し、開始時刻順に並べて重なりを結合する
+
+    Args:
+        ranges: [開始, 終了] のリスト（秒、終了がNoneの場合は末尾まで）
+
+    Returns:
+        list[list]: 正規化した範囲のリスト
+
+    Raises:
+        ValueError: 開始が負、または終了が開始以前の場合
+    """
+    normalized = []
+    for start, end in sorted(((float(start), end) for start, end in ranges), key=lambda r: r[0]):
+        end = None if end is None else float(end)
+        if start < 0 or (end is not None and end <= start):
+            raise ValueError(f"無効な時間範囲です: {start}～{'' if end is None else end}秒")
+        if normalized and (normalized[-1][1] is None or start <= normalized[-1][1]):
+            last = normalized[-1]
+            last[1] = None if last[1] is None or end is None else max(last[1], end)
+        else:
+            normalized.append([start, end])
+    return normalized
+
+
+def get_parallel_settings(model_name: str) -> tuple[int, int]:
+    """
+    並列処理のワーカー数とワーカーあたりのスレッド数を決定
+
+    GAQ_PARALLEL_WORKERS の指定を優先し、次に自動チューニング結果、
+    どちらもなければ物理コア数から決定する
+
+    Args:
+        model_name: モデル名
+
+    Returns:
+        tuple[int, int]: (ワーカー数, ワーカーあたりのcpu_threads)
+    """
+    physical_cores = get_cached_system_info()["physical_cores"]
+    tuned = get_tuned_settings(model_name)
+
+    if PARALLEL_WORKERS:
+        num_workers = PARALLEL_WORKERS
+    elif tuned:
+        return tuned["parallel_workers"], tuned["parallel_cpu_threads"]
+    else:
+        num_workers = max(1, min(4, physical_cores // 2))
+
+    cpu_threads = max(1, physical_cores // num_workers)
+    return num_workers, cpu_threads
+
+
 def format_text_with_linebreaks(text: str) -> str:
     """
     テキストに適切な改行を追加
@@ -256,15 +360,9 @@ def format_text_with_linebreaks(text: str) -> str:
     Returns:
         改行を含むテキスト
     """
-    # 句点・感嘆符・疑問符の後に改行を追加
-    # ただし、引用符内や数字の後は除外
-    text = re.sub(r"([。！？])(?=[^」』）\)])", r"\1\n", text)
-
-    # 連続する改行を1つにまとめる
-    text = re.sub(r"\n+", "\n", text)
-
-    # 先頭と末尾の空白・改行を削除
-    return text.strip()
+    formatter = TranscriptFormatter(sparse_fallback=False, pause_seconds=None)
+    formatter.add_text(text)
+    return formatter.text()
 
 
 class TranscriptionService:
@@ -273,17 +371,140 @@ class TranscriptionService:
     def __init__(self):
         self.model = None
         self.current_model_name = None
+        # 文字起こし中のモデル（モデル名ごとの実行数）
+        self._active_models: dict[str, int] = {}
+        self._active_lock = threading.Lock()
+        self._monitor_thread: Optional[threading.Thread] = None
+        self.model_pool = ModelPool(
+            self._create_model,
+            MODEL_POOL_MEMORY_BUDGET_GB,
+            in_use=self.is_model_in_use,
+            on_evict=self._on_model_evicted,
+        )
+
+    def is_model_in_use(self, model_name: str) -> bool:
+        """モデルが文字起こしに使用中かどうか"""
+        with self._active_lock:
+            return self._active_models.get(model_name, 0) > 0
+
+    def _set_model_active(self, model_name: str, active: bool) -> None:
+        with self._active_lock:
+            count = self._active_models.get(model_name, 0) + (1 if active else -1)
+            self._active_models[model_name] = max(0, count)
+        if not active:
+            # 処理が終わった時点からアイドル時間を数える
+            self.model_pool.touch_model(model_name)
+
+    def _on_model_evicted(self, key: ModelKey, model: "WhisperModel") -> None:
+        """モデル退避時に参照を手放す（参照が残っているとメモリが解放されない）"""
+        if self.model is model:
+            self.model = None
+            self.current_model_name = None
+
+    def start_model_monitor(
+        self,
+        idle_ttl_seconds: float,
+        memory_threshold_gb: float,
+        interval_seconds: float = MODEL_MONITOR_INTERVAL_SECONDS,
+    ) -> None:
+        """
+        常駐モデルの監視を開始（バックグラウンドスレッド）
+
+        Args:
+            idle_ttl_seconds: この時間使われていないモデルを退避（0: 無効）
+            memory_threshold_gb: 空きメモリがこれを下回ったらモデルを退避（0: 無効）
+            interval_seconds: 確認間隔（秒）
+        """
+        if self._monitor_thread is not None or (idle_ttl_seconds <= 0 and memory_threshold_gb <= 0):
+            return
+
+        def monitor():
+            while True:
+                time.sleep(interval_seconds)
+                try:
+                    self.check_model_residency(idle_ttl_seconds, memory_threshold_gb)
+                except Exception as e:
+                    logger.warning(f"⚠️ モデル監視エラー: {e}")
+
+        self._monitor_thread = threading.Thread(target=monitor, name="model-monitor", daemon=True)
+        self._monitor_thread.start()
+        logger.info(
+            f"👀 モデル監視開始: アイドル退避 {idle_ttl_seconds / 60:.0f}分, 空きメモリ閾値 {memory_threshold_gb}GB"
+        )
+
+    def check_model_residency(self, idle_ttl_seconds: float, memory_threshold_gb: float) -> None:
+        """
+        アイドル状態のモデルと空きメモリを確認し、必要に応じてモデルを退避
 
-    def load_model(self, model_name: str = "medium") -> None:
+        Args:
+            idle_ttl_seconds: この時間使われていないモデルを退避（0: 無効）
+            memory_threshold_gb: 空きメモリがこれを下回ったらモデルを退避（0: 無効）
+        """
+        if idle_ttl_seconds > 0:
+            self.model_pool.evict_idle(idle_ttl_seconds)
+
+        if memory_threshold_gb <= 0:
+            return
+
+        # 退避するとメモリはすぐに解放されるため、閾値を上回るまで1つずつ退避
+        while True:
+            available_gb = get_memory_info()["available_gb"]
+            if available_gb is None or available_gb >= memory_threshold_gb:
+                return
+            logger.warning(f"⚠️ 空きメモリ不足: {available_gb}GB（閾値 {memory_threshold_gb}GB）")
+            if self.model_pool.evict_for_memory_pressure() is None:
+                return
+
+    def load_model(
+        self,
+        model_name: str = "medium",
+        compute_type: Optional[str] = None,
+        device: str = "cpu",
+    ) -> "WhisperModel":
         """
         モデルをロード（必要に応じてダウンロード）
 
+        モデルプールに常駐していれば再利用し、なければロードしてプールに追加する。
+        compute_typeを省略した場合は自動チューニング結果を使用する。
+        逐次処理・並列処理で同じモデルを共有する（スレッド数・ワーカー数はロード時に決める）
+
         Args:
             model_name: モデル名（medium, large-v3）
+            compute_type: 計算精度（None: チューニング結果、未計測ならint8）
+            device: 実行デバイス（cpu）
+
+        Returns:
+            WhisperModel: ロード済みモデル
         """
-        if self.current_model_name == model_name and self.model is not None:
-            logger.info(f"モデル '{model_name}' は既にロード済み")
-            return
+        model = self.model_pool.get(self._model_key(model_name, compute_type, device))
+        self.model = model
+        self.current_model_name = model_name
+        return model
+
+    def _model_key(self, model_name: str, compute_type: Optional[str] = None, device: str = "cpu") -> ModelKey:
+        """モデルプールのキー（compute_typeを省略した場合は自動チューニング結果、未計測ならint8）"""
+        if compute_type is None:
+            compute_type = (get_tuned_settings(model_name) or {}).get("compute_type", "int8")
+        return ModelKey(model_name, compute_type, device)
+
+    def _create_model(self, key: ModelKey) -> "WhisperModel":
+        """
+        モデルを生成（モデルプールのキャッシュミス時に呼ばれる）
+
+        Args:
+            key: モデルキー
+
+        Returns:
+            WhisperModel: 生成したモデル
+        """
+        # 初回はここでfaster_whisperを読み込む
+        WhisperModel = load_faster_whisper().WhisperModel
+        model_name = key.model_name
+
+        # スレッド数は逐次処理のチューニング結果、ワーカー数は並列処理のワーカー数
+        # （1つのモデルを逐次処理・並列処理で共有する。逐次処理ではワーカーを1つだけ使う）
+        cpu_threads = (get_tuned_settings(model_name) or {}).get("cpu_threads", 0)
+        num_workers, _ = get_parallel_settings(model_name)
 
         # モデル存在チェック
         model_info = check_model_exists(model_name)
@@ -309,20 +530,29 @@ class TranscriptionService:
                     )
 
         logger.info(f"モデル '{model_name}' をロード中...")
-        logger.info(f"  compute_type: int8 (CPU最適化)")
-        logger.info(f"  device: cpu")
+        logger.info(f"  compute_type: {key.compute_type}")
+        logger.info(f"  device: {key.device}")
+        logger.info(f"  cpu_threads: {cpu_threads}, num_workers: {num_workers}")
         start_time = time.time()
 
         try:
             # faster-whisperが自動でダウンロード
             logger.info("  WhisperModel初期化開始...")
-            self.model = WhisperModel(model_name, device="cpu", compute_type="int8")
+            model = WhisperModel(
+                model_name,
+                device=key.device,
+                compute_type=key.compute_type,
+                cpu_threads=cpu_threads,
+                num_workers=num_workers,
+            )
             logger.info("  WhisperModel初期化完了")
+            if not model_info["exists"]:
+                model_inventory.invalidate(model_name)
 
-            self.current_model_name = model_name
             elapsed = time.time() - start_time
 
             logger.info(f"✅ モデルロード完了: {model_name} ({elapsed:.1f}秒)")
+            return model
 
         except PermissionError as e:
             error_str = str(e)
@@ -351,11 +581,17 @@ class TranscriptionService:
                 # 再試行1: 通常の方法でもう一度試す
                 logger.info("🔄 モデルダウンロードを再試行（1回目）...")
                 try:
-                    self.model = WhisperModel(model_name, device="cpu", compute_type="int8")
-                    self.current_model_name = model_name
+                    model = WhisperModel(
+                        model_name,
+                        device=key.device,
+                        compute_type=key.compute_type,
+                        cpu_threads=cpu_threads,
+                        num_workers=num_workers,
+                    )
+                    model_inventory.invalidate(model_name)
                     elapsed = time.time() - start_time
                     logger.info(f"✅ モデルロード完了（再試行成功）: {model_name} ({elapsed:.1f}秒)")
-                    return  # 成功したら処理を抜ける
+                    return model  # 成功したら処理を抜ける
                 except PermissionError:
                     # 再試行1でも失敗した場合、fallbackに進む
                     logger.warning("⚠️ 再試行1でも失敗: symlinkを使わないダウンロードに切り替え")
@@ -380,6 +616,8 @@ class TranscriptionService:
                         logger.info(f"   fallbackディレクトリを作成: {fallback_dir}")
 
                         # snapshot_downloadでモデルをダウンロード（symlink/hardlink完全無効）
+                        from huggingface_hub import snapshot_download
+
                         logger.info(f"   モデルダウンロード中（symlink/hardlink無効、実体ファイルコピー）...")
                         model_path = snapshot_download(
                             repo_id=f"Systran/faster-whisper-{model_name}",
@@ -394,15 +632,16 @@ class TranscriptionService:
                         logger.info(f"🔄 Fallbackでダウンロード完了、モデルをロード中...")
 
                         # fallback_dirからモデルをロード
-                        self.model = WhisperModel(
+                        model = WhisperModel(
                             str(fallback_dir),
-                            device="cpu",
-                            compute_type="int8"
+                            device=key.device,
+                            compute_type=key.compute_type,
+                            cpu_threads=cpu_threads,
+                            num_workers=num_workers,
                         )
-                        self.current_model_name = model_name
                         elapsed = time.time() - start_time
                         logger.info(f"✅ モデルロード完了（Fallback成功、symlink無効モード）: {model_name} ({elapsed:.1f}秒)")
-                        return  # 成功したら処理を抜ける
+                        return model  # 成功したら処理を抜ける
 
                     except Exception as fallback_error:
                         logger.error(f"❌ Fallbackでも失敗: {fallback_error}")
@@ -455,131 +694,929 @@ class TranscriptionService:
         model_name: str = "medium",
         language: str = "ja",
         progress_callback=None,
+        mode: str = "standard",
+        audio_hash: Optional[str] = None,
+        segment_callback=None,
+        cancel_token: Optional[CancellationToken] = None,
+        refine_callback=None,
+        ranges: Optional[list] = None,
     ) -> dict[str, Any]:
         """
         音声ファイルを文字起こし
 
+        同じ内容・同じ条件の結果がキャッシュにあれば、モデルを実行せずに返す。
+        cancel_tokenで中止が要求された場合は、次のセグメントの区切りで処理を止める。
+        デコード済みのセグメントはチェックポイントに逐次保存し、前回中断していれば続きから再開する
+
         Args:
             audio_path: 音声ファイルパス
             model_name: 使用するモデル
             language: 言語コード
             progress_callback: 進捗コールバック関数（0.0～1.0の進捗を受け取る）
+            mode: 文字起こし方式（standard, parallel, batched, streaming, refine）
+            audio_hash: 音声ファイルのSHA-256（計算済みの場合）
+            segment_callback: セグメントコールバック関数（デコード済みのセグメントを時刻順に受け取る）
+            cancel_token: 中止トークン
+            refine_callback: 二段階処理で確定したグループ（グループ番号, セグメントリスト）を受け取る関数
+                             （指定した場合、segment_callbackには下書きのセグメントが渡される。
+                             未指定の場合は下書きを作らず、確定したセグメントをsegment_callbackに渡す）
+            ranges: 文字起こしする時間範囲 [[開始, 終了], ...]（秒、終了がNoneの場合は末尾まで、
+                    Noneの場合は全体。指定した場合は方式によらず範囲ごとに逐次処理する）
 
         Returns:
-            文字起こし結果
+            文字起こし結果（中止された場合は cancelled: True）
         """
         try:
-            # モデルをロード
-            self.load_model(model_name)
+            # 結果キャッシュを確認
+            if ranges:
+                ranges = normalize_time_ranges(ranges)
+            if audio_hash is None:
+                audio_hash = compute_audio_hash(audio_path)
+            cache_key = make_cache_key(audio_hash, model_name, language, mode, VAD_PARAMETERS, ranges)
+            cached_result = self._get_cached_result(cache_key)
+            if cached_result is not None:
+                return cached_result
+
+            # チェックポイントを確認（前回中断していれば、最後のセグメントの終了時刻から再開）
+            checkpoint = TranscriptionCheckpoint(cache_key)
+            resumed_segments = checkpoint.load()
+            resume_from = resumed_segments[-1]["end"] if resumed_segments else 0.0
+            if resumed_segments:
+                logger.info(
+                    f"⏯️ チェックポイントから再開: {len(resumed_segments)}セグメント ({resume_from:.1f}秒まで処理済み)"
+                )
+                if segment_callback:
+                    for segment in resumed_segments:
+                        segment_callback(segment)
+
+            def on_segment(segment: dict):
+                """セグメントをチェックポイントに保存してから通知"""
+                checkpoint.append(segment)
+                if segment_callback:
+                    segment_callback(segment)
+
+            def on_refine(group: int, segments: list[dict]):
+                """二段階処理で確定したグループをチェックポイントに保存してから通知"""
+                for segment in segments:
+                    checkpoint.append(segment)
+                if refine_callback:
+                    refine_callback(group, segments)
+                elif segment_callback:
+                    for segment in segments:
+                        segment_callback(segment)
+
+            self._set_model_active(model_name, True)
+            try:
+                start_time = time.time()
+                if ranges:
+                    segment_list, detected_language = self._transcribe_ranges(
+                        audio_path, model_name, language, ranges, progress_callback, on_segment, cancel_token,
+                        resume_from, audio_hash=audio_hash,
+                    )
+                elif mode == "parallel":
+                    segment_list, detected_language = self._transcribe_parallel(
+                        audio_path, model_name, language, progress_callback, on_segment, cancel_token, resume_from,
+                        audio_hash=audio_hash,
+                    )
+                elif mode == "refine":
+                    segment_list, detected_language = self._transcribe_refine(
+                        audio_path, model_name, language, progress_callback,
+                        segment_callback if refine_callback else None, on_refine, cancel_token, resume_from,
+                        audio_hash=audio_hash,
+                    )
+                elif self._use_streaming(audio_path, mode):
+                    segment_list, detected_language = self._transcribe_streaming(
+                        audio_path, model_name, language, progress_callback, on_segment, cancel_token, resume_from
+                    )
+                elif resume_from > 0:
+                    # 逐次処理・バッチ処理は、処理済みの区間を除いた発話区間で続きを文字起こし
+                    segment_list, detected_language = self._transcribe_remaining(
+                        audio_path, model_name, language, resume_from, progress_callback, on_segment, cancel_token,
+                        audio_hash=audio_hash,
+                    )
+                elif mode == "batched":
+                    segment_list, detected_language = self._transcribe_batched(
+                        audio_path, model_name, language, progress_callback, on_segment, cancel_token,
+                        audio_hash=audio_hash,
+                    )
+                else:
+                    segment_list, detected_language = self._transcribe_standard(
+                        audio_path, model_name, language, progress_callback, on_segment, cancel_token,
+                        audio_hash=audio_hash,
+                    )
+            finally:
+                checkpoint.close()
+                self._set_model_active(model_name, False)
+
+            result = self._build_result(resumed_segments + segment_list, detected_language, start_time)
+            if ranges:
+                result["ranges"] = ranges
+            result_cache.put(cache_key, result)
+            checkpoint.remove()
+            return result
+
+        except TranscriptionCancelled:
+            logger.info(f"⏹️ 文字起こし中止: {audio_path.name}")
+            return {"success": False, "cancelled": True, "error": "文字起こしを中止しました"}
+
+        except Exception as e:
+            return self._error_result(e)
+
+    def transcribe_upload(
+        self,
+        upload: GrowingFile,
+        model_name: str = "medium",
+        language: str = "ja",
+        mode: str = "standard",
+        progress_callback=None,
+        segment_callback=None,
+        cancel_token: Optional[CancellationToken] = None,
+    ) -> dict[str, Any]:
+        """
+        受信中の音声ファイルを、届いた分から文字起こし（アップロードと文字起こしを並行して行う）
+
+        ストリーミング処理と同じく、窓ごとにVADで発話区間を求めて文字起こしする（standard, streaming用）。
+        結果キャッシュ・チェックポイントのキーとなるSHA-256は受信完了まで分からないため、
+        受信完了後にチェックポイントを開き、それまでのセグメントを書き込んでから追記する。
+        受信完了後の結果キャッシュの確認は呼び出し側で行い、ヒットした場合はcancel_tokenで中止する
+
+        Args:
+            upload: 受信中のファイル（受信完了時にfinish()でSHA-256が通知される）
+            model_name: 使用するモデル
+            language: 言語コード
+            mode: 文字起こし方式（キャッシュのキーに使う）
+            progress_callback: 進捗コールバック関数（受信完了後、0.0～1.0の進捗を受け取る）
+            segment_callback: セグメントコールバック関数（デコード済みのセグメントを時刻順に受け取る）
+            cancel_token: 中止トークン
 
-            logger.info(f"文字起こし開始: {audio_path.name}")
+        Returns:
+            文字起こし結果（中止された場合・アップロードが中断された場合は cancelled: True）
+        """
+        segment_list = []
+        checkpoint = None
+        cache_key = None
+        total_duration = None
+
+        def open_checkpoint():
+            """受信完了後、確定したキーでチェックポイントを開き、それまでのセグメントを書き込む"""
+            nonlocal checkpoint, cache_key, total_duration
+            audio_hash = upload.sha256 or compute_audio_hash(upload.path)
+            cache_key = make_cache_key(audio_hash, model_name, language, mode, VAD_PARAMETERS, None)
+            checkpoint = TranscriptionCheckpoint(cache_key)
+            checkpoint.load()
+            checkpoint.replace(segment_list)
+            total_duration = probe_duration(upload.path)
+
+        def on_segment(segment: dict):
+            segment_list.append(segment)
+            if checkpoint is not None:
+                checkpoint.append(segment)
+            elif upload.complete:
+                open_checkpoint()
+            if segment_callback:
+                segment_callback(segment)
+            if progress_callback and total_duration:
+                progress_callback(min(segment["end"] / total_duration, 0.95))
+
+        self._set_model_active(model_name, True)
+        try:
             start_time = time.time()
+            model = self.load_model(model_name)
+            logger.info(f"文字起こし開始（受信と並行、{DECODE_WINDOW_SECONDS}秒ごと）: {upload.path.name}")
+
+            with upload.open() as reader:
+                self._transcribe_windows(
+                    model, iter_audio_windows(reader, DECODE_WINDOW_SECONDS), language,
+                    DECODE_WINDOW_SECONDS * SAMPLING_RATE, on_segment, cancel_token,
+                )
+            if checkpoint is None:
+                open_checkpoint()
+
+            result = self._build_result(segment_list, language, start_time)
+            result_cache.put(cache_key, result)
+            checkpoint.remove()
+            return result
+
+        except TranscriptionCancelled:
+            logger.info(f"⏹️ 文字起こし中止: {upload.path.name}")
+            return {"success": False, "cancelled": True, "error": "文字起こしを中止しました"}
+
+        except Exception as e:
+            # アップロードの中断はPyAVの例外として届くこともある
+            if isinstance(e, UploadAborted) or upload.aborted:
+                logger.info(f"⏹️ アップロード中断のため文字起こし中止: {upload.path.name}")
+                return {"success": False, "cancelled": True, "error": "アップロードが中断されました"}
+            return self._error_result(e)
+
+        finally:
+            if checkpoint is not None:
+                checkpoint.close()
+            self._set_model_active(model_name, False)
+
+    def _build_result(self, segment_list: list[dict], detected_language: str, start_time: float) -> dict[str, Any]:
+        """セグメントに改行処理を適用し、文字起こし結果を作成"""
+        # 改行処理を適用（句点、句点が少ない場合は接続助詞・読点、セグメント間の無音で改行）
+        formatter = TranscriptFormatter()
+        formatter.add_segments(segment_list)
+        if formatter.is_sparse:
+            logger.info(f"句点が少ない（{formatter.sentence_breaks}個）ため、追加の改行処理を実行")
+        result_text = formatter.text()
+
+        logger.info(f"改行処理後: {len(result_text)}文字")
+        logger.info(f"改行数: {result_text.count(chr(10))}")
+        logger.info(f"改行処理後の最初の200文字: {result_text[:200]}")
+
+        elapsed = time.time() - start_time
+
+        logger.info(f"✅ 文字起こし完了: {len(result_text)}文字 ({elapsed:.1f}秒)")
+
+        return {
+            "success": True,
+            "text": result_text,
+            "segments": segment_list,
+            "duration": elapsed,
+            "language": detected_language,
+            "char_count": len(result_text),
+            "segment_count": len(segment_list),
+        }
+
+    def _error_result(self, e: Exception) -> dict[str, Any]:
+        """文字起こし中の例外から、利用者向けのエラーメッセージを含む結果を作成"""
+        error_str = str(e).lower()
+        logger.error(f"❌ 文字起こしエラー: {e}", exc_info=True)
+
+        # 音声フォーマット関連のエラー診断
+        user_message = str(e)
+        if "codec" in error_str or "decoder" in error_str:
+            logger.error("  → 音声コーデックエラー: サポートされていない形式の可能性があります。")
+            user_message = "音声形式がサポートされていません。MP3, WAV, M4A, FLAC, OGG形式をお試しください。"
+        elif "sample" in error_str and ("rate" in error_str or "format" in error_str):
+            logger.error("  → サンプリングレート/フォーマットエラー: 特殊な音声フォーマットの可能性があります。")
+            user_message = "音声フォーマットが特殊です。標準的なMP3/WAVファイルに変換してお試しください。"
+        elif "channel" in error_str:
+            logger.error("  → チャンネルエラー: マルチチャンネル音声の可能性があります。")
+            user_message = "マルチチャンネル音声は対応していません。ステレオまたはモノラルに変換してください。"
+        elif "ffmpeg" in error_str or "avcodec" in error_str or "av" in error_str:
+            logger.error("  → FFmpeg/PyAVエラー: 音声デコードに失敗しました。")
+            user_message = "音声ファイルの読み込みに失敗しました。ファイルが破損していないか確認してください。"
+        elif "memory" in error_str:
+            logger.error("  → メモリエラー: 大きなファイルの処理でメモリ不足の可能性があります。")
+            user_message = "メモリ不足です。他のアプリを終了するか、より小さいファイルをお試しください。"
+
+        return {"success": False, "error": user_message}
+
+    def lookup_cached_result(
+        self,
+        audio_path: Path,
+        model_name: str,
+        language: str = "ja",
+        mode: str = "standard",
+        ranges: Optional[list] = None,
+        audio_hash: Optional[str] = None,
+    ) -> tuple[str, Optional[dict]]:
+        """
+        音声ファイルの結果キャッシュを確認（文字起こし開始前の確認用）
+
+        Args:
+            audio_path: 音声ファイルパス
+            model_name: 使用するモデル
+            language: 言語コード
+            mode: 文字起こし方式
+            ranges: 文字起こしする時間範囲（全体の場合None）
+            audio_hash: 音声ファイルのSHA-256（アップロード時に計算済みの場合）
+
+        Returns:
+            tuple[str, Optional[dict]]: (音声ファイルのSHA-256, キャッシュ済みの結果またはNone)
+        """
+        if audio_hash is None:
+            audio_hash = compute_audio_hash(audio_path)
+        if ranges:
+            ranges = normalize_time_ranges(ranges)
+        cache_key = make_cache_key(audio_hash, model_name, language, mode, VAD_PARAMETERS, ranges)
+        return audio_hash, self._get_cached_result(cache_key)
+
+    def analyze_speech(
+        self, audio_path: Path, model_name: str, mode: str = "standard", audio_hash: Optional[str] = None
+    ) -> dict:
+        """
+        文字起こし前に発話区間を解析（発話の割合と処理時間の目安を表示するため）
 
-            # 文字起こし実行
-            segments, info = self.model.transcribe(
-                str(audio_path),
-                language=language,
-                vad_filter=True,
-                vad_parameters={"min_silence_duration_ms": 500},
+        デコード済み音声と発話区間はキャッシュに保存されるため、続けて文字起こしする場合は
+        デコードとVADが省略される。
+
+        Args:
+            audio_path: 音声ファイルパス
+            model_name: 使用するモデル（処理時間の目安に使用）
+            mode: 文字起こし方式（処理時間の目安に使用）
+            audio_hash: 音声ファイルのSHA-256（計算済みの場合）
+
+        Returns:
+            dict: {'duration', 'speech_seconds', 'speech_ratio', 'speech_chunks', 'segments',
+                   'estimated_seconds'}（estimated_secondsは自動チューニング未計測の場合None）
+        """
+        if audio_hash is None:
+            audio_hash = compute_audio_hash(audio_path)
+        audio = pcm_cache.load_audio(audio_path, audio_hash)
+        speech_chunks = get_speech_chunks(audio, audio_hash, VAD_PARAMETERS)
+
+        duration = len(audio) / SAMPLING_RATE
+        speech_seconds = sum(chunk["end"] - chunk["start"] for chunk in speech_chunks) / SAMPLING_RATE
+
+        # 自動チューニングの計測結果（ベンチマーク音声1秒あたりの処理時間）から発話部分の処理時間を見積もる
+        estimated_seconds = None
+        tuned = get_tuned_settings(model_name)
+        if tuned:
+            estimated_seconds = speech_seconds * tuned["seconds_per_clip"] / tuned["benchmark_seconds"]
+            if mode == "parallel":
+                estimated_seconds /= tuned["parallel_workers"]
+            estimated_seconds = round(estimated_seconds, 1)
+
+        return {
+            "audio_hash": audio_hash,
+            "duration": round(duration, 2),
+            "speech_seconds": round(speech_seconds, 2),
+            "speech_ratio": round(speech_seconds / duration, 3) if duration > 0 else 0.0,
+            "speech_chunks": len(speech_chunks),
+            "segments": [
+                {
+                    "start": round(chunk["start"] / SAMPLING_RATE, 2),
+                    "end": round(chunk["end"] / SAMPLING_RATE, 2),
+                }
+                for chunk in speech_chunks
+            ],
+            "estimated_seconds": estimated_seconds,
+        }
+
+    def _get_cached_result(self, cache_key: str) -> Optional[dict]:
+        """キャッシュ済みの結果を取得（処理時間は取得にかかった時間に置き換える）"""
+        start_time = time.time()
+        result = result_cache.get(cache_key)
+        if result is None:
+            return None
+
+        result["duration"] = time.time() - start_time
+        result["cache_hit"] = True
+        logger.info(f"⚡ 結果キャッシュヒット: {result.get('char_count', 0)}文字")
+        return result
+
+    def _transcribe_standard(
+        self,
+        audio_path: Path,
+        model_name: str,
+        language: str,
+        progress_callback=None,
+        segment_callback=None,
+        cancel_token: Optional[CancellationToken] = None,
+        audio_hash: Optional[str] = None,
+    ) -> tuple[list[dict], str]:
+        """
+        音声ファイル全体を逐次文字起こし（従来方式）
+
+        Args:
+            audio_path: 音声ファイルパス
+            model_name: 使用するモデル
+            language: 言語コード
+            progress_callback: 進捗コールバック関数（0.0～1.0の進捗を受け取る）
+            segment_callback: セグメントコールバック関数（デコード済みのセグメントを受け取る）
+            cancel_token: 中止トークン
+            audio_hash: 音声ファイルのSHA-256（デコード済み音声・発話区間キャッシュのキー）
+
+        Returns:
+            tuple[list[dict], str]: (セグメントリスト, 言語コード)
+        """
+        # モデルをロード
+        model = self.load_model(model_name)
+
+        logger.info(f"文字起こし開始: {audio_path.name}")
+        audio = pcm_cache.load_audio(audio_path, audio_hash)
+
+        # 音声の総時間を取得
+        total_duration = len(audio) / SAMPLING_RATE
+
+        # 文字起こし実行（vad_filter=True と同じ処理を、キャッシュ済みの発話区間で行う）
+        speech_chunks = get_speech_chunks(audio, audio_hash, VAD_PARAMETERS)
+        segments = transcribe_speech_chunks(model, audio, speech_chunks, language=language)
+
+        # セグメントをリストに変換
+        segment_list = []
+
+        for segment in segments:
+            # 中止要求を確認（ジェネレータを抜けるとデコードも止まる）
+            if cancel_token:
+                cancel_token.raise_if_cancelled()
+
+            segment_list.append(segment)
+
+            # デコード済みのセグメントを即座に通知
+            if segment_callback:
+                segment_callback(segment)
+
+            # 進捗を通知（セグメント終了時間 / 総時間）
+            if progress_callback and total_duration > 0:
+                progress = min(
+                    segment["end"] / total_duration, 0.95
+                )  # 最大95%まで（最後は処理完了で100%）
+                progress_callback(progress)
+
+        return segment_list, language
+
+    def _transcribe_remaining(
+        self,
+        audio_path: Path,
+        model_name: str,
+        language: str,
+        resume_from: float,
+        progress_callback=None,
+        segment_callback=None,
+        cancel_token: Optional[CancellationToken] = None,
+        audio_hash: Optional[str] = None,
+    ) -> tuple[list[dict], str]:
+        """
+        指定時刻以降のみを文字起こし（チェックポイントからの再開用）
+
+        VADの発話区間のうちresume_from以降の部分だけを結合して文字起こしし、
+        元の時間軸に戻す（vad_filter=True の文字起こしと同じ処理を途中から行う）
+
+        Args:
+            audio_path: 音声ファイルパス
+            model_name: 使用するモデル
+            language: 言語コード
+            resume_from: 再開する時刻（秒）
+            progress_callback: 進捗コールバック関数（0.0～1.0の進捗を受け取る）
+            segment_callback: セグメントコールバック関数（デコード済みのセグメントを受け取る）
+            cancel_token: 中止トークン
+            audio_hash: 音声ファイルのSHA-256（デコード済み音声・発話区間キャッシュのキー）
+
+        Returns:
+            tuple[list[dict], str]: (セグメントリスト, 言語コード)
+        """
+        model = self.load_model(model_name)
+
+        logger.info(f"文字起こし再開: {audio_path.name} ({resume_from:.1f}秒から)")
+
+        audio = pcm_cache.load_audio(audio_path, audio_hash)
+        total_duration = len(audio) / SAMPLING_RATE
+        speech_chunks = trim_speech_chunks(
+            get_speech_chunks(audio, audio_hash, VAD_PARAMETERS), int(resume_from * SAMPLING_RATE)
+        )
+
+        segment_list = []
+        for segment in transcribe_speech_chunks(model, audio, speech_chunks, language=language):
+            if cancel_token:
+                cancel_token.raise_if_cancelled()
+            segment_list.append(segment)
+            if segment_callback:
+                segment_callback(segment)
+            if progress_callback and total_duration > 0:
+                progress_callback(min(segment["end"] / total_duration, 0.95))
+
+        return segment_list, language
+
+    def _transcribe_ranges(
+        self,
+        audio_path: Path,
+        model_name: str,
+        language: str,
+        ranges: list[list],
+        progress_callback=None,
+        segment_callback=None,
+        cancel_token: Optional[CancellationToken] = None,
+        resume_from: float = 0.0,
+        audio_hash: Optional[str] = None,
+    ) -> tuple[list[dict], str]:
+        """
+        指定した時間範囲のみを文字起こし
+
+        デコード済み音声がキャッシュにあれば範囲を切り出し、なければ範囲のみをデコードする。
+        VADと推論も範囲内の音声に対してのみ行うため、処理時間は音声全体ではなく範囲の長さに比例する。
+
+        Args:
+            audio_path: 音声ファイルパス
+            model_name: 使用するモデル
+            language: 言語コード
+            ranges: 正規化済みの時間範囲（normalize_time_ranges）
+            progress_callback: 進捗コールバック関数（範囲の合計に対する進捗を受け取る）
+            segment_callback: セグメントコールバック関数（デコード済みのセグメントを受け取る）
+            cancel_token: 中止トークン
+            resume_from: 再開する時刻（秒、チェックポイントからの再開時）
+            audio_hash: 音声ファイルのSHA-256（デコード済み音声キャッシュのキー）
+
+        Returns:
+            tuple[list[dict], str]: (セグメントリスト, 言語コード)
+        """
+        model = self.load_model(model_name)
+        cached_audio = pcm_cache.get(audio_hash) if audio_hash else None
+
+        # 終了時刻を省略した範囲は音声の末尾まで
+        if any(end is None for _, end in ranges):
+            duration = len(cached_audio) / SAMPLING_RATE if cached_audio is not None else probe_duration(audio_path)
+            if duration is not None:
+                ranges = [[start, duration if end is None else end] for start, end in ranges]
+        total_seconds = sum(end - start for start, end in ranges) if all(end is not None for _, end in ranges) else 0
+
+        logger.info(
+            f"文字起こし開始（範囲指定）: {audio_path.name} - "
+            + ", ".join(f"{start:.1f}～{'末尾' if end is None else f'{end:.1f}'}秒" for start, end in ranges)
+        )
+
+        segment_list = []
+        done_seconds = 0.0
+        for start, end in ranges:
+            if end is not None and end <= resume_from:
+                done_seconds += end - start
+                continue
+            if cancel_token:
+                cancel_token.raise_if_cancelled()
+
+            if cached_audio is not None:
+                audio = cached_audio[int(start * SAMPLING_RATE):None if end is None else int(end * SAMPLING_RATE)]
+            else:
+                audio = decode_audio_range(audio_path, start, end)
+
+            speech_chunks = trim_speech_chunks(
+                detect_speech_chunks(audio, VAD_PARAMETERS), int((resume_from - start) * SAMPLING_RATE)
             )
+            for segment in transcribe_speech_chunks(model, audio, speech_chunks, language=language):
+                if cancel_token:
+                    cancel_token.raise_if_cancelled()
+                segment["start"] = round(segment["start"] + start, 3)
+                segment["end"] = round(segment["end"] + start, 3)
+                segment_list.append(segment)
+                if segment_callback:
+                    segment_callback(segment)
+                if progress_callback and total_seconds > 0:
+                    progress_callback(min((done_seconds + segment["end"] - start) / total_seconds, 0.95))
+
+            done_seconds += len(audio) / SAMPLING_RATE
+
+        return segment_list, language
+
+    def _use_streaming(self, audio_path: Path, mode: str) -> bool:
+        """
+        ストリーミング処理を使うか判定
 
-            # 音声の総時間を取得
-            total_duration = info.duration if hasattr(info, "duration") else None
+        標準（逐次処理）でも、長時間の音声は音声全体をメモリに展開しないようストリーミング処理に切り替える
+        """
+        if mode == "streaming":
+            return True
+        if mode != "standard" or STREAMING_MIN_MINUTES <= 0:
+            return False
+
+        duration = probe_duration(audio_path)
+        if duration is not None and duration >= STREAMING_MIN_MINUTES * 60:
+            logger.info(f"長時間の音声（{duration / 60:.0f}分）のため、ストリーミング処理に切り替えます")
+            return True
+        return False
 
-            # セグメントをテキストに変換
-            text_segments = []
-            segment_list = []
+    def _transcribe_streaming(
+        self,
+        audio_path: Path,
+        model_name: str,
+        language: str,
+        progress_callback=None,
+        segment_callback=None,
+        cancel_token: Optional[CancellationToken] = None,
+        resume_from: float = 0.0,
+    ) -> tuple[list[dict], str]:
+        """
+        音声を一定時間ごとにデコードしながら文字起こし（長時間の録音向け）
 
-            for segment in segments:
-                text = segment.text.strip()
-                text_segments.append(text)
-                segment_list.append({"start": segment.start, "end": segment.end, "text": text})
+        窓ごとにVADで発話区間を求めて文字起こしする。窓の末尾で発話が続いている場合は、
+        その発話の先頭から次の窓に持ち越すため、発話の途中では区切らない。
+        保持する音声は1窓分（＋持ち越し分）のみで、音声の長さによらずメモリ使用量は一定。
 
-                # 進捗を通知（セグメント終了時間 / 総時間）
-                if progress_callback and total_duration and total_duration > 0:
-                    progress = min(
-                        segment.end / total_duration, 0.95
-                    )  # 最大95%まで（最後は処理完了で100%）
-                    progress_callback(progress)
+        Args:
+            audio_path: 音声ファイルパス
+            model_name: 使用するモデル
+            language: 言語コード
+            progress_callback: 進捗コールバック関数（0.0～1.0の進捗を受け取る）
+            segment_callback: セグメントコールバック関数（デコード済みのセグメントを受け取る）
+            cancel_token: 中止トークン
+            resume_from: 再開する時刻（秒、チェックポイントからの再開時）
 
-            # テキストを結合
-            result_text = "".join(text_segments)
+        Returns:
+            tuple[list[dict], str]: (セグメントリスト, 言語コード)
+        """
+        model = self.load_model(model_name)
+        total_duration = probe_duration(audio_path)
 
-            logger.info(f"改行処理前: {len(result_text)}文字")
-            logger.info(f"改行処理前の最初の100文字: {result_text[:100]}")
+        logger.info(f"文字起こし開始（ストリーミング、{STREAMING_WINDOW_SECONDS}秒ごと）: {audio_path.name}")
 
-            # 改行処理を適用
-            # 1. 句点（。）の後に改行を追加
-            result_text = re.sub(r"。(?=[^」』）\)\n])", "。\n", result_text)
+        segment_list = []
 
-            # 2. 疑問符・感嘆符の後にも改行
-            result_text = re.sub(r"([！？])(?=[^」』）\)\n])", r"\1\n", result_text)
+        def on_segment(segment: dict):
+            segment_list.append(segment)
+            if segment_callback:
+                segment_callback(segment)
+            if progress_callback and total_duration:
+                progress_callback(min(segment["end"] / total_duration, 0.95))
 
-            # 3. 改行数をカウント
-            linebreak_count = result_text.count("\n")
+        self._transcribe_windows(
+            model, iter_audio_windows(audio_path, STREAMING_WINDOW_SECONDS), language,
+            STREAMING_WINDOW_SECONDS * SAMPLING_RATE, on_segment, cancel_token, int(resume_from * SAMPLING_RATE),
+        )
+        return segment_list, language
 
-            # 4. 句点が少ない場合（10個未満）は追加の改行処理
-            if linebreak_count < 10:
-                logger.info(f"句点が少ない（{linebreak_count}個）ため、追加の改行処理を実行")
+    def _transcribe_windows(
+        self,
+        model: "WhisperModel",
+        windows,
+        language: str,
+        window_samples: int,
+        segment_callback,
+        cancel_token: Optional[CancellationToken] = None,
+        resume_sample: int = 0,
+    ) -> None:
+        """
+        窓ごとにVADで発話区間を求めて文字起こし（ストリーミング処理・アップロード中の文字起こし用）
 
-                # 「って」「だって」「から」「けど」「よ」「ね」「わ」の後に改行
-                result_text = re.sub(
-                    r"(って|だって|から|けど|けども|もん|もんね)(?=[^」』）\)\n])",
-                    r"\1\n",
-                    result_text,
-                )
+        窓の末尾で続いている発話は次の窓に持ち越すため、発話の途中では区切らない。
 
-                # 読点（、）の後でも改行（ただし、短い区切りは避ける）
-                # 読点の後が20文字以上続いている場合のみ改行
-                result_text = re.sub(r"、([^、\n]{20,})", r"、\n\1", result_text)
+        Args:
+            model: Whisperモデル
+            windows: 窓ごとの音声データ
+            language: 言語コード
+            window_samples: 1窓の長さ（サンプル単位）
+            segment_callback: セグメント（元の音声での時刻）を受け取る関数
+            cancel_token: 中止トークン
+            resume_sample: 再開する位置（サンプル単位、処理済みの区間はVADも行わない）
+        """
+        for audio, speech_chunks, offset in iter_speech_windows(windows, VAD_PARAMETERS, window_samples, resume_sample):
+            if cancel_token:
+                cancel_token.raise_if_cancelled()
+            for segment in transcribe_speech_chunks(model, audio, speech_chunks, language=language):
+                if cancel_token:
+                    cancel_token.raise_if_cancelled()
+                segment["start"] = round(segment["start"] + offset / SAMPLING_RATE, 3)
+                segment["end"] = round(segment["end"] + offset / SAMPLING_RATE, 3)
+                segment_callback(segment)
+
+    def _transcribe_parallel(
+        self,
+        audio_path: Path,
+        model_name: str,
+        language: str,
+        progress_callback=None,
+        segment_callback=None,
+        cancel_token: Optional[CancellationToken] = None,
+        resume_from: float = 0.0,
+        audio_hash: Optional[str] = None,
+    ) -> tuple[list[dict], str]:
+        """
+        発話区間で音声を分割し、複数ワーカーで並列に文字起こし
 
-            # 5. 連続する改行を1つにまとめる
-            result_text = re.sub(r"\n+", "\n", result_text)
+        無音の境界で分割した各グループを独立に処理し、元の時間軸で順番に結合する。
+        ワーカーは同一モデル（num_workers指定）を共有するため、メモリ使用量は増えない。
 
-            # 6. 先頭と末尾の空白・改行を削除
-            result_text = result_text.strip()
+        Args:
+            audio_path: 音声ファイルパス
+            model_name: 使用するモデル
+            language: 言語コード
+            progress_callback: 進捗コールバック関数（0.0～1.0の進捗を受け取る）
+            segment_callback: セグメントコールバック関数（先頭から連続して完了したグループ分を時刻順に通知）
+            cancel_token: 中止トークン（各ワーカーがセグメントごとに確認）
+            resume_from: 再開する時刻（秒、チェックポイントからの再開時）
+            audio_hash: 音声ファイルのSHA-256（デコード済み音声・発話区間キャッシュのキー）
 
-            logger.info(f"改行処理後: {len(result_text)}文字")
-            logger.info(f"改行数: {result_text.count(chr(10))}")
-            logger.info(f"改行処理後の最初の200文字: {result_text[:200]}")
+        Returns:
+            tuple[list[dict], str]: (セグメントリスト, 言語コード)
+        """
+        num_workers, _ = get_parallel_settings(model_name)
+        model = self.load_model(model_name)
+
+        logger.info(f"文字起こし開始（並列モード）: {audio_path.name}")
+        logger.info(f"  ワーカー数: {num_workers}")
+
+        audio = pcm_cache.load_audio(audio_path, audio_hash)
+        if cancel_token:
+            cancel_token.raise_if_cancelled()
+        speech_chunks = trim_speech_chunks(
+            get_speech_chunks(audio, audio_hash, VAD_PARAMETERS), int(resume_from * SAMPLING_RATE)
+        )
+        total_speech = sum(chunk["end"] - chunk["start"] for chunk in speech_chunks)
+
+        # ワーカー数の2倍程度に分割して負荷を平準化（短すぎる分割は精度が落ちるため下限を設ける）
+        target_samples = max(
+            total_speech // (num_workers * 2), PARALLEL_MIN_CHUNK_SECONDS * SAMPLING_RATE
+        )
+        groups = split_speech_chunks(speech_chunks, target_samples)
+        logger.info(
+            f"  発話区間: {len(speech_chunks)}個 ({total_speech / SAMPLING_RATE:.1f}秒) → {len(groups)}グループに分割"
+        )
+
+        processed = [0.0] * len(groups)
+        progress_lock = threading.Lock()
+
+        def run_group(index: int) -> list[dict]:
+            def on_progress(seconds: float):
+                with progress_lock:
+                    processed[index] = seconds
+                    done = sum(processed)
+                if progress_callback and total_speech > 0:
+                    progress_callback(min(done * SAMPLING_RATE / total_speech, 0.95))
+
+            group_segments = []
+            if cancel_token:
+                cancel_token.raise_if_cancelled()
+            for segment in transcribe_speech_chunks(
+                model, audio, groups[index], progress_callback=on_progress, language=language
+            ):
+                if cancel_token:
+                    cancel_token.raise_if_cancelled()
+                group_segments.append(segment)
+            return group_segments
+
+        results: list[Optional[list[dict]]] = [None] * len(groups)
+        next_to_emit = 0
+
+        with concurrent.futures.ThreadPoolExecutor(max_workers=num_workers) as executor:
+            futures = {executor.submit(run_group, index): index for index in range(len(groups))}
+            for future in concurrent.futures.as_completed(futures):
+                results[futures[future]] = future.result()
+
+                # 時刻順を保つため、先頭から連続して完了したグループのみ通知
+                while next_to_emit < len(groups) and results[next_to_emit] is not None:
+                    if segment_callback:
+                        for segment in results[next_to_emit]:
+                            segment_callback(segment)
+                    next_to_emit += 1
+
+        segment_list = [segment for group_segments in results for segment in group_segments]
+        return segment_list, language
+
+    def _transcribe_batched(
+        self,
+        audio_path: Path,
+        model_name: str,
+        language: str,
+        progress_callback=None,
+        segment_callback=None,
+        cancel_token: Optional[CancellationToken] = None,
+        batch_size: int = BATCH_SIZE,
+        audio_hash: Optional[str] = None,
+    ) -> tuple[list[dict], str]:
+        """
+        発話区間をバッチにまとめて文字起こし（BatchedInferencePipeline）
 
-            elapsed = time.time() - start_time
+        VADで分割した最大30秒の区間をbatch_size個ずつエンコーダ/デコーダに渡す。
 
-            logger.info(f"✅ 文字起こし完了: {len(result_text)}文字 ({elapsed:.1f}秒)")
+        Args:
+            audio_path: 音声ファイルパス
+            model_name: 使用するモデル
+            language: 言語コード
+            progress_callback: 進捗コールバック関数（0.0～1.0の進捗を受け取る）
+            segment_callback: セグメントコールバック関数（デコード済みのセグメントを受け取る）
+            cancel_token: 中止トークン（バッチの区切りごとに確認）
+            batch_size: バッチサイズ
+            audio_hash: 音声ファイルのSHA-256（デコード済み音声・発話区間キャッシュのキー）
 
-            return {
-                "success": True,
-                "text": result_text,
-                "segments": segment_list,
-                "duration": elapsed,
-                "language": info.language,
-                "char_count": len(result_text),
-                "segment_count": len(segment_list),
-            }
+        Returns:
+            tuple[list[dict], str]: (セグメントリスト, 言語コード)
+        """
+        model = self.load_model(model_name)
+        pipeline = load_faster_whisper().BatchedInferencePipeline(model=model)
+
+        logger.info(f"文字起こし開始（バッチモード）: {audio_path.name}")
+        logger.info(f"  バッチサイズ: {batch_size}")
+        audio = pcm_cache.load_audio(audio_path, audio_hash)
+        total_duration = len(audio) / SAMPLING_RATE
+
+        # vad_filter=True と同じく最大30秒で区切った発話区間を、キャッシュから求めてclip_timestampsで渡す
+        vad_parameters = {**VAD_PARAMETERS, "max_speech_duration_s": BATCH_CHUNK_SECONDS}
+        clip_timestamps = merge_speech_chunks(get_speech_chunks(audio, audio_hash, vad_parameters), vad_parameters)
+        if not clip_timestamps:
+            return [], language
+
+        segments, info = pipeline.transcribe(
+            audio,
+            language=language,
+            batch_size=batch_size,
+            clip_timestamps=clip_timestamps,
+        )
+
+        segment_list = []
+        for segment in segments:
+            if cancel_token:
+                cancel_token.raise_if_cancelled()
+            segment_list.append({"start": segment.start, "end": segment.end, "text": segment.text.strip()})
+            if segment_callback:
+                segment_callback(segment_list[-1])
+            if progress_callback and total_duration and total_duration > 0:
+                progress_callback(min(segment.end / total_duration, 0.95))
+
+        return segment_list, info.language
+
+    def _transcribe_refine(
+        self,
+        audio_path: Path,
+        model_name: str,
+        language: str,
+        progress_callback=None,
+        draft_callback=None,
+        refine_callback=None,
+        cancel_token: Optional[CancellationToken] = None,
+        resume_from: float = 0.0,
+        audio_hash: Optional[str] = None,
+    ) -> tuple[list[dict], str]:
+        """
+        軽いモデルの下書きを先に表示し、指定モデルの結果で順次置き換える（二段階処理）
 
-        except Exception as e:
-            error_str = str(e).lower()
-            logger.error(f"❌ 文字起こしエラー: {e}", exc_info=True)
-
-            # 音声フォーマット関連のエラー診断
-            user_message = str(e)
-            if "codec" in error_str or "decoder" in error_str:
-                logger.error("  → 音声コーデックエラー: サポートされていない形式の可能性があります。")
-                user_message = "音声形式がサポートされていません。MP3, WAV, M4A, FLAC, OGG形式をお試しください。"
-            elif "sample" in error_str and ("rate" in error_str or "format" in error_str):
-                logger.error("  → サンプリングレート/フォーマットエラー: 特殊な音声フォーマットの可能性があります。")
-                user_message = "音声フォーマットが特殊です。標準的なMP3/WAVファイルに変換してお試しください。"
-            elif "channel" in error_str:
-                logger.error("  → チャンネルエラー: マルチチャンネル音声の可能性があります。")
-                user_message = "マルチチャンネル音声は対応していません。ステレオまたはモノラルに変換してください。"
-            elif "ffmpeg" in error_str or "avcodec" in error_str or "av" in error_str:
-                logger.error("  → FFmpeg/PyAVエラー: 音声デコードに失敗しました。")
-                user_message = "音声ファイルの読み込みに失敗しました。ファイルが破損していないか確認してください。"
-            elif "memory" in error_str:
-                logger.error("  → メモリエラー: 大きなファイルの処理でメモリ不足の可能性があります。")
-                user_message = "メモリ不足です。他のアプリを終了するか、より小さいファイルをお試しください。"
-
-            return {"success": False, "error": user_message}
+        発話区間をREFINE_GROUP_SECONDSごとのグループに分け、下書きモデル（REFINE_DRAFT_MODEL）で
+        全グループを先行して文字起こしする。並行して指定モデルで先頭のグループから文字起こしし、
+        確定したグループから下書きを置き換える。最初の表示までの時間は下書きモデルで決まり、
+        結果は指定モデルのみで文字起こしした場合と同じになる。
+
+        Args:
+            audio_path: 音声ファイルパス
+            model_name: 使用するモデル（確定版）
+            language: 言語コード
+            progress_callback: 進捗コールバック関数（確定したグループまでの進捗を受け取る）
+            draft_callback: 下書きのセグメントを受け取るコールバック（{'draft': True, 'group': int}付き、
+                            Noneの場合は下書きを作らない）
+            refine_callback: 確定したグループ（グループ番号, セグメントリスト）を受け取るコールバック
+            cancel_token: 中止トークン
+            resume_from: 再開する時刻（秒、チェックポイントからの再開時）
+            audio_hash: 音声ファイルのSHA-256（デコード済み音声・発話区間キャッシュのキー）
+
+        Returns:
+            tuple[list[dict], str]: (確定版のセグメントリスト, 言語コード)
+        """
+        model = self.load_model(model_name)
+
+        audio = pcm_cache.load_audio(audio_path, audio_hash)
+        total_duration = len(audio) / SAMPLING_RATE
+        speech_chunks = trim_speech_chunks(
+            get_speech_chunks(audio, audio_hash, VAD_PARAMETERS), int(resume_from * SAMPLING_RATE)
+        )
+        groups = split_speech_chunks(speech_chunks, REFINE_GROUP_SECONDS * SAMPLING_RATE)
+
+        # 下書きモデルが未ダウンロードの場合は、ダウンロードを待たせず確定版のみで処理する
+        draft_model_name = REFINE_DRAFT_MODEL
+        use_draft = (
+            draft_callback is not None
+            and draft_model_name != model_name
+            and check_model_exists(draft_model_name)["exists"]
+        )
+
+        logger.info(
+            f"文字起こし開始（二段階、下書き: {draft_model_name if use_draft else 'なし'} → {model_name}）: "
+            f"{audio_path.name}"
+        )
+        logger.info(f"  グループ数: {len(groups)}")
+
+        draft_lock = threading.Lock()
+        refined_groups = 0  # 確定済みのグループ数（これより後のグループのみ下書きを表示する）
+        stop_draft = threading.Event()
+
+        def run_draft():
+            # 本処理のモデル（self.model）を置き換えないよう、プールから直接取得する
+            draft_model = self.model_pool.get(self._model_key(draft_model_name))
+            for index, group in enumerate(groups):
+                if index < refined_groups:
+                    continue
+                for segment in transcribe_speech_chunks(draft_model, audio, group, language=language):
+                    if stop_draft.is_set() or (cancel_token and cancel_token.cancelled):
+                        return
+                    with draft_lock:
+                        # 下書きの途中で確定版が追い付いた場合は、そのグループの下書きを打ち切る
+                        if index < refined_groups:
+                            break
+                        draft_callback({**segment, "draft": True, "group": index})
+
+        segment_list = []
+        executor = concurrent.futures.ThreadPoolExecutor(max_workers=1)
+        draft_future = None
+        if use_draft:
+            self._set_model_active(draft_model_name, True)
+            draft_future = executor.submit(run_draft)
+
+        try:
+            for index, group in enumerate(groups):
+                group_segments = []
+                for segment in transcribe_speech_chunks(model, audio, group, language=language):
+                    if cancel_token:
+                        cancel_token.raise_if_cancelled()
+                    group_segments.append(segment)
+
+                with draft_lock:
+                    refined_groups = index + 1
+                    if refine_callback:
+                        refine_callback(index, group_segments)
+
+                segment_list.extend(group_segments)
+                if progress_callback and total_duration > 0 and group_segments:
+                    progress_callback(min(group_segments[-1]["end"] / total_duration, 0.95))
+        finally:
+            stop_draft.set()
+            executor.shutdown(wait=True)
+            if use_draft:
+                self._set_model_active(draft_model_name, False)
+
+        # 下書きは表示用のため、失敗しても確定版の結果には影響しない
+        if draft_future is not None and draft_future.exception() is not None:
+            logger.warning(f"⚠️ 下書きの文字起こしに失敗: {draft_future.exception()}")
+
+        return segment_list, language
 
 
 # グローバルインスタンス（シングルトン）
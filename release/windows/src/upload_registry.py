@@ -0,0 +1,288 @@
+"""
+アップロード済みファイルの登録簿
+file_idごとにファイルのパス・サイズ・SHA-256・登録日時・文字起こし中の数をSQLiteに保存する。
+file_idからの検索はUPLOAD_DIRを走査せずに済み、同じ内容のファイルは1つにまとめる
+"""
+
+import logging
+import sqlite3
+import threading
+import time
+import uuid
+from pathlib import Path
+from typing import Optional
+
+from config import ALLOWED_EXTENSIONS, UPLOAD_DIR, UPLOAD_MAX_AGE_DAYS, UPLOAD_REGISTRY_PATH
+
+logger = logging.getLogger(__name__)
+
+# 状態（文字起こし中の数から決まる）
+STATE_READY = "ready"  # 文字起こし待ち
+STATE_TRANSCRIBING = "transcribing"  # 文字起こし中
+
+# スキーマのバージョン（PRAGMA user_version。異なる場合は作り直す）
+SCHEMA_VERSION = 2
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS uploads (
+    file_id TEXT PRIMARY KEY,
+    path TEXT NOT NULL,
+    original_name TEXT NOT NULL,
+    size INTEGER NOT NULL,
+    mtime REAL NOT NULL,
+    sha256 TEXT,
+    local INTEGER NOT NULL,
+    transcriptions INTEGER NOT NULL,
+    refs INTEGER NOT NULL,
+    created_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS uploads_sha256 ON uploads (sha256);
+"""
+
+
+class UploadRegistry:
+    """
+    アップロード済みファイルの登録簿（SQLite）
+
+    アップロードされたファイル（UPLOAD_DIR内のコピー）と、ローカルパスで登録されたファイル（元のファイル）を扱う。
+    同じ内容のファイルが再度アップロードされた場合は既存のfile_idを返し、参照数で片付けるタイミングを管理する
+    """
+
+    def __init__(self, db_path: Path = UPLOAD_REGISTRY_PATH):
+        """
+        Args:
+            db_path: データベースファイルのパス
+        """
+        self.db_path = db_path
+        self._connection: Optional[sqlite3.Connection] = None
+        self._lock = threading.Lock()
+
+    def register(
+        self,
+        file_path: Path,
+        original_name: str,
+        sha256: Optional[str] = None,
+        local: bool = False,
+    ) -> tuple[str, bool]:
+        """
+        ファイルを登録
+
+        アップロードされたファイルで、同じ内容（SHA-256）のファイルが登録済みの場合は、
+        新しいファイルを削除して既存のfile_idを返す
+
+        Args:
+            file_path: ファイルパス
+            original_name: 元のファイル名
+            sha256: ファイルのSHA-256（計算済みの場合）
+            local: ローカルパスで登録された元のファイルの場合True（片付ける際に削除しない）
+
+        Returns:
+            tuple[str, bool]: (file_id, 既存のファイルにまとめた場合True)
+        """
+        stat = file_path.stat()
+        with self._lock:
+            connection = self._connect()
+            if sha256 and not local:
+                row = connection.execute(
+                    "SELECT file_id, path FROM uploads WHERE sha256 = ? AND local = 0 LIMIT 1", (sha256,)
+                ).fetchone()
+                if row is not None and row["path"] != str(file_path) and Path(row["path"]).exists():
+                    connection.execute("UPDATE uploads SET refs = refs + 1 WHERE file_id = ?", (row["file_id"],))
+                    connection.commit()
+                    file_path.unlink(missing_ok=True)
+                    logger.info(f"同じ内容のファイルが登録済みのため再利用: {original_name} (file_id: {row['file_id']})")
+                    return row["file_id"], True
+
+            file_id = str(uuid.uuid4())
+            connection.execute(
+                "INSERT INTO uploads"
+                " (file_id, path, original_name, size, mtime, sha256, local, transcriptions, refs, created_at)"
+                " VALUES (?, ?, ?, ?, ?, ?, ?, 0, 1, ?)",
+                (file_id, str(file_path), original_name, stat.st_size, stat.st_mtime, sha256, int(local), time.time()),
+            )
+            connection.commit()
+        return file_id, False
+
+    def get(self, file_id: str) -> Optional[dict]:
+        """
+        登録されたファイルの情報
+
+        ローカルパスで登録されたファイルが登録後に変更されていた場合、SHA-256はNone（再計算させる）
+
+        Returns:
+            dict: {"file_id", "path", "original_name", "size", "sha256", "local", "state", "created_at"}
+                  （登録されていない、またはファイルが削除されている場合None）
+        """
+        with self._lock:
+            row = self._connect().execute("SELECT * FROM uploads WHERE file_id = ?", (file_id,)).fetchone()
+        if row is None:
+            return None
+
+        path = Path(row["path"])
+        try:
+            stat = path.stat()
+        except OSError:
+            return None
+        sha256 = row["sha256"]
+        if stat.st_size != row["size"] or stat.st_mtime != row["mtime"]:
+            sha256 = None
+
+        return {
+            "file_id": row["file_id"],
+            "path": path,
+            "original_name": row["original_name"],
+            "size": stat.st_size,
+            "sha256": sha256,
+            "local": bool(row["local"]),
+            "state": STATE_TRANSCRIBING if row["transcriptions"] > 0 else STATE_READY,
+            "created_at": row["created_at"],
+        }
+
+    def update(self, file_id: str, sha256: str) -> None:
+        """
+        SHA-256（文字起こし・発話解析時に計算した場合）を保存
+
+        Args:
+            file_id: file_id
+            sha256: ファイルのSHA-256
+        """
+        with self._lock:
+            connection = self._connect()
+            # 計算した時点のサイズ・更新時刻と合わせて保存する
+            row = connection.execute("SELECT path FROM uploads WHERE file_id = ?", (file_id,)).fetchone()
+            if row is None:
+                return
+            try:
+                stat = Path(row["path"]).stat()
+            except OSError:
+                return
+            connection.execute(
+                "UPDATE uploads SET sha256 = ?, size = ?, mtime = ? WHERE file_id = ?",
+                (sha256, stat.st_size, stat.st_mtime, file_id),
+            )
+            connection.commit()
+
+    def begin_transcription(self, file_id: str) -> None:
+        """
+        文字起こしの開始を記録（文字起こし中の数を増やす。終了時はrelease(file_id, transcribing=True)）
+
+        同じ内容のファイルは1つのfile_idにまとめるため、同時に複数の文字起こしで使われることがある
+        """
+        with self._lock:
+            connection = self._connect()
+            connection.execute("UPDATE uploads SET transcriptions = transcriptions + 1 WHERE file_id = ?", (file_id,))
+            connection.commit()
+
+    def release(self, file_id: str, transcribing: bool = False) -> None:
+        """
+        文字起こし後にファイルを片付ける
+
+        参照数を減らし、0になったら登録を解除してファイルを削除する
+        （ローカルパスで登録されたファイルは元のファイルのため、登録のみ解除）
+
+        Args:
+            file_id: file_id
+            transcribing: begin_transcription()を呼んだ場合True（文字起こし中の数を減らす）
+        """
+        with self._lock:
+            connection = self._connect()
+            row = connection.execute("SELECT path, local, refs FROM uploads WHERE file_id = ?", (file_id,)).fetchone()
+            if row is None:
+                return
+            if row["refs"] > 1:
+                connection.execute(
+                    "UPDATE uploads SET refs = refs - 1, transcriptions = MAX(transcriptions - ?, 0) WHERE file_id = ?",
+                    (int(transcribing), file_id),
+                )
+                connection.commit()
+                return
+            connection.execute("DELETE FROM uploads WHERE file_id = ?", (file_id,))
+            connection.commit()
+
+        if not row["local"]:
+            self._remove_file(Path(row["path"]))
+
+    def cleanup_stale(self, max_age_days: int = UPLOAD_MAX_AGE_DAYS, upload_dir: Path = UPLOAD_DIR) -> int:
+        """
+        古い登録と残ったファイルを削除
+
+        - ファイルが削除されている登録
+        - 指定日数を過ぎても文字起こしされない登録（アップロードされたファイルは削除）
+        - UPLOAD_DIR内の登録されていない古いファイル（以前のバージョンや異常終了で残ったもの）
+
+        Returns:
+            int: 削除した件数
+        """
+        threshold = time.time() - max_age_days * 24 * 60 * 60
+        removed = 0
+
+        with self._lock:
+            connection = self._connect()
+            rows = connection.execute("SELECT file_id, path, local, created_at FROM uploads").fetchall()
+            stale = [row for row in rows if row["created_at"] < threshold or not Path(row["path"]).exists()]
+            stale_ids = {row["file_id"] for row in stale}
+            connection.executemany("DELETE FROM uploads WHERE file_id = ?", [(file_id,) for file_id in stale_ids])
+            connection.commit()
+            registered = {row["path"] for row in rows if row["file_id"] not in stale_ids}
+
+        for row in stale:
+            if not row["local"]:
+                self._remove_file(Path(row["path"]))
+            removed += 1
+
+        for path in upload_dir.glob("*"):
+            if path.suffix.lower() not in ALLOWED_EXTENSIONS or str(path) in registered:
+                continue
+            try:
+                if path.is_file() and path.stat().st_mtime < threshold:
+                    path.unlink()
+                    removed += 1
+            except OSError:
+                continue
+
+        if removed:
+            logger.info(f"🗑️ 古いアップロードを{removed}件削除")
+        return removed
+
+    def _connect(self) -> sqlite3.Connection:
+        # ロックを取得した状態で呼ぶ
+        if self._connection is None:
+            self.db_path.parent.mkdir(parents=True, exist_ok=True)
+            try:
+                self._connection = self._open()
+            except sqlite3.DatabaseError as e:
+                # 壊れている場合は作り直す（登録はアップロードし直せば復元できる）
+                logger.warning(f"⚠️ アップロード登録簿を作り直します: {e}")
+                self.db_path.unlink(missing_ok=True)
+                self._connection = self._open()
+        return self._connection
+
+    def _open(self) -> sqlite3.Connection:
+        connection = sqlite3.connect(self.db_path, check_same_thread=False)
+        connection.row_factory = sqlite3.Row
+        try:
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("PRAGMA synchronous=NORMAL")
+            if connection.execute("PRAGMA user_version").fetchone()[0] != SCHEMA_VERSION:
+                # 以前のスキーマは作り直す（登録されなくなったファイルはcleanup_stale()で削除される）
+                connection.executescript(f"DROP TABLE IF EXISTS uploads; PRAGMA user_version = {SCHEMA_VERSION};")
+            connection.executescript(_SCHEMA)
+            # 前回の起動で文字起こし中だった数は残っていても無効なため、0に戻す
+            connection.execute("UPDATE uploads SET transcriptions = 0 WHERE transcriptions > 0")
+            connection.commit()
+        except sqlite3.DatabaseError:
+            connection.close()
+            raise
+        return connection
+
+    @staticmethod
+    def _remove_file(path: Path) -> None:
+        try:
+            path.unlink(missing_ok=True)
+            logger.info(f"一時ファイル削除: {path.name}")
+        except OSError as e:
+            logger.error(f"ファイル削除エラー: {e}")
+
+
+# グローバルインスタンス（シングルトン）
+upload_registry = UploadRegistry()
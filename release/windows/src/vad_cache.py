@@ -0,0 +1,78 @@
+"""
+発話区間（VAD）キャッシュ
+音声ファイルの内容（SHA-256）とVADパラメータごとにSilero VADの発話区間を保存し、
+モデルを変えての再実行や再試行、文字起こし前の発話解析ではVADを省略する
+"""
+
+import hashlib
+import json
+import logging
+import time
+from typing import TYPE_CHECKING, Optional
+
+from config import APP_VERSION, VAD_CACHE_DIR, VAD_CACHE_MAX_MB
+from result_cache import ResultCache
+from speech_chunks import SAMPLING_RATE, detect_speech_chunks
+
+# numpyは起動を速くするため、使用時に読み込む（lazy_imports）
+if TYPE_CHECKING:
+    import numpy as np
+
+logger = logging.getLogger(__name__)
+
+
+def make_vad_cache_key(audio_hash: str, vad_parameters: dict) -> str:
+    """
+    キャッシュキーを生成
+
+    Args:
+        audio_hash: 音声ファイルのSHA-256
+        vad_parameters: VADパラメータ
+
+    Returns:
+        str: キャッシュキー（16進文字列）
+    """
+    payload = json.dumps(
+        {"audio": audio_hash, "vad": vad_parameters, "version": APP_VERSION},
+        sort_keys=True,
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def get_speech_chunks(
+    audio: "np.ndarray", audio_hash: Optional[str], vad_parameters: dict
+) -> list[dict]:
+    """
+    発話区間を取得（キャッシュがあればVADを省略）
+
+    保存時の音声の長さと一致しない場合は、別の音声とみなして検出し直す。
+
+    Args:
+        audio: 16kHzモノラルの音声データ
+        audio_hash: 音声ファイルのSHA-256（Noneの場合はキャッシュしない）
+        vad_parameters: VADパラメータ
+
+    Returns:
+        list[dict]: 発話区間のリスト（start/endはサンプル単位）
+    """
+    if audio_hash is None:
+        return detect_speech_chunks(audio, vad_parameters)
+
+    key = make_vad_cache_key(audio_hash, vad_parameters)
+    cached = vad_cache.get(key)
+    if cached is not None and cached.get("samples") == len(audio):
+        logger.info(f"発話区間キャッシュを使用: {len(cached['chunks'])}区間")
+        return cached["chunks"]
+
+    start_time = time.time()
+    speech_chunks = detect_speech_chunks(audio, vad_parameters)
+    logger.info(
+        f"🎙️ 発話区間を検出: {len(speech_chunks)}区間 "
+        f"（音声 {len(audio) / SAMPLING_RATE:.0f}秒、VAD {time.time() - start_time:.1f}秒）"
+    )
+    vad_cache.put(key, {"samples": len(audio), "chunks": speech_chunks})
+    return speech_chunks
+
+
+# グローバルインスタンス（シングルトン）
+vad_cache = ResultCache(VAD_CACHE_DIR, VAD_CACHE_MAX_MB * 1024 * 1024)
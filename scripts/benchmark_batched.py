@@ -0,0 +1,147 @@
+#!/usr/bin/env python3
+"""
+バッチ推論ベンチマーク
+
+逐次処理（standard）とバッチ推論（batched）の処理速度・メモリ使用量を
+バッチサイズごとに比較する（CPU / int8）。
+
+計測は条件ごとに別プロセスで行い、各プロセスの最大RSSをメモリ使用量とする。
+
+使用方法:
+  python3 scripts/benchmark_batched.py AUDIO_FILE [OPTIONS]
+
+オプション:
+  --model NAME         使用するモデル（デフォルト: medium）
+  --batch-sizes LIST   計測するバッチサイズ（カンマ区切り、デフォルト: 1,2,4,8,16）
+  --src DIR            アプリのソースディレクトリ（デフォルト: OSに応じてrelease/mac/src または release/windows/src）
+  --json               JSON形式で出力
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+
+
+def default_src_dir() -> Path:
+    """OSに応じたソースディレクトリを返す"""
+    platform_dir = "windows" if os.name == "nt" else "mac"
+    return REPO_ROOT / "release" / platform_dir / "src"
+
+
+def peak_rss_mb() -> float:
+    """現在のプロセスの最大RSS（MB）"""
+    try:
+        import resource
+
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        # macOSはバイト単位、Linuxはキロバイト単位
+        return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+    except ImportError:
+        import psutil
+
+        return psutil.Process().memory_info().peak_wset / (1024 * 1024)
+
+
+def run_single(audio_file: str, model_name: str, mode: str, batch_size: int) -> dict:
+    """1条件を計測（子プロセス内で実行される）"""
+    from faster_whisper import decode_audio
+
+    from transcribe import VAD_PARAMETERS, transcription_service
+
+    model = transcription_service.load_model(model_name)
+    audio_duration = len(decode_audio(audio_file)) / 16000
+    rss_after_load = peak_rss_mb()
+
+    start_time = time.time()
+    if mode == "batched":
+        segments, _ = transcription_service._transcribe_batched(
+            Path(audio_file), model_name, "ja", batch_size=batch_size
+        )
+    else:
+        segments, _ = model.transcribe(
+            audio_file, language="ja", vad_filter=True, vad_parameters=VAD_PARAMETERS
+        )
+        segments = list(segments)
+    elapsed = time.time() - start_time
+
+    return {
+        "mode": mode,
+        "batch_size": batch_size if mode == "batched" else None,
+        "elapsed": round(elapsed, 2),
+        "audio_duration": round(audio_duration, 2),
+        "realtime_factor": round(audio_duration / elapsed, 2) if elapsed > 0 else None,
+        "segments": len(segments),
+        "peak_rss_mb": round(peak_rss_mb(), 1),
+        "inference_rss_mb": round(peak_rss_mb() - rss_after_load, 1),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="バッチ推論ベンチマーク")
+    parser.add_argument("audio_file", help="計測に使う音声ファイル")
+    parser.add_argument("--model", default="medium", help="使用するモデル")
+    parser.add_argument("--batch-sizes", default="1,2,4,8,16", help="計測するバッチサイズ（カンマ区切り）")
+    parser.add_argument("--src", default=str(default_src_dir()), help="アプリのソースディレクトリ")
+    parser.add_argument("--json", action="store_true", help="JSON形式で出力")
+    parser.add_argument("--single", nargs=2, metavar=("MODE", "BATCH_SIZE"), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.single:
+        sys.path.insert(0, args.src)
+        result = run_single(args.audio_file, args.model, args.single[0], int(args.single[1]))
+        print(json.dumps(result))
+        return
+
+    conditions = [("standard", 1)] + [
+        ("batched", int(size)) for size in args.batch_sizes.split(",") if size.strip()
+    ]
+
+    results = []
+    for mode, batch_size in conditions:
+        if not args.json:
+            label = "standard" if mode == "standard" else f"batched (batch_size={batch_size})"
+            print(f"計測中: {label} ...", file=sys.stderr)
+        completed = subprocess.run(
+            [
+                sys.executable,
+                __file__,
+                args.audio_file,
+                "--model",
+                args.model,
+                "--src",
+                args.src,
+                "--single",
+                mode,
+                str(batch_size),
+            ],
+            capture_output=True,
+            text=True,
+            check=True,
+        )
+        results.append(json.loads(completed.stdout.strip().splitlines()[-1]))
+
+    if args.json:
+        print(json.dumps(results, indent=2, ensure_ascii=False))
+        return
+
+    baseline = results[0]["elapsed"]
+    print()
+    print(f"モデル: {args.model} (CPU / int8), 音声長: {results[0]['audio_duration']}秒")
+    print(f"{'方式':<24}{'処理時間':>10}{'実時間比':>10}{'速度比':>8}{'最大RSS':>12}{'推論時増分':>12}")
+    for result in results:
+        label = "standard" if result["mode"] == "standard" else f"batched (bs={result['batch_size']})"
+        speedup = baseline / result["elapsed"] if result["elapsed"] > 0 else 0
+        print(
+            f"{label:<24}{result['elapsed']:>9.1f}s{result['realtime_factor']:>9.1f}x"
+            f"{speedup:>7.2f}x{result['peak_rss_mb']:>10.0f}MB{result['inference_rss_mb']:>10.0f}MB"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,136 @@
+#!/usr/bin/env python3
+"""
+モデルインベントリのマイクロベンチマーク
+
+check_model_exists の従来実装（毎回rglobで全ファイルをstat）と、
+model_inventory（ディレクトリの更新時刻が同じならキャッシュを返す）の1回あたりの処理時間を比較する。
+
+一時ディレクトリにHugging Face Hubのキャッシュと同じ構成（blobs / snapshots / refs）の
+ダミーモデルを作成して計測する。アプリの依存パッケージは不要。
+
+使用方法:
+  python3 scripts/benchmark_model_inventory.py [OPTIONS]
+
+オプション:
+  --models N           ダミーモデルの数（デフォルト: 6）
+  --files N            モデルあたりのファイル数（デフォルト: 8）
+  --iterations N       計測回数（デフォルト: 200）
+  --src DIR            アプリのソースディレクトリ（デフォルト: OSに応じてrelease/mac/src または release/windows/src）
+  --json               JSON形式で出力
+"""
+
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+
+
+def default_src_dir() -> Path:
+    """OSに応じたソースディレクトリを返す"""
+    platform_dir = "windows" if os.name == "nt" else "mac"
+    return REPO_ROOT / "release" / platform_dir / "src"
+
+
+def legacy_check_model_exists(cache_dir: Path, model_name: str) -> dict:
+    """従来の check_model_exists（呼び出しごとにrglobで全ファイルをstat）"""
+    from model_inventory import MODEL_SIZE_ESTIMATES_GB
+
+    model_dir = cache_dir / f"models--Systran--faster-whisper-{model_name}"
+    exists = model_dir.exists()
+    if exists:
+        total_size = sum(f.stat().st_size for f in model_dir.rglob("*") if f.is_file())
+        size_gb = total_size / (1024**3)
+    else:
+        size_gb = MODEL_SIZE_ESTIMATES_GB.get(model_name, 1.5)
+    return {"exists": exists, "size_gb": round(size_gb, 2), "path": str(model_dir) if exists else None}
+
+
+def create_fake_model(cache_dir: Path, model_name: str, files: int) -> None:
+    """Hugging Face Hubのキャッシュと同じ構成のダミーモデルを作成"""
+    model_dir = cache_dir / f"models--Systran--faster-whisper-{model_name}"
+    revision = "0" * 40
+    blobs = model_dir / "blobs"
+    snapshot = model_dir / "snapshots" / revision
+    blobs.mkdir(parents=True)
+    snapshot.mkdir(parents=True)
+    (model_dir / "refs").mkdir()
+    (model_dir / "refs" / "main").write_text(revision)
+
+    for index in range(files):
+        blob = blobs / f"{index:064x}"
+        # 疎ファイルで実サイズを確保せずにファイルサイズだけ持たせる
+        with open(blob, "wb") as f:
+            f.truncate(1024 * 1024 * (index + 1))
+        link = snapshot / f"file{index}.bin"
+        try:
+            link.symlink_to(blob)
+        except OSError:
+            # シンボリックリンクを作れない環境（Windowsの一般ユーザー）
+            link.write_bytes(b"")
+
+
+def measure(func, model_names: list[str], iterations: int) -> float:
+    """1回あたりの処理時間（マイクロ秒）"""
+    start_time = time.perf_counter()
+    for _ in range(iterations):
+        for name in model_names:
+            func(name)
+    return (time.perf_counter() - start_time) / (iterations * len(model_names)) * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description="モデルインベントリのマイクロベンチマーク")
+    parser.add_argument("--models", type=int, default=6, help="ダミーモデルの数")
+    parser.add_argument("--files", type=int, default=8, help="モデルあたりのファイル数")
+    parser.add_argument("--iterations", type=int, default=200, help="計測回数")
+    parser.add_argument("--src", default=str(default_src_dir()), help="アプリのソースディレクトリ")
+    parser.add_argument("--json", action="store_true", help="JSON形式で出力")
+    args = parser.parse_args()
+
+    sys.path.insert(0, args.src)
+    from model_inventory import ModelInventory
+
+    with tempfile.TemporaryDirectory() as tmp:
+        cache_dir = Path(tmp)
+        model_names = [f"model{index}" for index in range(args.models)]
+        for name in model_names:
+            create_fake_model(cache_dir, name, args.files)
+        # 未ダウンロードのモデルも含める（/models と同じ呼び出し方）
+        model_names.append("not-downloaded")
+
+        inventory = ModelInventory(cache_dir)
+        for name in model_names:
+            assert inventory.get(name) == legacy_check_model_exists(cache_dir, name), name
+
+        results = {
+            "legacy_rglob_us": measure(
+                lambda name: legacy_check_model_exists(cache_dir, name), model_names, args.iterations
+            ),
+            "inventory_cold_us": measure(
+                lambda name: ModelInventory(cache_dir).get(name), model_names, args.iterations
+            ),
+            "inventory_warm_us": measure(inventory.get, model_names, args.iterations),
+        }
+
+    results = {name: round(value, 1) for name, value in results.items()}
+    results["speedup"] = round(results["legacy_rglob_us"] / results["inventory_warm_us"], 1)
+
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return
+
+    print(f"ダミーモデル: {args.models}個 x {args.files}ファイル, 計測回数: {args.iterations}")
+    print(f"{'方式':<28}{'1回あたり':>12}")
+    print(f"{'従来（rglob）':<28}{results['legacy_rglob_us']:>10.1f}us")
+    print(f"{'インベントリ（キャッシュなし）':<28}{results['inventory_cold_us']:>10.1f}us")
+    print(f"{'インベントリ（キャッシュあり）':<28}{results['inventory_warm_us']:>10.1f}us")
+    print(f"速度比: {results['speedup']}x")
+
+
+if __name__ == "__main__":
+    main()
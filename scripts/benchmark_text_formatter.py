@@ -0,0 +1,163 @@
+#!/usr/bin/env python3
+"""
+改行整形ベンチマーク
+
+従来の改行処理（結合した全文に re.sub を複数回適用）と、text_formatter の処理時間を比較する。
+
+- 一括: 全セグメントを add_segments でまとめて整形（文字起こし完了時）
+- 逐次: セグメントを1つずつ add_segment で追加し、100セグメントごとに途中経過を取得
+  （従来の実装では途中経過のたびに全文を整形し直す）
+
+合成した日本語の文字起こし結果（数MB）で計測し、無音による改行を無効にした場合に
+両者の出力が一致することも確認する。アプリの依存パッケージは不要。
+
+使用方法:
+  python3 scripts/benchmark_text_formatter.py [OPTIONS]
+
+オプション:
+  --size-mb N          合成する文字起こし結果の大きさ（UTF-8換算、デフォルト: 4）
+  --repeat N           計測回数（最速値を採用、デフォルト: 3）
+  --src DIR            アプリのソースディレクトリ（デフォルト: OSに応じてrelease/mac/src または release/windows/src）
+  --json               JSON形式で出力
+"""
+
+import argparse
+import json
+import os
+import random
+import re
+import sys
+import time
+from pathlib import Path
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+
+# 逐次整形で途中経過を取得する間隔（セグメント数）
+STREAMING_INTERVAL = 100
+
+# 合成に使う文節
+PHRASES = [
+    "今日は", "会議の", "議題について", "説明します", "えーと", "そうですね", "だって", "それは", "なんですけど",
+    "来週までに", "資料を", "まとめてから", "確認してもらって", "大丈夫だと思うもん", "「はい」", "（笑）",
+]
+ENDINGS = ["。", "！", "？", "、", "", "", ""]
+
+
+def default_src_dir() -> Path:
+    """OSに応じたソースディレクトリを返す"""
+    platform_dir = "windows" if os.name == "nt" else "mac"
+    return REPO_ROOT / "release" / platform_dir / "src"
+
+
+def legacy_format(segments: list[dict]) -> str:
+    """従来の改行処理（TranscriptionService.transcribe 内の実装）"""
+    result_text = "".join(segment["text"] for segment in segments)
+    result_text = re.sub(r"。(?=[^」』）\)\n])", "。\n", result_text)
+    result_text = re.sub(r"([！？])(?=[^」』）\)\n])", r"\1\n", result_text)
+    if result_text.count("\n") < 10:
+        result_text = re.sub(
+            r"(って|だって|から|けど|けども|もん|もんね)(?=[^」』）\)\n])", r"\1\n", result_text
+        )
+        result_text = re.sub(r"、([^、\n]{20,})", r"、\n\1", result_text)
+    result_text = re.sub(r"\n+", "\n", result_text)
+    return result_text.strip()
+
+
+def make_segments(size_mb: float, punctuated: bool, seed: int = 0) -> list[dict]:
+    """合成した文字起こし結果（セグメントのリスト）"""
+    rng = random.Random(seed)
+    endings = ENDINGS if punctuated else ["、", "", ""]
+    segments = []
+    total_bytes = 0
+    position = 0.0
+    while total_bytes < size_mb * 1024 * 1024:
+        text = "".join(rng.choice(PHRASES) + rng.choice(endings) for _ in range(rng.randint(3, 8)))
+        duration = len(text) * 0.15
+        segments.append({"start": position, "end": position + duration, "text": text})
+        position += duration + rng.choice([0.2, 0.5, 3.0])
+        total_bytes += len(text.encode("utf-8"))
+    return segments
+
+
+def measure(func, repeat: int) -> tuple[float, str]:
+    """最速の処理時間（秒）と出力"""
+    best = float("inf")
+    output = ""
+    for _ in range(repeat):
+        start_time = time.perf_counter()
+        output = func()
+        best = min(best, time.perf_counter() - start_time)
+    return best, output
+
+
+def main():
+    parser = argparse.ArgumentParser(description="改行整形ベンチマーク")
+    parser.add_argument("--size-mb", type=float, default=4, help="合成する文字起こし結果の大きさ（MB）")
+    parser.add_argument("--repeat", type=int, default=3, help="計測回数")
+    parser.add_argument("--src", default=str(default_src_dir()), help="アプリのソースディレクトリ")
+    parser.add_argument("--json", action="store_true", help="JSON形式で出力")
+    args = parser.parse_args()
+
+    sys.path.insert(0, args.src)
+    from text_formatter import TranscriptFormatter
+
+    def format_batch(segments: list[dict], pause_breaks: bool) -> str:
+        formatter = TranscriptFormatter() if pause_breaks else TranscriptFormatter(pause_seconds=None)
+        formatter.add_segments(segments)
+        return formatter.text()
+
+    def format_streaming(segments: list[dict]) -> str:
+        formatter = TranscriptFormatter(pause_seconds=None)
+        for index, segment in enumerate(segments, 1):
+            formatter.add_segment(segment)
+            if index % STREAMING_INTERVAL == 0:
+                formatter.text()
+        return formatter.text()
+
+    def legacy_streaming(segments: list[dict]) -> str:
+        for index in range(STREAMING_INTERVAL, len(segments), STREAMING_INTERVAL):
+            legacy_format(segments[:index])
+        return legacy_format(segments)
+
+    results = []
+    for label, punctuated in (("句点あり", True), ("句点なし", False)):
+        segments = make_segments(args.size_mb, punctuated)
+        legacy_elapsed, legacy_text = measure(lambda: legacy_format(segments), args.repeat)
+        batch_elapsed, batch_text = measure(lambda: format_batch(segments, False), args.repeat)
+        pause_elapsed, _ = measure(lambda: format_batch(segments, True), args.repeat)
+
+        # 逐次は従来の実装だと全体で O(n²) になるため、先頭の一部で計測する
+        head = segments[: len(segments) // 10]
+        legacy_streaming_elapsed, _ = measure(lambda: legacy_streaming(head), 1)
+        streaming_elapsed, streaming_text = measure(lambda: format_streaming(head), 1)
+
+        results.append({
+            "transcript": label,
+            "segments": len(segments),
+            "chars": sum(len(segment["text"]) for segment in segments),
+            "legacy_seconds": round(legacy_elapsed, 4),
+            "batch_seconds": round(batch_elapsed, 4),
+            "batch_with_pauses_seconds": round(pause_elapsed, 4),
+            "streaming_segments": len(head),
+            "legacy_streaming_seconds": round(legacy_streaming_elapsed, 4),
+            "streaming_seconds": round(streaming_elapsed, 4),
+            "identical_output": legacy_text == batch_text and legacy_format(head) == streaming_text,
+        })
+
+    if args.json:
+        print(json.dumps(results, indent=2, ensure_ascii=False))
+        return
+
+    print(f"合成した文字起こし結果: 約{args.size_mb}MB, 計測回数: {args.repeat}（最速値）")
+    for result in results:
+        print()
+        print(f"[{result['transcript']}] {result['chars']:,}文字, {result['segments']:,}セグメント")
+        print(f"  一括: 従来 {result['legacy_seconds']:.3f}s / 新方式 {result['batch_seconds']:.3f}s"
+              f"（無音改行あり {result['batch_with_pauses_seconds']:.3f}s）")
+        print(f"  逐次（{result['streaming_segments']:,}セグメント）: 従来 {result['legacy_streaming_seconds']:.3f}s"
+              f" / 新方式 {result['streaming_seconds']:.3f}s")
+        print(f"  出力一致: {result['identical_output']}")
+
+
+if __name__ == "__main__":
+    main()
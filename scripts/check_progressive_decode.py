@@ -0,0 +1,210 @@
+#!/usr/bin/env python3
+"""
+アップロードと並行したデコード・VAD（先行デコード）のチェック
+
+合成音声（MP3）をmultipart/form-dataのリクエスト本文にし、一定の速度で少しずつ送る。
+/transcribe-streamと同じく upload_storage.receive_multipart_upload で受信しながら保存し、
+progressive_decode.ProgressiveDecoder で書き込まれた分からデコード・VADする。
+
+次の場合は終了コード1で終了する:
+- リクエスト本文を最後まで送る前に、デコード・VADが始まっていない
+- 送信完了後、音声全体のデコードが終わらない
+- 保存したファイルが送ったファイルと一致しない
+
+使用方法:
+  python3 scripts/check_progressive_decode.py [OPTIONS]
+
+オプション:
+  --minutes N          合成音声の長さ（分、デフォルト: 5）
+  --upload-seconds N   リクエスト本文を送り終えるまでの時間（秒、デフォルト: 10）
+  --src DIR            アプリのソースディレクトリ（デフォルト: OSに応じてrelease/mac/src または release/windows/src）
+  --json               JSON形式で出力
+"""
+
+import argparse
+import asyncio
+import hashlib
+import json
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+
+SAMPLING_RATE = 16000
+BOUNDARY = "gaq-check-boundary"
+BODY_CHUNK_SIZE = 64 * 1024
+# 送信完了後、デコードの終了を待つ最大時間（秒）
+DECODE_TIMEOUT_SECONDS = 60
+
+
+def default_src_dir() -> Path:
+    """OSに応じたソースディレクトリを返す"""
+    platform_dir = "windows" if os.name == "nt" else "mac"
+    return REPO_ROOT / "release" / platform_dir / "src"
+
+
+def create_audio(path: Path, minutes: float) -> None:
+    """合成音声（倍音構造の区間と無音を交互に並べる）をMP3で作成"""
+    import av
+    import numpy as np
+
+    block_seconds = 60
+
+    with av.open(str(path), mode="w") as container:
+        stream = container.add_stream("mp3", rate=SAMPLING_RATE)
+        stream.codec_context.layout = "mono"
+        stream.codec_context.bit_rate = 64000
+
+        for block in range(int(minutes * 60 / block_seconds)):
+            t = np.arange(block_seconds * SAMPLING_RATE) / SAMPLING_RATE
+            phase = 2 * np.pi * np.cumsum(140 + 20 * np.sin(2 * np.pi * 0.5 * t)) / SAMPLING_RATE
+            voiced = sum(np.sin(k * phase) / k for k in range(1, 6))
+            audio = 0.3 * voiced * (t % 10 < 8)
+            samples = (np.clip(audio, -1, 1) * 32767).astype(np.int16).reshape(1, -1)
+
+            frame = av.AudioFrame.from_ndarray(samples, format="s16", layout="mono")
+            frame.sample_rate = SAMPLING_RATE
+            frame.pts = block * block_seconds * SAMPLING_RATE
+            for packet in stream.encode(frame):
+                container.mux(packet)
+
+        for packet in stream.encode(None):
+            container.mux(packet)
+
+
+def build_body(audio: bytes) -> bytes:
+    """フォーム（model, mode, file）をmultipart/form-dataにする（ブラウザと同じくファイルを最後に送る）"""
+    parts = []
+    for name, value in (("model", "medium"), ("mode", "standard")):
+        parts.append(
+            f'--{BOUNDARY}\r\nContent-Disposition: form-data; name="{name}"\r\n\r\n{value}\r\n'.encode("utf-8")
+        )
+    parts.append(
+        f'--{BOUNDARY}\r\nContent-Disposition: form-data; name="file"; filename="sample.mp3"\r\n'
+        "Content-Type: audio/mpeg\r\n\r\n".encode("utf-8")
+    )
+    parts.append(audio)
+    parts.append(f"\r\n--{BOUNDARY}--\r\n".encode("utf-8"))
+    return b"".join(parts)
+
+
+async def run_check(audio_file: Path, upload_seconds: float, output_dir: Path) -> dict:
+    """リクエスト本文を少しずつ送りながら受信・先行デコードし、結果を返す"""
+    from progressive_decode import GrowingFile, ProgressiveDecoder
+    from starlette.requests import Request
+    from transcribe import VAD_PARAMETERS
+    from upload_storage import receive_multipart_upload
+
+    audio = audio_file.read_bytes()
+    body = build_body(audio)
+    chunks = [body[i : i + BODY_CHUNK_SIZE] for i in range(0, len(body), BODY_CHUNK_SIZE)]
+    interval = upload_seconds / len(chunks)
+
+    upload = None
+    decoder = None
+    decoded_before_end = 0
+    analyzed_before_end = 0
+
+    async def receive():
+        nonlocal decoded_before_end, analyzed_before_end
+        if not chunks:
+            return {"type": "http.disconnect"}
+        await asyncio.sleep(interval)
+        chunk = chunks.pop(0)
+        if not chunks:
+            # 最後のチャンクを渡す時点でデコード済み・VAD済みの長さを記録
+            decoded_before_end = decoder.decoded_samples if decoder else 0
+            analyzed_before_end = decoder.analyzed_samples if decoder else 0
+        return {"type": "http.request", "body": chunk, "more_body": bool(chunks)}
+
+    scope = {
+        "type": "http",
+        "method": "POST",
+        "path": "/transcribe-stream",
+        "headers": [
+            (b"content-type", f"multipart/form-data; boundary={BOUNDARY}".encode("latin-1")),
+            (b"content-length", str(len(body)).encode("latin-1")),
+        ],
+    }
+
+    def open_destination(filename: str, fields: dict) -> Path:
+        nonlocal upload, decoder
+        path = output_dir / filename
+        upload = GrowingFile(path)
+        decoder = ProgressiveDecoder(upload, VAD_PARAMETERS)
+        decoder.start()
+        return path
+
+    start_time = time.time()
+    form = await receive_multipart_upload(
+        Request(scope, receive), "file", open_destination, on_progress=lambda size: upload.extend(size)
+    )
+    upload.finish()
+    upload_elapsed = time.time() - start_time
+
+    # 送信完了後、音声全体のデコードが終わるまで待つ
+    finished = await asyncio.to_thread(decoder.wait, DECODE_TIMEOUT_SECONDS)
+    decode_elapsed = time.time() - start_time
+    await asyncio.to_thread(decoder.cancel)
+
+    return {
+        "fields": form.fields,
+        "file_matches": form.sha256 == hashlib.sha256(audio).hexdigest() and form.path.read_bytes() == audio,
+        "body_bytes": len(body),
+        "upload_elapsed": round(upload_elapsed, 1),
+        "decoded_seconds_before_end": round(decoded_before_end / SAMPLING_RATE, 1),
+        "analyzed_seconds_before_end": round(analyzed_before_end / SAMPLING_RATE, 1),
+        "decoded_seconds": round(decoder.decoded_samples / SAMPLING_RATE, 1),
+        "decode_finished": finished,
+        "decode_elapsed": round(decode_elapsed, 1),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="アップロードと並行したデコード・VADのチェック")
+    parser.add_argument("--minutes", type=float, default=5, help="合成音声の長さ（分）")
+    parser.add_argument("--upload-seconds", type=float, default=10, help="リクエスト本文を送り終えるまでの時間（秒）")
+    parser.add_argument("--src", default=str(default_src_dir()), help="アプリのソースディレクトリ")
+    parser.add_argument("--json", action="store_true", help="JSON形式で出力")
+    args = parser.parse_args()
+
+    sys.path.insert(0, args.src)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        audio_file = Path(tmp) / "sample.mp3"
+        if not args.json:
+            print(f"合成音声を作成中: {args.minutes}分 ...", file=sys.stderr)
+        create_audio(audio_file, args.minutes)
+        output_dir = Path(tmp) / "uploads"
+        output_dir.mkdir()
+        result = asyncio.run(run_check(audio_file, args.upload_seconds, output_dir))
+
+    audio_seconds = args.minutes * 60
+    checks = {
+        "デコードが送信完了前に始まっている": result["decoded_seconds_before_end"] > 0,
+        "VADが送信完了前に始まっている": result["analyzed_seconds_before_end"] > 0,
+        "音声全体をデコードした": result["decode_finished"] and result["decoded_seconds"] >= audio_seconds - 1,
+        "保存したファイルが一致する": result["file_matches"],
+    }
+    passed = all(checks.values())
+
+    if args.json:
+        print(json.dumps({"passed": passed, "checks": checks, "result": result}, ensure_ascii=False, indent=2))
+    else:
+        print()
+        print(f"合成音声: {args.minutes}分 ({result['body_bytes'] / (1024 * 1024):.1f}MB)")
+        print(f"送信時間: {result['upload_elapsed']:.1f}秒")
+        print(f"送信完了時点のデコード済み: {result['decoded_seconds_before_end']:.0f}秒")
+        print(f"送信完了時点のVAD済み: {result['analyzed_seconds_before_end']:.0f}秒")
+        print(f"デコード済み（最終）: {result['decoded_seconds']:.0f}秒（開始から{result['decode_elapsed']:.1f}秒）")
+        for name, ok in checks.items():
+            print(f"{'OK' if ok else 'NG'}: {name}")
+
+    sys.exit(0 if passed else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,204 @@
+#!/usr/bin/env python3
+"""
+ストリーミングデコードのメモリ使用量チェック
+
+長時間の合成音声（AAC / MP4）を作成し、音声全体をデコードする場合（decode_audio）と
+ストリーミングデコード（audio_stream.iter_audio_windows + 窓ごとのVAD）の最大RSSを比較する。
+ストリーミングデコードの増分が上限を超えた場合は終了コード1で終了する。
+
+計測は条件ごとに別プロセスで行い、各プロセスの最大RSSからデコード前のRSSを引いた値を増分とする。
+
+使用方法:
+  python3 scripts/check_streaming_memory.py [OPTIONS]
+
+オプション:
+  --hours N            合成音声の長さ（時間、デフォルト: 3）
+  --window-seconds N   ストリーミングの窓の長さ（秒、デフォルト: 300）
+  --limit-mb N         ストリーミングデコードの増分の上限（MB、デフォルト: 窓4つ分 + 150MB）
+  --skip-full          音声全体のデコード（比較用）を省略
+  --src DIR            アプリのソースディレクトリ（デフォルト: OSに応じてrelease/mac/src または release/windows/src）
+  --json               JSON形式で出力
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+
+SAMPLING_RATE = 16000
+
+
+def default_src_dir() -> Path:
+    """OSに応じたソースディレクトリを返す"""
+    platform_dir = "windows" if os.name == "nt" else "mac"
+    return REPO_ROOT / "release" / platform_dir / "src"
+
+
+def peak_rss_mb() -> float:
+    """現在のプロセスの最大RSS（MB）"""
+    try:
+        import resource
+
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        # macOSはバイト単位、Linuxはキロバイト単位
+        return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+    except ImportError:
+        import psutil
+
+        return psutil.Process().memory_info().peak_wset / (1024 * 1024)
+
+
+def create_long_audio(path: Path, hours: float) -> None:
+    """
+    長時間の合成音声を作成（声に近い倍音構造の区間と無音を交互に並べる）
+
+    1分ずつ生成してエンコードするため、作成時のメモリ使用量も一定
+    """
+    import av
+    import numpy as np
+
+    rng = np.random.default_rng(0)
+    block_seconds = 60
+
+    with av.open(str(path), mode="w") as container:
+        stream = container.add_stream("aac", rate=SAMPLING_RATE)
+        stream.codec_context.layout = "mono"
+        stream.codec_context.bit_rate = 32000
+
+        for block in range(int(hours * 3600 / block_seconds)):
+            t = np.arange(block_seconds * SAMPLING_RATE) / SAMPLING_RATE
+            pitch = 140 + 20 * np.sin(2 * np.pi * 0.5 * t)
+            phase = 2 * np.pi * np.cumsum(pitch) / SAMPLING_RATE
+            voiced = sum(np.sin(k * phase) / k for k in range(1, 6))
+            # 8秒の発話と2秒の無音を繰り返す
+            envelope = (t % 10 < 8) * np.clip(np.sin(2 * np.pi * 4 * t) + 0.2, 0, None)
+            audio = 0.3 * voiced * envelope + 0.005 * rng.standard_normal(t.shape)
+            samples = (np.clip(audio, -1, 1) * 32767).astype(np.int16).reshape(1, -1)
+
+            frame = av.AudioFrame.from_ndarray(samples, format="s16", layout="mono")
+            frame.sample_rate = SAMPLING_RATE
+            frame.pts = block * block_seconds * SAMPLING_RATE
+            for packet in stream.encode(frame):
+                container.mux(packet)
+
+        for packet in stream.encode(None):
+            container.mux(packet)
+
+
+def run_single(audio_file: str, mode: str, window_seconds: int) -> dict:
+    """1条件を計測（子プロセス内で実行される）"""
+    from lazy_imports import load_faster_whisper
+
+    load_faster_whisper()
+    from audio_stream import iter_audio_windows
+    from speech_chunks import detect_speech_chunks
+
+    import numpy as np
+
+    vad_parameters = {"min_silence_duration_ms": 500}
+    # VADモデルの読み込み（音声の長さに関係ない固定分）は増分に含めない
+    detect_speech_chunks(np.zeros(SAMPLING_RATE * 10, dtype=np.float32), vad_parameters)
+    rss_before = peak_rss_mb()
+    start_time = time.time()
+    samples = 0
+    speech_chunks = 0
+
+    if mode == "full":
+        audio = load_faster_whisper().decode_audio(audio_file, sampling_rate=SAMPLING_RATE)
+        samples = len(audio)
+        speech_chunks = len(detect_speech_chunks(audio, vad_parameters))
+    else:
+        for window in iter_audio_windows(Path(audio_file), window_seconds):
+            samples += len(window)
+            speech_chunks += len(detect_speech_chunks(window, vad_parameters))
+
+    return {
+        "mode": mode,
+        "audio_seconds": round(samples / SAMPLING_RATE, 1),
+        "speech_chunks": speech_chunks,
+        "elapsed": round(time.time() - start_time, 1),
+        "peak_rss_mb": round(peak_rss_mb(), 1),
+        "audio_rss_mb": round(peak_rss_mb() - rss_before, 1),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="ストリーミングデコードのメモリ使用量チェック")
+    parser.add_argument("--hours", type=float, default=3, help="合成音声の長さ（時間）")
+    parser.add_argument("--window-seconds", type=int, default=300, help="ストリーミングの窓の長さ（秒）")
+    parser.add_argument("--limit-mb", type=float, help="ストリーミングデコードの増分の上限（MB）")
+    parser.add_argument("--skip-full", action="store_true", help="音声全体のデコード（比較用）を省略")
+    parser.add_argument("--src", default=str(default_src_dir()), help="アプリのソースディレクトリ")
+    parser.add_argument("--json", action="store_true", help="JSON形式で出力")
+    parser.add_argument("--single", nargs=2, metavar=("MODE", "AUDIO_FILE"), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    sys.path.insert(0, args.src)
+
+    if args.single:
+        result = run_single(args.single[1], args.single[0], args.window_seconds)
+        print(json.dumps(result))
+        return
+
+    # float32の窓4つ分（窓・持ち越し・VAD・連結のコピー）+ PyAV・VAD（onnxruntime）の作業領域
+    # （Linux・窓300秒の実測で、1〜6時間の音声に対し増分は150〜170MBでほぼ一定）
+    window_mb = args.window_seconds * SAMPLING_RATE * 4 / (1024 * 1024)
+    limit_mb = args.limit_mb if args.limit_mb is not None else window_mb * 4 + 150
+
+    with tempfile.TemporaryDirectory() as tmp:
+        audio_file = Path(tmp) / "long_audio.mp4"
+        if not args.json:
+            print(f"合成音声を作成中: {args.hours}時間 ...", file=sys.stderr)
+        create_long_audio(audio_file, args.hours)
+
+        modes = ["streaming"] if args.skip_full else ["streaming", "full"]
+        results = []
+        for mode in modes:
+            if not args.json:
+                print(f"計測中: {mode} ...", file=sys.stderr)
+            completed = subprocess.run(
+                [
+                    sys.executable,
+                    __file__,
+                    "--src",
+                    args.src,
+                    "--window-seconds",
+                    str(args.window_seconds),
+                    "--single",
+                    mode,
+                    str(audio_file),
+                ],
+                capture_output=True,
+                text=True,
+                check=True,
+            )
+            results.append(json.loads(completed.stdout.strip().splitlines()[-1]))
+
+    streaming = results[0]
+    passed = streaming["audio_rss_mb"] <= limit_mb
+
+    if args.json:
+        print(json.dumps({"limit_mb": round(limit_mb, 1), "passed": passed, "results": results}, indent=2))
+    else:
+        print()
+        print(f"合成音声: {args.hours}時間, 窓: {args.window_seconds}秒")
+        print(f"{'方式':<12}{'処理時間':>10}{'最大RSS':>12}{'デコード時増分':>16}")
+        for result in results:
+            print(
+                f"{result['mode']:<12}{result['elapsed']:>9.1f}s{result['peak_rss_mb']:>10.0f}MB"
+                f"{result['audio_rss_mb']:>14.0f}MB"
+            )
+        status = "OK" if passed else "NG"
+        print(f"{status}: ストリーミングデコードの増分 {streaming['audio_rss_mb']:.0f}MB（上限 {limit_mb:.0f}MB）")
+
+    sys.exit(0 if passed else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -25,6 +25,25 @@ NC='\033[0m' # No Color
 COMMON_FILES=(
     "transcribe.py"
     "config.py"
+    "model_pool.py"
+    "speech_chunks.py"
+    "result_cache.py"
+    "system_info.py"
+    "auto_tuning.py"
+    "job_scheduler.py"
+    "cancellation.py"
+    "checkpoint.py"
+    "model_warmup.py"
+    "lazy_imports.py"
+    "model_inventory.py"
+    "text_formatter.py"
+    "audio_stream.py"
+    "pcm_cache.py"
+    "vad_cache.py"
+    "upload_storage.py"
+    "progressive_decode.py"
+    "resumable_upload.py"
+    "upload_registry.py"
 )
 
 # プラットフォーム固有ファイル（行数のみチェック）